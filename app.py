@@ -5,28 +5,57 @@ import os
 load_dotenv()
 
 # Importar instância única do banco
-from db import db
+from db import db, adicionar_colunas, criar_indices
+from config import opcoes_engine, configurar_conexoes
+from metricas import instalar_instrumentacao
+from sessao import BIND_REPLICA
+from serializacao import ProvedorJSON
 
 # Importar modelos (necessário para criar tabelas)
 from models.cliente import Cliente
 from models.produto import Produto
 from models.pedido import Pedido
+from models.resumo_venda import ResumoVenda
+from models.evento_outbox import EventoOutbox
+from models.chave_idempotencia import ChaveIdempotencia
+
+from repositories.busca import instalar_indices
 
 from controllers.cliente import cliente_bp
 from controllers.produto import produto_bp
 from controllers.pedido import pedido_bp
+from controllers.metricas import metricas_bp
+from controllers.relatorio import relatorio_bp
+from controllers.outbox import outbox_bp
+from controllers.idempotencia import idempotencia_bp
+from services.outbox import registrar_handlers_do_ambiente
+from worker import TrabalhadorOutbox
 
 app = Flask(__name__)
+# Encoder JSON das respostas (orjson quando instalado, ver serializacao.py)
+app.json = ProvedorJSON(app)
 
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///desafio.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Réplica de leitura opcional para os GETs (ver sessao.py)
+if os.getenv('DATABASE_REPLICA_URL'):
+    url_replica = os.getenv('DATABASE_REPLICA_URL')
+    app.config['SQLALCHEMY_BINDS'] = {
+        BIND_REPLICA: {'url': url_replica, **opcoes_engine(url_replica)}
+    }
 
 db.init_app(app)
 
 app.register_blueprint(cliente_bp)
 app.register_blueprint(produto_bp)
 app.register_blueprint(pedido_bp)
+app.register_blueprint(metricas_bp)
+app.register_blueprint(relatorio_bp)
+app.register_blueprint(outbox_bp)
+app.register_blueprint(idempotencia_bp)
 
 @app.route('/')
 def home():
@@ -36,13 +65,30 @@ def home():
         'endpoints': {
             'clientes': '/api/clientes',
             'produtos': '/api/produtos',
-            'pedidos': '/api/pedidos'
+            'pedidos': '/api/pedidos',
+            'metricas': '/api/metricas',
+            'relatorios': '/api/relatorios',
+            'outbox': '/api/outbox'
         }
     })
 
 with app.app_context():
+    for engine in db.engines.values():
+        configurar_conexoes(engine)
+    instalar_instrumentacao(app, list(db.engines.values()))
     db.create_all()
+    adicionar_colunas(Cliente, Produto, Pedido, ChaveIdempotencia)
+    criar_indices(Pedido, Produto)
+    instalar_indices(Cliente, Produto)
     print("✅ Banco de dados inicializado!")
 
+# Destinos dos eventos da outbox (ver services/outbox.py); vale também para o comando da CLI
+registrar_handlers_do_ambiente()
+
+# OUTBOX_TRABALHADOR_ATIVO=true drena a outbox numa thread deste processo. Com vários
+# processos (gunicorn etc.), prefira um trabalhador dedicado: flask --app app outbox processar
+if os.getenv('OUTBOX_TRABALHADOR_ATIVO', 'false').strip().lower() in ('1', 'true', 'sim', 'yes', 'on'):
+    trabalhador_outbox = TrabalhadorOutbox.do_ambiente(app).iniciar()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
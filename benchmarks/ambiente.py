@@ -0,0 +1,12 @@
+# benchmarks/ambiente.py - App isolada em banco temporário para os benchmarks
+
+import os
+import tempfile
+
+
+def preparar_app(url_banco: str = None):
+    # Deve ser chamada antes de qualquer importação do app: a configuração do banco é lida
+    # na importação. Sem URL, usa um SQLite novo em diretório temporário.
+    os.environ['DATABASE_URL'] = url_banco or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app import app
+    return app
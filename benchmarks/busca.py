@@ -0,0 +1,69 @@
+# benchmarks/busca.py - Busca por nome: ILIKE '%termo%' x índice FTS5
+#
+# Uso: python -m benchmarks.busca --linhas 1000000 --repeticoes 20
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+PALAVRAS = ['camisa', 'calça', 'tênis', 'bermuda', 'jaqueta', 'boné', 'meia', 'vestido',
+            'azul', 'verde', 'preto', 'branco', 'algodão', 'couro', 'infantil', 'esportivo',
+            'promoção', 'básico', 'estampado', 'listrado']
+TERMOS = ['camisa', 'tenis azul', 'algodao', 'jaq', 'vestido listrado preto']
+
+
+def popular(app, db, linhas: int, tamanho_bloco: int = 50000) -> None:
+    from sqlalchemy import insert
+    from models.produto import Produto
+
+    aleatorio = random.Random(42)
+    with app.app_context():
+        for inicio in range(0, linhas, tamanho_bloco):
+            registros = [{
+                'nome': ' '.join(aleatorio.sample(PALAVRAS, 3)) + f' {indice}',
+                'quantidade': aleatorio.randint(0, 100),
+                'preco': round(aleatorio.uniform(5, 500), 2)
+            } for indice in range(inicio, min(inicio + tamanho_bloco, linhas))]
+            db.session.execute(insert(Produto), registros)
+            db.session.commit()
+
+
+def cronometrar(app, indice, repeticoes: int, limite: int) -> float:
+    from db import db
+
+    with app.app_context():
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            for termo in TERMOS:
+                ids = indice.selecionar_ids(termo).subquery()
+                db.session.query(ids.c.id).order_by(ids.c.relevancia, ids.c.id).limit(limite).all()
+        return (time.perf_counter() - inicio) * 1000 / (repeticoes * len(TERMOS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da busca de produtos por nome')
+    parser.add_argument('--linhas', type=int, default=1000000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--limite', type=int, default=50)
+    args = parser.parse_args()
+
+    # Banco temporário isolado; a importação do app precisa vir depois da configuração
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app import app
+    from db import db
+    from models.produto import Produto
+    from repositories.busca import IndiceFTS5, IndiceIlike
+
+    inicio = time.perf_counter()
+    popular(app, db, args.linhas)
+    print(f"{args.linhas} produtos gerados em {time.perf_counter() - inicio:.1f}s")
+
+    for nome, indice in (('ILIKE', IndiceIlike(Produto)), ('FTS5', IndiceFTS5(Produto))):
+        media = cronometrar(app, indice, args.repeticoes, args.limite)
+        print(f"{nome:<6} {media:10.2f} ms/consulta")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/carga.py - Teste de carga HTTP contra a API rodando localmente
+#
+# Sobe a aplicação num servidor werkzeug em thread própria (porta livre) e dispara
+# requisições concorrentes nos principais endpoints de leitura e escrita.
+#
+# Uso: python -m benchmarks.carga --pedidos 20000 --concorrencia 8 --requisicoes 2000
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# (peso, método, caminho); {produto}, {cliente} e {pedido} viram ids aleatórios
+CENARIO_PADRAO = [
+    (30, 'GET', '/api/produtos?limit=50'),
+    (20, 'GET', '/api/produtos/{produto}'),
+    (15, 'GET', '/api/produtos/nome/camisa?limit=20'),
+    (15, 'GET', '/api/pedidos?limit=50'),
+    (10, 'GET', '/api/pedidos/{pedido}'),
+    (5, 'GET', '/api/clientes?limit=50'),
+    (5, 'POST', '/api/pedidos')
+]
+
+
+def iniciar_servidor(app) -> Tuple[str, object]:
+    from werkzeug.serving import make_server
+
+    # Log de acesso por requisição distorce a medição e polui a saída
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{servidor.server_port}', servidor
+
+
+def _requisitar(base: str, metodo: str, caminho: str, corpo: dict = None) -> Optional[int]:
+    # None: sem resposta HTTP (conexão recusada/derrubada, timeout); conta como erro
+    dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+    requisicao = urllib.request.Request(base + caminho, data=dados, method=metodo,
+                                        headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(requisicao, timeout=30) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as erro:
+        return erro.code
+    except (urllib.error.URLError, TimeoutError, ConnectionError):
+        # Servidor saturado: a falha entra na contagem em vez de derrubar a thread (e o executor.map)
+        return None
+
+
+def montar_plano(cenario, requisicoes: int, volumes: Dict[str, int], semente: int) -> List[Tuple]:
+    # Sequência fixa de requisições: mesma semente = mesma carga entre execuções
+    aleatorio = random.Random(semente)
+    pesos = [peso for peso, _, _ in cenario]
+    plano = []
+    for peso_escolhido in aleatorio.choices(range(len(cenario)), weights=pesos, k=requisicoes):
+        _, metodo, modelo = cenario[peso_escolhido]
+        caminho = modelo.format(
+            produto=aleatorio.randint(1, volumes['produtos']),
+            cliente=aleatorio.randint(1, volumes['clientes']),
+            pedido=aleatorio.randint(1, volumes['pedidos'])
+        )
+        corpo = {'cliente_id': aleatorio.randint(1, volumes['clientes'])} if metodo == 'POST' else None
+        plano.append((f'{metodo} {modelo.split("?")[0]}', metodo, caminho, corpo))
+    return plano
+
+
+def executar_carga(base: str, plano: List[Tuple], concorrencia: int) -> Dict[str, Dict]:
+    from benchmarks.resultados import resumir
+
+    duracoes = defaultdict(list)
+    erros = defaultdict(int)
+    lock = threading.Lock()
+
+    def executar(item):
+        rota, metodo, caminho, corpo = item
+        inicio = time.perf_counter()
+        status = _requisitar(base, metodo, caminho, corpo)
+        duracao = (time.perf_counter() - inicio) * 1000
+        with lock:
+            duracoes[rota].append(duracao)
+            if status is None or status >= 500:
+                erros[rota] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(executar, plano))
+    tempo_total = time.perf_counter() - inicio
+
+    resultados = {}
+    for rota, valores in sorted(duracoes.items()):
+        resultados[rota] = {**resumir(valores), 'erros': erros[rota]}
+    todas = [valor for valores in duracoes.values() for valor in valores]
+    resultados['total'] = {
+        **resumir(todas),
+        'erros': sum(erros.values()),
+        'duracao_s': round(tempo_total, 3),
+        'vazao_rps': round(len(todas) / tempo_total, 2)
+    }
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga HTTP da API')
+    parser.add_argument('--url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--clientes', type=int, default=1000)
+    parser.add_argument('--produtos', type=int, default=5000)
+    parser.add_argument('--pedidos', type=int, default=20000)
+    parser.add_argument('--itens-por-pedido', type=int, default=3)
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--aquecimento', type=int, default=100, help='Requisições descartadas antes da medição')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: benchmarks/resultados/)')
+    args = parser.parse_args()
+
+    from benchmarks.ambiente import preparar_app
+    from benchmarks.dados import gerar_dados
+    from benchmarks.resultados import salvar
+
+    app = preparar_app(args.url)
+    volumes = gerar_dados(app, args.clientes, args.produtos, args.pedidos, args.itens_por_pedido, args.semente)
+    base, servidor = iniciar_servidor(app)
+
+    try:
+        if args.aquecimento:
+            executar_carga(base, montar_plano(CENARIO_PADRAO, args.aquecimento, volumes, args.semente + 1),
+                           args.concorrencia)
+        plano = montar_plano(CENARIO_PADRAO, args.requisicoes, volumes, args.semente)
+        resultados = executar_carga(base, plano, args.concorrencia)
+    finally:
+        servidor.shutdown()
+
+    print(f"{'rota':<36} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'erros':>6}")
+    for rota, resumo in resultados.items():
+        print(f"{rota:<36} {resumo['amostras']:>6} {resumo['p50_ms']:>9.2f} {resumo['p95_ms']:>9.2f} "
+              f"{resumo['p99_ms']:>9.2f} {resumo['erros']:>6}")
+    print(f"Vazão: {resultados['total']['vazao_rps']} req/s")
+
+    parametros = {**volumes, 'requisicoes': args.requisicoes, 'concorrencia': args.concorrencia,
+                  'aquecimento': args.aquecimento, 'semente': args.semente}
+    caminho = salvar('carga', parametros, resultados, args.saida)
+    print(f"Resultados salvos em {caminho}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/dados.py - Gerador de massa de dados para benchmarks e testes de carga
+#
+# Uso: python -m benchmarks.dados --url sqlite:///carga.db --clientes 1000 --produtos 5000 \
+#          --pedidos 20000 --itens-por-pedido 3
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+PALAVRAS = ['camisa', 'calça', 'tênis', 'bermuda', 'jaqueta', 'boné', 'meia', 'vestido',
+            'azul', 'verde', 'preto', 'branco', 'algodão', 'couro', 'infantil', 'esportivo',
+            'promoção', 'básico', 'estampado', 'listrado']
+NOMES = ['Ana', 'João', 'Maria', 'José', 'Conceição', 'Paulo', 'Luíza', 'Carlos', 'Fernanda', 'Tiago']
+SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Lima', 'Araújo', 'Gonçalves']
+SENHA_PADRAO = 'senha-bench'
+TAMANHO_BLOCO = 5000
+
+
+def _inserir(db, modelo, registros) -> None:
+    from sqlalchemy import insert
+    for inicio in range(0, len(registros), TAMANHO_BLOCO):
+        db.session.execute(insert(modelo), registros[inicio:inicio + TAMANHO_BLOCO])
+    db.session.commit()
+
+
+def gerar_dados(app, clientes: int = 100, produtos: int = 500, pedidos: int = 1000,
+                itens_por_pedido: int = 3, semente: int = 42) -> Dict[str, int]:
+    # Gera volumes determinísticos (mesma semente = mesmos dados) via INSERT em lote.
+    # Todos os clientes usam SENHA_PADRAO; o hash é calculado uma única vez.
+    from db import db
+    from models.cliente import Cliente
+    from models.produto import Produto
+    from models.pedido import Pedido, StatusPedido
+    from models.item_pedido import ItemPedido
+
+    aleatorio = random.Random(semente)
+    agora = datetime.utcnow()
+    status = list(StatusPedido)
+
+    with app.app_context():
+        hash_senha = Cliente.gerar_hash_senha(SENHA_PADRAO)
+        base_cliente = db.session.query(db.func.coalesce(db.func.max(Cliente.id), 0)).scalar()
+        _inserir(db, Cliente, [{
+            'nome': f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}',
+            'email': f'cliente{base_cliente + indice}@bench.com',
+            'senha': hash_senha
+        } for indice in range(1, clientes + 1)])
+
+        precos = [round(aleatorio.uniform(5, 500), 2) for _ in range(produtos)]
+        _inserir(db, Produto, [{
+            'nome': ' '.join(aleatorio.sample(PALAVRAS, 3)),
+            'quantidade': aleatorio.randint(0, 1000),
+            'preco': preco
+        } for preco in precos])
+
+        ids_clientes = [id_ for (id_,) in db.session.query(Cliente.id)]
+        ids_produtos = [id_ for (id_,) in db.session.query(Produto.id)]
+        preco_por_produto = dict(db.session.query(Produto.id, Produto.preco))
+        base_pedido = db.session.query(db.func.coalesce(db.func.max(Pedido.id), 0)).scalar()
+
+        registros_pedidos, registros_itens = [], []
+        for pedido_id in range(base_pedido + 1, base_pedido + pedidos + 1):
+            total = 0.0
+            escolhidos = aleatorio.sample(ids_produtos, min(itens_por_pedido, len(ids_produtos)))
+            for produto_id in escolhidos:
+                quantidade = aleatorio.randint(1, 5)
+                total += quantidade * preco_por_produto[produto_id]
+                registros_itens.append({
+                    'pedido_id': pedido_id,
+                    'produto_id': produto_id,
+                    'quantidade': quantidade,
+                    'preco_unitario': preco_por_produto[produto_id]
+                })
+            registros_pedidos.append({
+                'id': pedido_id,
+                'cliente_id': aleatorio.choice(ids_clientes),
+                'total': round(total, 2),
+                'data': agora - timedelta(minutes=aleatorio.randint(0, 60 * 24 * 365)),
+                'status': aleatorio.choice(status)
+            })
+
+        _inserir(db, Pedido, registros_pedidos)
+        _inserir(db, ItemPedido, registros_itens)
+
+    return {
+        'clientes': clientes,
+        'produtos': produtos,
+        'pedidos': pedidos,
+        'itens': len(registros_itens)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Popula o banco com dados sintéticos')
+    parser.add_argument('--url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--clientes', type=int, default=100)
+    parser.add_argument('--produtos', type=int, default=500)
+    parser.add_argument('--pedidos', type=int, default=1000)
+    parser.add_argument('--itens-por-pedido', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    from benchmarks.ambiente import preparar_app
+    app = preparar_app(args.url)
+
+    inicio = time.perf_counter()
+    volumes = gerar_dados(app, args.clientes, args.produtos, args.pedidos,
+                          args.itens_por_pedido, args.semente)
+    print(f"{volumes} gerados em {time.perf_counter() - inicio:.1f}s em {app.config['SQLALCHEMY_DATABASE_URI']}")
+
+
+if __name__ == '__main__':
+    main()
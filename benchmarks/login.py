@@ -0,0 +1,55 @@
+# benchmarks/login.py - Logins por segundo com diferentes tamanhos do pool de hash
+#
+# Uso: python -m benchmarks.login --pools 0 1 2 4 --threads 8 --logins 200
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def medir(app, hasher, tamanho_pool: int, threads: int, logins: int) -> float:
+    # Uma vaga por thread: o benchmark mede vazão, não a rejeição por sobrecarga (503)
+    hasher.definir_tamanho_pool(tamanho_pool, max_pendentes=max(threads, 1))
+    cliente_http = app.test_client()
+    credenciais = {'email': 'bench@exemplo.com', 'senha': 'senha-bench'}
+
+    def login(_):
+        resposta = cliente_http.post('/api/clientes/login', json=credenciais)
+        assert resposta.status_code == 200, resposta.get_json()
+
+    login(None)  # aquece o pool (criação dos processos)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(login, range(logins)))
+    return logins / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de logins/s por tamanho do pool de hash')
+    parser.add_argument('--pools', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=200)
+    args = parser.parse_args()
+
+    # Banco temporário isolado; a importação do app precisa vir depois da configuração
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app import app
+    from hash_senha import hasher_senha
+    from services.cliente import ClienteService
+
+    with app.app_context():
+        ClienteService().criar_cliente('Bench', 'bench@exemplo.com', 'senha-bench')
+
+    print(f"Método: {hasher_senha.metodo or 'padrão do werkzeug'} | threads: {args.threads} | logins: {args.logins}")
+    try:
+        for tamanho_pool in args.pools:
+            taxa = medir(app, hasher_senha, tamanho_pool, args.threads, args.logins)
+            print(f"pool={tamanho_pool:<3} {taxa:8.1f} logins/s")
+    finally:
+        hasher_senha.encerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/micro.py - Micro-benchmarks da camada de serviço
+#
+# Uso: python -m benchmarks.micro --pedidos 5000 --repeticoes 200 [--saida resultado.json]
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+TERMOS_BUSCA = ['camisa', 'tenis azul', 'algodao', 'jaq', 'vestido listrado']
+
+
+def cronometrar(funcao: Callable[[], object], repeticoes: int) -> List[float]:
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+    return duracoes
+
+
+def medir_confirmar_pedido(app, repeticoes: int, itens_por_pedido: int) -> Dict[str, float]:
+    from db import db
+    from benchmarks.resultados import resumir
+    from models.cliente import Cliente
+    from models.pedido import Pedido
+    from models.item_pedido import ItemPedido
+    from models.produto import Produto
+    from services.pedido import PedidoService
+
+    with app.app_context():
+        # Pedidos pendentes dedicados, com estoque de sobra para todas as confirmações
+        produtos = [Produto(nome=f'Produto micro {indice}', quantidade=10 ** 9, preco=10.0)
+                    for indice in range(itens_por_pedido)]
+        db.session.add_all(produtos)
+        db.session.flush()
+        cliente_id = db.session.query(db.func.min(Cliente.id)).scalar()
+        pedidos = []
+        for _ in range(repeticoes):
+            pedido = Pedido(cliente_id=cliente_id)
+            pedido.itens = [ItemPedido(produto=produto, quantidade=1) for produto in produtos]
+            pedidos.append(pedido)
+        db.session.add_all(pedidos)
+        db.session.commit()
+        ids = iter([pedido.id for pedido in pedidos])
+
+    servico = PedidoService()
+    duracoes = []
+    for _ in range(repeticoes):
+        pedido_id = next(ids)
+        with app.app_context():
+            inicio = time.perf_counter()
+            servico.confirmar_pedido(pedido_id)
+            duracoes.append((time.perf_counter() - inicio) * 1000)
+    return resumir(duracoes)
+
+
+def medir_busca_por_nome(app, repeticoes: int) -> Dict[str, float]:
+    from benchmarks.resultados import resumir
+    from services.produto import ProdutoService
+
+    servico = ProdutoService()
+    termos = iter(TERMOS_BUSCA * repeticoes)
+    with app.app_context():
+        return resumir(cronometrar(lambda: servico.buscar_produtos_por_nome(next(termos)), repeticoes))
+
+
+def medir_to_dict(app, repeticoes: int) -> Dict[str, float]:
+    from benchmarks.resultados import resumir
+    from repositories.pedido import PedidoRepository
+
+    with app.app_context():
+        # Pedidos já carregados: mede só a serialização, sem consultas no meio
+        pedidos = PedidoRepository.listar_paginado(repeticoes)
+        atual = iter(pedidos * (repeticoes // max(len(pedidos), 1) + 1))
+        return resumir(cronometrar(lambda: next(atual).to_dict(), repeticoes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks da camada de serviço')
+    parser.add_argument('--url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--clientes', type=int, default=200)
+    parser.add_argument('--produtos', type=int, default=2000)
+    parser.add_argument('--pedidos', type=int, default=5000)
+    parser.add_argument('--itens-por-pedido', type=int, default=3)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: benchmarks/resultados/)')
+    args = parser.parse_args()
+
+    from benchmarks.ambiente import preparar_app
+    from benchmarks.dados import gerar_dados
+    from benchmarks.resultados import salvar
+
+    app = preparar_app(args.url)
+    volumes = gerar_dados(app, args.clientes, args.produtos, args.pedidos, args.itens_por_pedido)
+
+    resultados = {
+        'PedidoService.confirmar_pedido': medir_confirmar_pedido(app, args.repeticoes, args.itens_por_pedido),
+        'ProdutoService.buscar_produtos_por_nome': medir_busca_por_nome(app, args.repeticoes),
+        'Pedido.to_dict': medir_to_dict(app, args.repeticoes)
+    }
+    for nome, resumo in resultados.items():
+        print(f"{nome:<42} média {resumo['media_ms']:8.3f} ms  p95 {resumo['p95_ms']:8.3f} ms")
+
+    caminho = salvar('micro', {**volumes, 'repeticoes': args.repeticoes}, resultados, args.saida)
+    print(f"Resultados salvos em {caminho}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/planos.py - Verifica pelo EXPLAIN QUERY PLAN (SQLite) se as consultas de pedidos
+# e do catálogo de produtos usam índice, sem varredura completa da tabela nem ordenação em memória
+#
+# Uso: python -m benchmarks.planos [--pedidos 2000] [--produtos 5000]   (código 1 se algum plano falhar)
+# As consultas verificadas e as asserções ficam em tests/test_planos.py
+
+import argparse
+import os
+import sys
+from typing import Callable, List, Tuple
+
+# Trechos de plano que indicam consulta sem índice adequado
+SINAIS_RUINS = ('USE TEMP B-TREE FOR ORDER BY', 'USE TEMP B-TREE FOR RIGHT PART OF ORDER BY')
+
+
+def capturar_consulta(engine, executar: Callable[[], object], tabela: str) -> Tuple[str, tuple]:
+    # Primeira consulta sobre a tabela emitida pelo método (a principal; no caso de pedidos,
+    # as demais são o carregamento dos itens via selectinload)
+    from sqlalchemy import event
+
+    capturadas = []
+
+    def registrar(conexao, cursor, comando, parametros, contexto, executemany):
+        if comando.lstrip().upper().startswith('SELECT') and f'FROM {tabela}' in comando:
+            capturadas.append((comando, parametros))
+
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        executar()
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+    return capturadas[0]
+
+
+def explicar(engine, comando: str, parametros: tuple) -> List[str]:
+    with engine.connect() as conexao:
+        cursor = conexao.connection.cursor()
+        return [linha[-1] for linha in cursor.execute(f'EXPLAIN QUERY PLAN {comando}', parametros)]
+
+
+def plano_ruim(plano: List[str]) -> bool:
+    for linha in plano:
+        if any(sinal in linha for sinal in SINAIS_RUINS):
+            return True
+        # Varredura completa de pedidos (SCAN sem índice)
+        if linha.startswith('SCAN pedidos') and 'INDEX' not in linha:
+            return True
+    return False
+
+
+def plano_catalogo_ruim(plano: List[str]) -> bool:
+    # A página de ids precisa sair só do índice parcial (COVERING INDEX); a ordenação
+    # que aparece depois é a das linhas da página, já limitadas
+    return not any('COVERING INDEX ix_produtos_ativos_' in linha for linha in plano)
+
+
+def main():
+    # As verificações são os testes de tests/test_planos.py; aqui só com volumes maiores
+    parser = argparse.ArgumentParser(description='Planos de execução das consultas de pedidos e produtos')
+    parser.add_argument('--pedidos', type=int, default=2000)
+    parser.add_argument('--produtos', type=int, default=5000)
+    args = parser.parse_args()
+
+    import pytest
+
+    os.environ['PLANOS_PEDIDOS'] = str(args.pedidos)
+    os.environ['PLANOS_PRODUTOS'] = str(args.produtos)
+    testes = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'test_planos.py')
+    sys.exit(1 if pytest.main(['-q', testes]) else 0)
+
+
+if __name__ == '__main__':
+    main()
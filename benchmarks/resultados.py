@@ -0,0 +1,100 @@
+# benchmarks/resultados.py - Gravação e comparação de resultados em JSON
+#
+# Uso: python -m benchmarks.resultados antes.json depois.json
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+def percentil(valores: List[float], fracao: float) -> float:
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    # Método nearest-rank
+    return ordenados[max(0, math.ceil(fracao * len(ordenados)) - 1)]
+
+
+def resumir(duracoes_ms: List[float]) -> Dict[str, float]:
+    return {
+        'amostras': len(duracoes_ms),
+        'media_ms': round(sum(duracoes_ms) / len(duracoes_ms), 4) if duracoes_ms else 0.0,
+        'p50_ms': round(percentil(duracoes_ms, 0.50), 4),
+        'p95_ms': round(percentil(duracoes_ms, 0.95), 4),
+        'p99_ms': round(percentil(duracoes_ms, 0.99), 4),
+        'min_ms': round(min(duracoes_ms), 4) if duracoes_ms else 0.0,
+        'max_ms': round(max(duracoes_ms), 4) if duracoes_ms else 0.0
+    }
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def salvar(nome: str, parametros: Dict[str, Any], resultados: Dict[str, Any], caminho: str = None) -> str:
+    commit = _commit_atual()
+    if caminho is None:
+        os.makedirs(DIRETORIO_PADRAO, exist_ok=True)
+        caminho = os.path.join(DIRETORIO_PADRAO, f"{nome}-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+    documento = {
+        'benchmark': nome,
+        'commit': commit,
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'parametros': parametros,
+        'resultados': resultados
+    }
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def _metricas_planas(resultados: Dict[str, Any], prefixo: str = '') -> Dict[str, float]:
+    planas = {}
+    for chave, valor in resultados.items():
+        if isinstance(valor, dict):
+            planas.update(_metricas_planas(valor, f'{prefixo}{chave}.'))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            planas[f'{prefixo}{chave}'] = valor
+    return planas
+
+
+def comparar(caminho_antes: str, caminho_depois: str) -> None:
+    with open(caminho_antes, encoding='utf-8') as arquivo:
+        antes = json.load(arquivo)
+    with open(caminho_depois, encoding='utf-8') as arquivo:
+        depois = json.load(arquivo)
+
+    print(f"{antes['benchmark']}: {antes['commit']} -> {depois['commit']}")
+    metricas_antes = _metricas_planas(antes['resultados'])
+    metricas_depois = _metricas_planas(depois['resultados'])
+    for chave in sorted(metricas_antes.keys() & metricas_depois.keys()):
+        valor_antes, valor_depois = metricas_antes[chave], metricas_depois[chave]
+        variacao = f'{(valor_depois - valor_antes) / valor_antes * 100:+.1f}%' if valor_antes else 'n/a'
+        print(f'{chave:<55} {valor_antes:>12.3f} {valor_depois:>12.3f} {variacao:>9}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dois resultados de benchmark')
+    parser.add_argument('antes')
+    parser.add_argument('depois')
+    args = parser.parse_args()
+    comparar(args.antes, args.depois)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/serializacao.py - stdlib json x orjson nas respostas de GET /api/pedidos
+#
+# Uso: python -m benchmarks.serializacao --pedidos 10000 --repeticoes 5
+
+import argparse
+import time
+from typing import Dict, List
+
+
+def percorrer_listagem(cliente, limite: int) -> int:
+    # Percorre todas as páginas de GET /api/pedidos seguindo o next_cursor
+    caminho = f'/api/pedidos?limit={limite}'
+    linhas = 0
+    while caminho:
+        corpo = cliente.get(caminho).get_json()
+        linhas += corpo['count']
+        cursor = corpo.get('next_cursor')
+        caminho = f'/api/pedidos?limit={limite}&after={cursor}' if cursor else None
+    return linhas
+
+
+def medir_provedor(app, usar_orjson: bool, repeticoes: int, limite: int) -> Dict[str, Dict]:
+    from benchmarks.resultados import resumir
+    from repositories.pedido import PedidoRepository
+
+    app.json.usar_orjson = usar_orjson
+    cliente = app.test_client()
+
+    listagem: List[float] = []
+    exportacao: List[float] = []
+    codificacao: List[float] = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        percorrer_listagem(cliente, limite)
+        listagem.append((time.perf_counter() - inicio) * 1000)
+
+        inicio = time.perf_counter()
+        cliente.get('/api/pedidos/export').get_data()
+        exportacao.append((time.perf_counter() - inicio) * 1000)
+
+    # Só a codificação: os dicts já montados, sem banco nem to_dict
+    with app.app_context():
+        documentos = [pedido.to_dict() for pedido in PedidoRepository.iterar_todos()]
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            app.json.response({'success': True, 'data': documentos, 'count': len(documentos)})
+            codificacao.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'listagem_paginada': resumir(listagem),
+        'exportacao_ndjson': resumir(exportacao),
+        'somente_codificacao': resumir(codificacao)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Comparação dos provedores JSON')
+    parser.add_argument('--url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--pedidos', type=int, default=10000)
+    parser.add_argument('--itens-por-pedido', type=int, default=3)
+    parser.add_argument('--limite', type=int, default=500, help='Tamanho da página da listagem')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: benchmarks/resultados/)')
+    args = parser.parse_args()
+
+    from benchmarks.ambiente import preparar_app
+    from benchmarks.dados import gerar_dados
+    from benchmarks.resultados import salvar
+    from serializacao import orjson
+
+    if orjson is None:
+        parser.error('orjson não está instalado; não há o que comparar')
+
+    app = preparar_app(args.url)
+    volumes = gerar_dados(app, pedidos=args.pedidos, itens_por_pedido=args.itens_por_pedido)
+
+    # As duas implementações precisam gerar o mesmo documento
+    cliente = app.test_client()
+    app.json.usar_orjson = False
+    esperado = cliente.get(f'/api/pedidos?limit={args.limite}').get_json()
+    app.json.usar_orjson = True
+    if cliente.get(f'/api/pedidos?limit={args.limite}').get_json() != esperado:
+        raise SystemExit('orjson e stdlib geraram respostas diferentes')
+
+    resultados = {
+        'stdlib': medir_provedor(app, False, args.repeticoes, args.limite),
+        'orjson': medir_provedor(app, True, args.repeticoes, args.limite)
+    }
+    for cenario in resultados['stdlib']:
+        antes = resultados['stdlib'][cenario]['media_ms']
+        depois = resultados['orjson'][cenario]['media_ms']
+        print(f"{cenario:<22} stdlib {antes:9.1f} ms   orjson {depois:9.1f} ms   ({antes / depois:4.2f}x)")
+
+    caminho = salvar('serializacao', {**volumes, 'limite': args.limite, 'repeticoes': args.repeticoes},
+                     resultados, args.saida)
+    print(f"Resultados salvos em {caminho}")
+
+
+if __name__ == '__main__':
+    main()
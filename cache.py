@@ -0,0 +1,157 @@
+# cache.py - Cache de leitura com backend plugável (LRU em memória com TTL por padrão)
+
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class BackendCache(ABC):
+    # Interface que um backend externo (ex.: Redis, memcached) precisa implementar
+
+    @abstractmethod
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def definir(self, chave: Hashable, valor: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def remover(self, chave: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def limpar(self) -> None:
+        ...
+
+    def tamanho(self) -> Optional[int]:
+        return None
+
+
+class CacheLRU(BackendCache):
+    # LRU em memória do processo; entradas expiram após o TTL mesmo sem invalidação
+
+    def __init__(self, capacidade: int = 1024):
+        if capacidade <= 0:
+            raise ValueError("Capacidade do cache deve ser positiva")
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+
+            valor, expira_em = entrada
+            if expira_em <= time.monotonic():
+                del self._entradas[chave]
+                return None
+
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def definir(self, chave: Hashable, valor: Any, ttl: float) -> None:
+        with self._lock:
+            self._entradas[chave] = (valor, time.monotonic() + ttl)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+    def remover(self, chave: Hashable) -> None:
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def tamanho(self) -> Optional[int]:
+        return len(self._entradas)
+
+
+class Cache:
+    # Fachada usada pelos serviços: aplica o TTL, conta acertos e falhas e impede que uma
+    # leitura antiga do banco sobrescreva um valor mais novo. No backend cada entrada é
+    # guardada como (versao, valor).
+
+    def __init__(self, backend: BackendCache, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        # Chave -> momento (monotonic) da última invalidação, pelo tempo de um TTL
+        self._invalidacoes = OrderedDict()
+
+    @classmethod
+    def do_ambiente(cls, prefixo: str) -> 'Cache':
+        # Ex.: CACHE_PRODUTOS_TTL=30, CACHE_PRODUTOS_CAPACIDADE=1024
+        capacidade = int(os.getenv(f'{prefixo}_CAPACIDADE', 1024))
+        ttl = float(os.getenv(f'{prefixo}_TTL', 30))
+        return cls(CacheLRU(capacidade), ttl=ttl)
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        entrada = self.backend.obter(chave)
+        # "+=" não é atômico entre threads: sem o lock, incrementos concorrentes se perdem
+        with self._lock:
+            if entrada is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        return None if entrada is None else entrada[1]
+
+    def iniciar_leitura(self) -> float:
+        # Chamado antes de ler do banco; o resultado vai para definir(lido_em=...)
+        return time.monotonic()
+
+    def definir(self, chave: Hashable, valor: Any, versao: Optional[int] = None,
+                lido_em: Optional[float] = None) -> bool:
+        # Só grava se a leitura começou depois da última invalidação da chave (senão pode
+        # ser a linha de antes da escrita) e se não há versão igual ou mais nova guardada.
+        # A comparação é atômica neste processo; um backend compartilhado precisaria de CAS.
+        with self._lock:
+            invalidada_em = self._invalidacoes.get(chave)
+            if invalidada_em is not None and lido_em is not None and lido_em <= invalidada_em:
+                return False
+
+            atual = self.backend.obter(chave)
+            if atual is not None and versao is not None and atual[0] is not None and atual[0] >= versao:
+                return False
+
+            self.backend.definir(chave, (versao, valor), self.ttl)
+            return True
+
+    def invalidar(self, *chaves: Hashable) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            for chave in chaves:
+                self.backend.remover(chave)
+                self._invalidacoes[chave] = agora
+                self._invalidacoes.move_to_end(chave)
+
+            # Leituras mais antigas que um TTL já não chegam a gravar: descarta as marcas velhas
+            while self._invalidacoes:
+                chave, invalidada_em = next(iter(self._invalidacoes.items()))
+                if agora - invalidada_em <= self.ttl:
+                    break
+                self._invalidacoes.popitem(last=False)
+
+    def limpar(self) -> None:
+        self.backend.limpar()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            acertos, falhas = self.acertos, self.falhas
+        total = acertos + falhas
+        return {
+            'acertos': acertos,
+            'falhas': falhas,
+            'taxa_acerto': round(acertos / total, 4) if total else None,
+            'tamanho': self.backend.tamanho(),
+            'ttl': self.ttl
+        }
@@ -0,0 +1,99 @@
+# config.py - Opções do engine e da conexão com o banco lidas do ambiente
+
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from typing import Any, Dict
+from metricas import PoolInstrumentado
+
+NIVEIS_SYNCHRONOUS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+
+def _sqlite_em_memoria(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def opcoes_engine(url: str) -> Dict[str, Any]:
+    # DB_POOL_PRE_PING testa a conexão antes de usar (evita erros após queda/reinício do banco)
+    opcoes = {'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)}
+
+    # SQLite em memória usa pool de conexão única; as opções de QueuePool não se aplicam
+    if _sqlite_em_memoria(url):
+        return opcoes
+
+    opcoes.update({
+        'poolclass': PoolInstrumentado,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))
+    })
+    return opcoes
+
+
+def configurar_conexoes(engine) -> None:
+    # Aplica pragmas e timeout de comando a cada nova conexão física do engine
+    timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+
+    if engine.dialect.name == 'sqlite':
+        _configurar_sqlite(engine, timeout_ms)
+    elif timeout_ms > 0 and engine.dialect.name == 'postgresql':
+        _executar_ao_conectar(engine, f'SET statement_timeout = {timeout_ms}')
+    elif timeout_ms > 0 and engine.dialect.name in ('mysql', 'mariadb'):
+        _executar_ao_conectar(engine, f'SET SESSION MAX_EXECUTION_TIME = {timeout_ms}')
+
+
+def _executar_ao_conectar(engine, comando: str) -> None:
+    @event.listens_for(engine, 'connect')
+    def executar(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        cursor.execute(comando)
+        cursor.close()
+
+
+def _configurar_sqlite(engine, timeout_ms: int) -> None:
+    wal = _env_bool('SQLITE_WAL', True)
+    synchronous = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    if synchronous not in NIVEIS_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS inválido. Valores válidos: {list(NIVEIS_SYNCHRONOUS)}")
+    busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        # WAL permite leituras concorrentes com uma escrita em andamento
+        if wal:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.execute(f'PRAGMA busy_timeout={busy_timeout_ms}')
+        cursor.close()
+
+        if timeout_ms > 0:
+            # SQLite não tem statement_timeout: o progress handler interrompe o comando
+            # que passar do prazo definido em before_cursor_execute
+            prazo = registro.info.setdefault('prazo_comando', [None])
+            conexao_dbapi.set_progress_handler(
+                lambda: 1 if prazo[0] is not None and time.monotonic() > prazo[0] else 0, 10000
+            )
+
+    if timeout_ms > 0:
+        @event.listens_for(engine, 'before_cursor_execute')
+        def iniciar_prazo(conexao, cursor, comando, parametros, contexto, executemany):
+            prazo = conexao.connection.info.get('prazo_comando')
+            if prazo is not None:
+                prazo[0] = time.monotonic() + timeout_ms / 1000
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def encerrar_prazo(conexao, cursor, comando, parametros, contexto, executemany):
+            prazo = conexao.connection.info.get('prazo_comando')
+            if prazo is not None:
+                prazo[0] = None
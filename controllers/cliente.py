@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from services.cliente import ClienteService
+from hash_senha import ServicoSenhaSobrecarregado
+from controllers.parametros import parametro_int
 from typing import Dict, Any
 
 # Criação do Blueprint para clientes
@@ -11,14 +13,23 @@ cliente_service = ClienteService()
 
 @cliente_bp.route('', methods=['GET'])
 def listar_todos_clientes():
-    # GET /api/clientes - Lista todos os clientes
+    # GET /api/clientes?limit=&after= - Lista clientes paginados por cursor
     try:
-        clientes = cliente_service.listar_todos_clientes()
+        clientes, proximo_cursor = cliente_service.listar_clientes_paginado(
+            limite=parametro_int('limit'),
+            cursor=request.args.get('after')
+        )
         return jsonify({
             'success': True,
             'data': [cliente.to_dict() for cliente in clientes],
-            'count': len(clientes)
+            'count': len(clientes),
+            'next_cursor': proximo_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -50,9 +61,13 @@ def buscar_cliente_por_id(cliente_id: int):
 
 @cliente_bp.route('/nome/<string:nome>', methods=['GET'])
 def buscar_clientes_por_nome(nome: str):
-    # GET /api/clientes/nome/{nome} - Busca clientes por nome
+    # GET /api/clientes/nome/{nome}?limit=&offset= - Busca clientes por nome, ordenados por relevância
     try:
-        clientes = cliente_service.buscar_clientes_por_nome(nome)
+        clientes = cliente_service.buscar_clientes_por_nome(
+            nome,
+            limite=parametro_int('limit'),
+            deslocamento=parametro_int('offset')
+        )
         return jsonify({
             'success': True,
             'data': [cliente.to_dict() for cliente in clientes],
@@ -124,6 +139,11 @@ def criar_cliente():
             'success': False,
             'message': str(e)
         }), 400
+    except ServicoSenhaSobrecarregado as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
@@ -131,6 +151,43 @@ def criar_cliente():
         }), 500
 
 
+@cliente_bp.route('/bulk', methods=['POST'])
+def criar_clientes_em_lote():
+    # POST /api/clientes/bulk - Cria vários clientes de uma vez; linhas inválidas são reportadas sem abortar o lote
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'Dados JSON não fornecidos'
+            }), 400
+
+        resultado = cliente_service.criar_clientes_em_lote(data)
+
+        return jsonify({
+            'success': resultado['criados'] > 0,
+            'message': f"{resultado['criados']} clientes criados, {len(resultado['erros'])} com erro",
+            'data': resultado
+        }), 201 if resultado['criados'] > 0 else 400
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except ServicoSenhaSobrecarregado as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao criar clientes em lote: {str(e)}'
+        }), 500
+
+
 @cliente_bp.route('/<int:cliente_id>', methods=['PUT'])
 def atualizar_cliente(cliente_id: int):
     # PUT /api/clientes/{id} - Atualiza um cliente existente
@@ -167,6 +224,11 @@ def atualizar_cliente(cliente_id: int):
             'success': False,
             'message': str(e)
         }), 400
+    except ServicoSenhaSobrecarregado as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
@@ -239,6 +301,11 @@ def autenticar_cliente():
             'data': cliente.to_dict()
         }), 200
 
+    except ServicoSenhaSobrecarregado as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
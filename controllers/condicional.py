@@ -0,0 +1,74 @@
+from flask import Response, jsonify, request
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import hashlib
+import re
+
+# ETag das entidades versionadas (Produto, Pedido): "v<versao>", com um sufixo "-<marca>"
+# quando a representação também depende de linhas de outras tabelas
+_ETAG_VERSAO = re.compile(r'v(\d+)(?:-[0-9a-f]+)?')
+
+
+def etag_da_versao(versao: int, dependencias: Optional[datetime] = None) -> str:
+    if dependencias is None:
+        return f'v{versao}'
+    return f'v{versao}-{int(dependencias.replace(tzinfo=timezone.utc).timestamp() * 1_000_000):x}'
+
+
+def etag_de(*partes: Any) -> str:
+    # ETag opaca para representações sem versão própria (listagens)
+    return hashlib.blake2b(repr(partes).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def versao_do_if_match() -> Optional[int]:
+    # If-Match: "v3" -> 3. Sem o cabeçalho (ou com *), a escrita não é condicional
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+
+    etags = if_match.as_set()
+    correspondencia = _ETAG_VERSAO.fullmatch(next(iter(etags))) if len(etags) == 1 else None
+    if not correspondencia:
+        raise ValueError('If-Match deve conter uma única ETag no formato "v<versao>"')
+    return int(correspondencia.group(1))
+
+
+def nao_modificado(etag: str, ultima_modificacao: Optional[datetime] = None) -> Optional[Response]:
+    # 304 quando o cliente já tem a representação atual. Chamado com o resultado de uma
+    # sondagem barata, antes de carregar e serializar; None = seguir com a resposta completa
+    if request.if_none_match:
+        corresponde = request.if_none_match.contains_weak(etag)
+    else:
+        # If-Modified-Since só vale na ausência de If-None-Match (resolução de segundos)
+        corresponde = (request.if_modified_since is not None and ultima_modificacao is not None
+                       and _em_segundos(ultima_modificacao) <= request.if_modified_since)
+
+    if not corresponde:
+        return None
+    return _com_validadores(Response(status=304), etag, ultima_modificacao)
+
+
+def resposta_condicional(corpo: Dict[str, Any], etag: str,
+                         ultima_modificacao: Optional[datetime] = None) -> Response:
+    return _com_validadores(jsonify(corpo), etag, ultima_modificacao)
+
+
+def resposta_versionada(corpo: Dict[str, Any], versao: int, status: int = 200) -> Response:
+    # Resposta JSON com a ETag da versão, para o cliente enviar de volta no If-Match
+    resposta = _com_validadores(jsonify(corpo), etag_da_versao(versao))
+    resposta.status_code = status
+    return resposta
+
+
+def _com_validadores(resposta: Response, etag: str, ultima_modificacao: Optional[datetime] = None) -> Response:
+    resposta.set_etag(etag)
+    if ultima_modificacao is not None:
+        resposta.last_modified = _em_segundos(ultima_modificacao)
+    # Permite guardar a resposta, mas exige revalidação (If-None-Match) a cada uso
+    resposta.cache_control.no_cache = True
+    return resposta
+
+
+def _em_segundos(momento: datetime) -> datetime:
+    # Colunas guardam UTC sem fuso; cabeçalhos HTTP têm resolução de segundos
+    return momento.replace(microsecond=0, tzinfo=timezone.utc)
@@ -0,0 +1,96 @@
+from flask import Blueprint, Response, jsonify, make_response, request
+from functools import wraps
+from services.idempotencia import IdempotenciaService
+from models.chave_idempotencia import ChaveIdempotencia
+
+# Blueprint só com os comandos de manutenção (flask --app app idempotencia ...)
+idempotencia_bp = Blueprint('idempotencia', __name__)
+
+# Instância do serviço
+idempotencia_service = IdempotenciaService()
+
+# Além dos 5xx, respostas que não são guardadas (conflito e limite de taxa são
+# passageiros): a repetição executa de novo
+CODIGOS_NAO_GUARDADOS = (409, 429)
+
+# Cabeçalhos da resposta original que as repetições recebem de volta
+CABECALHOS_GUARDADOS = ('Content-Type', 'ETag', 'Last-Modified', 'Location', 'Cache-Control')
+
+
+def idempotente(funcao):
+    # Para POSTs: com o cabeçalho Idempotency-Key, a primeira requisição executa e tem a
+    # resposta guardada; repetições com a mesma chave recebem essa resposta sem tocar nas
+    # tabelas de negócio. Sem o cabeçalho, a rota se comporta como antes.
+    @wraps(funcao)
+    def executar(*args, **kwargs):
+        chave = request.headers.get('Idempotency-Key')
+        if chave is None:
+            return funcao(*args, **kwargs)
+
+        try:
+            # A API não tem autenticação própria: o chamador é o cabeçalho Authorization, se houver
+            chave = idempotencia_service.chave_no_escopo(chave, request.method, request.path,
+                                                         request.headers.get('Authorization'))
+            corpo = request.get_json(silent=True)
+            hash_requisicao = idempotencia_service.calcular_hash(
+                request.method, request.path, corpo if corpo is not None else request.get_data(as_text=True)
+            )
+            existente = idempotencia_service.reservar(chave, hash_requisicao)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Erro ao verificar Idempotency-Key: {str(e)}'
+            }), 500
+
+        if existente is not None:
+            return _responder_existente(existente, hash_requisicao)
+
+        try:
+            resposta = make_response(funcao(*args, **kwargs))
+        except Exception:
+            idempotencia_service.liberar(chave)
+            raise
+
+        # A resposta é guardada depois do commit da rota: se o processo cair entre os dois,
+        # a reserva vence (DURACAO_RESERVA_S) e a próxima tentativa executa de novo
+        if resposta.status_code >= 500 or resposta.status_code in CODIGOS_NAO_GUARDADOS:
+            idempotencia_service.liberar(chave)
+        else:
+            idempotencia_service.concluir(chave, resposta.status_code, resposta.get_data(as_text=True), {
+                nome: resposta.headers[nome] for nome in CABECALHOS_GUARDADOS if nome in resposta.headers
+            })
+        return resposta
+    return executar
+
+
+def _responder_existente(registro: ChaveIdempotencia, hash_requisicao: str):
+    if registro.hash_requisicao != hash_requisicao:
+        return jsonify({
+            'success': False,
+            'message': 'Idempotency-Key já usado com uma requisição diferente'
+        }), 422
+
+    if registro.status == ChaveIdempotencia.EM_ANDAMENTO:
+        resposta = jsonify({
+            'success': False,
+            'message': 'Requisição com este Idempotency-Key ainda em andamento'
+        })
+        resposta.status_code = 409
+        resposta.headers['Retry-After'] = '1'
+        return resposta
+
+    resposta = Response(registro.corpo, status=registro.codigo_status, mimetype='application/json')
+    resposta.headers.update(registro.cabecalhos or {})
+    resposta.headers['Idempotent-Replayed'] = 'true'
+    return resposta
+
+
+@idempotencia_bp.cli.command('limpar')
+def limpar_chaves():
+    # flask --app app idempotencia limpar - Remove chaves com TTL vencido
+    print(f"✅ Chaves removidas: {idempotencia_service.limpar_expiradas()}")
@@ -0,0 +1,44 @@
+from flask import Blueprint, jsonify
+from db import db
+from metricas import PoolInstrumentado, metricas_requisicoes
+
+# Criação do Blueprint para métricas operacionais
+metricas_bp = Blueprint('metricas', __name__, url_prefix='/api/metricas')
+
+
+@metricas_bp.route('/pool', methods=['GET'])
+def metricas_pool():
+    # GET /api/metricas/pool - Ocupação e latência de checkout dos pools de conexão
+    try:
+        pools = {}
+        for bind, engine in db.engines.items():
+            nome = bind or 'principal'
+            if isinstance(engine.pool, PoolInstrumentado):
+                pools[nome] = engine.pool.relatorio()
+            else:
+                pools[nome] = {'status': engine.pool.status()}
+
+        return jsonify({
+            'success': True,
+            'data': pools
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter métricas do pool: {str(e)}'
+        }), 500
+
+
+@metricas_bp.route('/requisicoes', methods=['GET'])
+def metricas_por_rota():
+    # GET /api/metricas/requisicoes - Histograma de latência, SQL e serialização por rota
+    try:
+        return jsonify({
+            'success': True,
+            'data': metricas_requisicoes.resumo()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter métricas de requisições: {str(e)}'
+        }), 500
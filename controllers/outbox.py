@@ -0,0 +1,49 @@
+import click
+from flask import Blueprint, current_app, jsonify
+from services.outbox import OutboxService
+from worker import TrabalhadorOutbox
+
+# Criação do Blueprint para a outbox de eventos
+outbox_bp = Blueprint('outbox', __name__, url_prefix='/api/outbox')
+
+# Instância do serviço
+outbox_service = OutboxService()
+
+
+@outbox_bp.route('', methods=['GET'])
+def estatisticas_outbox():
+    # GET /api/outbox - Eventos por status e falhas mais recentes
+    try:
+        return jsonify({
+            'success': True,
+            'data': outbox_service.obter_estatisticas()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter estatísticas da outbox: {str(e)}'
+        }), 500
+
+
+@outbox_bp.cli.command('processar')
+def processar_outbox():
+    # flask --app app outbox processar - Trabalhador em primeiro plano (Ctrl+C para parar)
+    trabalhador = TrabalhadorOutbox.do_ambiente(current_app._get_current_object())
+    print("✅ Trabalhador da outbox iniciado")
+    try:
+        trabalhador.executar()
+    except KeyboardInterrupt:
+        print("Trabalhador da outbox encerrado")
+
+
+@outbox_bp.cli.command('drenar')
+def drenar_outbox():
+    # flask --app app outbox drenar - Processa tudo o que está disponível agora e sai
+    print(f"✅ Eventos processados: {outbox_service.drenar()}")
+
+
+@outbox_bp.cli.command('limpar')
+@click.option('--dias', default=7, show_default=True, help='Mantém os eventos processados nos últimos N dias')
+def limpar_outbox(dias):
+    # flask --app app outbox limpar --dias 7 - Remove eventos já processados
+    print(f"✅ Eventos removidos: {outbox_service.limpar_processados(dias)}")
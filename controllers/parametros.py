@@ -0,0 +1,30 @@
+from flask import request
+from typing import Optional
+import math
+
+# Leitura estrita de parâmetros numéricos da query string. request.args.get(..., type=int)
+# devolve None para um valor inválido e o filtro seria ignorado em silêncio; aqui o valor
+# inválido vira ValueError, que os controllers respondem com 400.
+
+
+def parametro_int(nome: str) -> Optional[int]:
+    valor = request.args.get(nome)
+    if valor is None:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"Parâmetro {nome} deve ser um número inteiro")
+
+
+def parametro_float(nome: str) -> Optional[float]:
+    valor = request.args.get(nome)
+    if valor is None:
+        return None
+    try:
+        numero = float(valor)
+    except ValueError:
+        raise ValueError(f"Parâmetro {nome} deve ser um número")
+    if not math.isfinite(numero):
+        raise ValueError(f"Parâmetro {nome} deve ser um número")
+    return numero
@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
-from services.pedido import PedidoService
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from services.pedido import PedidoService, TRANSICOES
 from models.pedido import StatusPedido
+from services.versao import ConflitoVersao
+from controllers.idempotencia import idempotente
+from controllers.condicional import (etag_da_versao, versao_do_if_match, nao_modificado,
+                                     resposta_condicional)
+from controllers.parametros import parametro_int
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 # Criação do Blueprint para pedidos
 pedido_bp = Blueprint('pedidos', __name__, url_prefix='/api/pedidos')
@@ -11,16 +16,36 @@ pedido_bp = Blueprint('pedidos', __name__, url_prefix='/api/pedidos')
 pedido_service = PedidoService()
 
 
+def _validadores(sonda: Tuple[int, datetime, datetime]) -> Tuple[str, datetime]:
+    # ETag e Last-Modified do pedido, os mesmos no GET e nas respostas das escritas: a
+    # representação inclui cliente e produtos, então a ETag também depende dessas linhas
+    versao, atualizado_em, dependencias = sonda
+    return etag_da_versao(versao, dependencias), max(atualizado_em, dependencias)
+
+
+def _resposta_do_pedido(corpo: Dict[str, Any], pedido) -> Response:
+    return resposta_condicional(corpo, *_validadores(pedido_service.sonda_do_pedido(pedido)))
+
+
 @pedido_bp.route('', methods=['GET'])
 def listar_todos_pedidos():
-    # GET /api/pedidos - Lista todos os pedidos
+    # GET /api/pedidos?limit=&after= - Lista pedidos paginados por cursor (mais recentes primeiro)
     try:
-        pedidos = pedido_service.listar_todos_pedidos()
+        pedidos, proximo_cursor = pedido_service.listar_pedidos_paginado(
+            limite=parametro_int('limit'),
+            cursor=request.args.get('after')
+        )
         return jsonify({
             'success': True,
             'data': [pedido.to_dict() for pedido in pedidos],
-            'count': len(pedidos)
+            'count': len(pedidos),
+            'next_cursor': proximo_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -28,10 +53,34 @@ def listar_todos_pedidos():
         }), 500
 
 
+@pedido_bp.route('/export', methods=['GET'])
+def exportar_pedidos():
+    # GET /api/pedidos/export - Exporta todos os pedidos em NDJSON (um pedido por linha)
+    def gerar_linhas():
+        for pedido in pedido_service.exportar_pedidos():
+            yield current_app.json.dumps(pedido.to_dict()) + '\n'
+
+    return Response(stream_with_context(gerar_linhas()), mimetype='application/x-ndjson')
+
+
 @pedido_bp.route('/<int:pedido_id>', methods=['GET'])
 def buscar_pedido_por_id(pedido_id: int):
-    # GET /api/pedidos/{id} - Busca pedido por ID
+    # GET /api/pedidos/{id} - Busca pedido por ID (304 se o cliente já tem a versão atual)
     try:
+        # A representação inclui o nome do cliente e dos produtos: a ETag combina a versão
+        # do pedido com a última atualização dessas linhas
+        sonda = pedido_service.sondar_pedido(pedido_id)
+        if sonda is None:
+            return jsonify({
+                'success': False,
+                'message': 'Pedido não encontrado'
+            }), 404
+
+        etag, ultima_modificacao = _validadores(sonda)
+        resposta = nao_modificado(etag, ultima_modificacao)
+        if resposta is not None:
+            return resposta
+
         pedido = pedido_service.buscar_pedido_por_id(pedido_id)
         if not pedido:
             return jsonify({
@@ -39,10 +88,10 @@ def buscar_pedido_por_id(pedido_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return resposta_condicional({
             'success': True,
             'data': pedido.to_dict()
-        }), 200
+        }, etag, ultima_modificacao)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -93,6 +142,36 @@ def buscar_pedidos_por_status(status: str):
         }), 500
 
 
+@pedido_bp.route('/periodo', methods=['GET'])
+def buscar_pedidos_por_periodo():
+    # GET /api/pedidos/periodo?inicio=&fim=&status=&cliente_id=&limit=&after= - Pedidos no período
+    try:
+        pedidos, proximo_cursor = pedido_service.buscar_pedidos_por_periodo(
+            inicio=request.args.get('inicio'),
+            fim=request.args.get('fim'),
+            status=request.args.get('status'),
+            cliente_id=parametro_int('cliente_id'),
+            limite=parametro_int('limit'),
+            cursor=request.args.get('after')
+        )
+        return jsonify({
+            'success': True,
+            'data': [pedido.to_dict() for pedido in pedidos],
+            'count': len(pedidos),
+            'next_cursor': proximo_cursor
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao buscar pedidos por período: {str(e)}'
+        }), 500
+
+
 @pedido_bp.route('/contar', methods=['GET'])
 def contar_pedidos():
     # GET /api/pedidos/contar - Retorna o número total de pedidos
@@ -110,8 +189,9 @@ def contar_pedidos():
 
 
 @pedido_bp.route('', methods=['POST'])
+@idempotente
 def criar_pedido():
-    # POST /api/pedidos - Cria um novo pedido
+    # POST /api/pedidos - Cria um novo pedido (aceita Idempotency-Key)
     try:
         data = request.get_json()
 
@@ -152,6 +232,7 @@ def criar_pedido():
 
 
 @pedido_bp.route('/<int:pedido_id>/produtos', methods=['POST'])
+@idempotente
 def adicionar_produto_ao_pedido(pedido_id: int):
     # POST /api/pedidos/{id}/produtos - Adiciona produto ao pedido
     try:
@@ -182,12 +263,17 @@ def adicionar_produto_ao_pedido(pedido_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return _resposta_do_pedido({
             'success': True,
             'message': 'Produto adicionado ao pedido com sucesso',
             'data': pedido.to_dict()
-        }), 200
+        }, pedido)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -200,6 +286,53 @@ def adicionar_produto_ao_pedido(pedido_id: int):
         }), 500
 
 
+@pedido_bp.route('/<int:pedido_id>/produtos/lote', methods=['POST'])
+@idempotente
+def adicionar_produtos_ao_pedido(pedido_id: int):
+    # POST /api/pedidos/{id}/produtos/lote - Adiciona vários produtos ao pedido de uma vez
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'Dados JSON não fornecidos'
+            }), 400
+
+        pedido = pedido_service.adicionar_produtos_ao_pedido(
+            pedido_id=pedido_id,
+            itens=data
+        )
+
+        if not pedido:
+            return jsonify({
+                'success': False,
+                'message': 'Pedido não encontrado'
+            }), 404
+
+        return _resposta_do_pedido({
+            'success': True,
+            'message': 'Produtos adicionados ao pedido com sucesso',
+            'data': pedido.to_dict()
+        }, pedido)
+
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao adicionar produtos: {str(e)}'
+        }), 500
+
+
 @pedido_bp.route('/<int:pedido_id>/produtos/<int:produto_id>', methods=['DELETE'])
 def remover_produto_do_pedido(pedido_id: int, produto_id: int):
     # DELETE /api/pedidos/{pedido_id}/produtos/{produto_id} - Remove produto do pedido
@@ -215,12 +348,17 @@ def remover_produto_do_pedido(pedido_id: int, produto_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return _resposta_do_pedido({
             'success': True,
             'message': 'Produto removido do pedido com sucesso',
             'data': pedido.to_dict()
-        }), 200
+        }, pedido)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -237,7 +375,7 @@ def remover_produto_do_pedido(pedido_id: int, produto_id: int):
 def confirmar_pedido(pedido_id: int):
     # PUT /api/pedidos/{id}/confirmar - Confirma um pedido
     try:
-        pedido = pedido_service.confirmar_pedido(pedido_id)
+        pedido = pedido_service.confirmar_pedido(pedido_id, versao_esperada=versao_do_if_match())
 
         if not pedido:
             return jsonify({
@@ -245,12 +383,17 @@ def confirmar_pedido(pedido_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return _resposta_do_pedido({
             'success': True,
             'message': 'Pedido confirmado com sucesso',
             'data': pedido.to_dict()
-        }), 200
+        }, pedido)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -267,7 +410,7 @@ def confirmar_pedido(pedido_id: int):
 def cancelar_pedido(pedido_id: int):
     # PUT /api/pedidos/{id}/cancelar - Cancela um pedido
     try:
-        pedido = pedido_service.cancelar_pedido(pedido_id)
+        pedido = pedido_service.cancelar_pedido(pedido_id, versao_esperada=versao_do_if_match())
 
         if not pedido:
             return jsonify({
@@ -275,12 +418,17 @@ def cancelar_pedido(pedido_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return _resposta_do_pedido({
             'success': True,
             'message': 'Pedido cancelado com sucesso',
             'data': pedido.to_dict()
-        }), 200
+        }, pedido)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -310,7 +458,8 @@ def atualizar_status_pedido(pedido_id: int):
 
         pedido = pedido_service.atualizar_status_pedido(
             pedido_id=pedido_id,
-            novo_status=novo_status
+            novo_status=novo_status,
+            versao_esperada=versao_do_if_match()
         )
 
         if not pedido:
@@ -319,12 +468,17 @@ def atualizar_status_pedido(pedido_id: int):
                 'message': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        return _resposta_do_pedido({
             'success': True,
             'message': 'Status do pedido atualizado com sucesso',
             'data': pedido.to_dict()
-        }), 200
+        }, pedido)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         if "Invalid enum value" in str(e) or "is not a valid StatusPedido" in str(e):
             return jsonify({
@@ -342,6 +496,50 @@ def atualizar_status_pedido(pedido_id: int):
         }), 500
 
 
+@pedido_bp.route('/status/lote', methods=['PUT'])
+def atualizar_status_em_lote():
+    # PUT /api/pedidos/status/lote - Move vários pedidos para um status de uma vez
+    # Body: {"pedido_ids": [1, 2, ...], "status": "ENVIADO"}
+    try:
+        data = request.get_json()
+
+        if not data or 'status' not in data or 'pedido_ids' not in data:
+            return jsonify({
+                'success': False,
+                'message': 'Campos pedido_ids e status são obrigatórios'
+            }), 400
+
+        # Converter string para enum
+        novo_status = StatusPedido(str(data['status']).upper())
+
+        resultado = pedido_service.transicionar_pedidos_em_lote(
+            pedido_ids=data['pedido_ids'],
+            novo_status=novo_status
+        )
+
+        return jsonify({
+            'success': True,
+            'message': f"{resultado['atualizados']} pedido(s) atualizado(s) para {novo_status.value}",
+            'data': resultado
+        }), 200
+
+    except ValueError as e:
+        if "is not a valid StatusPedido" in str(e):
+            return jsonify({
+                'success': False,
+                'message': f'Status inválido. Valores válidos: {[s.value for s in StatusPedido]}'
+            }), 400
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao atualizar status em lote: {str(e)}'
+        }), 500
+
+
 @pedido_bp.route('/<int:pedido_id>', methods=['DELETE'])
 def deletar_pedido(pedido_id: int):
     # DELETE /api/pedidos/{id} - Deleta um pedido
@@ -359,6 +557,11 @@ def deletar_pedido(pedido_id: int):
             'message': 'Pedido deletado com sucesso'
         }), 200
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -375,7 +578,14 @@ def deletar_pedido(pedido_id: int):
 def listar_status_opcoes():
     # GET /api/pedidos/status/opcoes - Lista todas as opções de status disponíveis
     try:
-        opcoes = [{'value': status.value, 'name': status.name} for status in StatusPedido]
+        opcoes = [
+            {
+                'value': status.value,
+                'name': status.name,
+                'proximos': [destino.value for destino in TRANSICOES[status]]
+            }
+            for status in StatusPedido
+        ]
         return jsonify({
             'success': True,
             'data': opcoes
@@ -1,5 +1,9 @@
 from flask import Blueprint, request, jsonify
 from services.produto import ProdutoService
+from services.versao import ConflitoVersao
+from controllers.condicional import (etag_da_versao, etag_de, versao_do_if_match, nao_modificado,
+                                     resposta_condicional, resposta_versionada)
+from controllers.parametros import parametro_float, parametro_int
 from typing import Dict, Any
 
 # Criação do Blueprint para produtos
@@ -11,38 +15,109 @@ produto_service = ProdutoService()
 
 @produto_bp.route('', methods=['GET'])
 def listar_todos_produtos():
-    # GET /api/produtos - Lista todos os produtos
+    # GET /api/produtos?limit=&after= - Lista produtos paginados por cursor
+    # Responde 304 a If-None-Match/If-Modified-Since quando a página não mudou
     try:
         incluir_inativos = request.args.get('incluir_inativos', 'false').lower() == 'true'
-        produtos = produto_service.listar_todos_produtos(incluir_inativos=incluir_inativos)
+        limite = parametro_int('limit')
+        cursor = request.args.get('after')
 
+        # A sondagem vem antes da listagem: se algo mudar entre as duas, a ETag enviada é a
+        # antiga e o próximo GET condicional recebe a página inteira de novo
+        quantidade, soma_ids, ultima_atualizacao = produto_service.sondar_pagina(
+            limite=limite, cursor=cursor, incluir_inativos=incluir_inativos
+        )
+        etag = etag_de(quantidade, soma_ids, ultima_atualizacao)
+        resposta = nao_modificado(etag, ultima_atualizacao)
+        if resposta is not None:
+            return resposta
+
+        produtos, proximo_cursor = produto_service.listar_produtos_paginado(
+            limite=limite,
+            cursor=cursor,
+            incluir_inativos=incluir_inativos
+        )
+
+        return resposta_condicional({
+            'success': True,
+            'data': [produto.to_dict() for produto in produtos],
+            'count': len(produtos),
+            'next_cursor': proximo_cursor
+        }, etag, ultima_atualizacao)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao listar produtos: {str(e)}'
+        }), 500
+
+
+@produto_bp.route('/busca', methods=['GET'])
+def buscar_catalogo():
+    # GET /api/produtos/busca?preco_min=&preco_max=&nome=&em_estoque=&ativo=&ordenar=&limit=&after=
+    # ordenar: preco, -preco, nome ou -nome (padrão: preco)
+    try:
+        em_estoque = request.args.get('em_estoque')
+        produtos, proximo_cursor = produto_service.buscar_catalogo(
+            preco_min=parametro_float('preco_min'),
+            preco_max=parametro_float('preco_max'),
+            nome=request.args.get('nome'),
+            em_estoque=em_estoque.lower() == 'true' if em_estoque is not None else None,
+            ativo=request.args.get('ativo', 'true').lower() == 'true',
+            ordenar_por=request.args.get('ordenar', 'preco'),
+            limite=parametro_int('limit'),
+            cursor=request.args.get('after')
+        )
         return jsonify({
             'success': True,
             'data': [produto.to_dict() for produto in produtos],
-            'count': len(produtos)
+            'count': len(produtos),
+            'next_cursor': proximo_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Erro ao listar produtos: {str(e)}'
+            'message': f'Erro ao buscar produtos: {str(e)}'
         }), 500
 
 
 @produto_bp.route('/<int:produto_id>', methods=['GET'])
 def buscar_produto_por_id(produto_id: int):
-    # GET /api/produtos/{id} - Busca produto por ID
+    # GET /api/produtos/{id} - Busca produto por ID (304 se a versão do cliente é a atual)
     try:
-        produto = produto_service.buscar_produto_por_id(produto_id)
+        sonda = produto_service.sondar_produto(produto_id)
+        if sonda is None:
+            return jsonify({
+                'success': False,
+                'message': 'Produto não encontrado'
+            }), 404
+
+        versao, atualizado_em = sonda
+        resposta = nao_modificado(etag_da_versao(versao), atualizado_em)
+        if resposta is not None:
+            return resposta
+
+        # A cópia em cache só serve se estiver pelo menos na versão que o banco acabou de informar
+        produto = produto_service.buscar_produto_por_id(produto_id, versao_minima=versao)
         if not produto:
             return jsonify({
                 'success': False,
                 'message': 'Produto não encontrado'
             }), 404
 
-        return jsonify({
+        return resposta_condicional({
             'success': True,
             'data': produto.to_dict()
-        }), 200
+        }, etag_da_versao(produto.versao), produto.atualizado_em)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -52,9 +127,13 @@ def buscar_produto_por_id(produto_id: int):
 
 @produto_bp.route('/nome/<string:nome>', methods=['GET'])
 def buscar_produtos_por_nome(nome: str):
-    # GET /api/produtos/nome/{nome} - Busca produtos por nome
+    # GET /api/produtos/nome/{nome}?limit=&offset= - Busca produtos por nome, ordenados por relevância
     try:
-        produtos = produto_service.buscar_produtos_por_nome(nome)
+        produtos = produto_service.buscar_produtos_por_nome(
+            nome,
+            limite=parametro_int('limit'),
+            deslocamento=parametro_int('offset')
+        )
         return jsonify({
             'success': True,
             'data': [produto.to_dict() for produto in produtos],
@@ -135,6 +214,38 @@ def criar_produto():
         }), 500
 
 
+@produto_bp.route('/bulk', methods=['POST'])
+def criar_produtos_em_lote():
+    # POST /api/produtos/bulk - Cria vários produtos de uma vez; linhas inválidas são reportadas sem abortar o lote
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'Dados JSON não fornecidos'
+            }), 400
+
+        resultado = produto_service.criar_produtos_em_lote(data)
+
+        return jsonify({
+            'success': resultado['criados'] > 0,
+            'message': f"{resultado['criados']} produtos criados, {len(resultado['erros'])} com erro",
+            'data': resultado
+        }), 201 if resultado['criados'] > 0 else 400
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao criar produtos em lote: {str(e)}'
+        }), 500
+
+
 @produto_bp.route('/<int:produto_id>', methods=['PUT'])
 def atualizar_produto(produto_id: int):
     # PUT /api/produtos/{id} - Atualiza um produto existente
@@ -153,7 +264,8 @@ def atualizar_produto(produto_id: int):
             quantidade=data.get('quantidade'),
             preco=data.get('preco'),
             descricao=data.get('descricao'),
-            ativo=data.get('ativo')
+            ativo=data.get('ativo'),
+            versao_esperada=versao_do_if_match()
         )
 
         if not produto:
@@ -162,12 +274,17 @@ def atualizar_produto(produto_id: int):
                 'message': 'Produto não encontrado'
             }), 404
 
-        return jsonify({
+        return resposta_versionada({
             'success': True,
             'message': 'Produto atualizado com sucesso',
             'data': produto.to_dict()
-        }), 200
+        }, produto.versao)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -197,6 +314,11 @@ def deletar_produto(produto_id: int):
             'message': 'Produto deletado com sucesso'
         }), 200
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -223,7 +345,8 @@ def ajustar_estoque(produto_id: int):
 
         produto = produto_service.ajustar_estoque(
             produto_id=produto_id,
-            nova_quantidade=data['quantidade']
+            nova_quantidade=data['quantidade'],
+            versao_esperada=versao_do_if_match()
         )
 
         if not produto:
@@ -232,12 +355,17 @@ def ajustar_estoque(produto_id: int):
                 'message': 'Produto não encontrado'
             }), 404
 
-        return jsonify({
+        return resposta_versionada({
             'success': True,
             'message': 'Estoque ajustado com sucesso',
             'data': produto.to_dict()
-        }), 200
+        }, produto.versao)
 
+    except ConflitoVersao as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -291,6 +419,21 @@ def produtos_estoque_baixo():
         }), 500
 
 
+@produto_bp.route('/cache', methods=['GET'])
+def estatisticas_cache():
+    # GET /api/produtos/cache - Acertos e falhas do cache de produtos
+    try:
+        return jsonify({
+            'success': True,
+            'data': produto_service.estatisticas_cache()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter estatísticas do cache: {str(e)}'
+        }), 500
+
+
 # Tratamento de erros específicos do blueprint
 @produto_bp.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,81 @@
+from flask import Blueprint, request, jsonify
+from services.relatorio import RelatorioService
+from controllers.parametros import parametro_int
+
+# Criação do Blueprint para relatórios de vendas
+relatorio_bp = Blueprint('relatorios', __name__, url_prefix='/api/relatorios')
+
+# Instância do serviço
+relatorio_service = RelatorioService()
+
+
+@relatorio_bp.route('/resumo', methods=['GET'])
+def resumo_vendas():
+    # GET /api/relatorios/resumo - Receita, pedidos e ticket médio totais e por status
+    try:
+        return jsonify({
+            'success': True,
+            'data': relatorio_service.obter_resumo()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter resumo de vendas: {str(e)}'
+        }), 500
+
+
+@relatorio_bp.route('/diario', methods=['GET'])
+def vendas_diarias():
+    # GET /api/relatorios/diario?inicio=AAAA-MM-DD&fim=AAAA-MM-DD - Vendas por dia (padrão: últimos 30 dias)
+    try:
+        dias = relatorio_service.obter_vendas_diarias(
+            inicio=request.args.get('inicio'),
+            fim=request.args.get('fim')
+        )
+        return jsonify({
+            'success': True,
+            'data': dias,
+            'count': len(dias)
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter vendas diárias: {str(e)}'
+        }), 500
+
+
+@relatorio_bp.route('/produtos', methods=['GET'])
+def vendas_por_produto():
+    # GET /api/relatorios/produtos?limit=&ordenar=receita|unidades|pedidos - Produtos mais vendidos
+    try:
+        produtos = relatorio_service.obter_vendas_por_produto(
+            limite=parametro_int('limit'),
+            ordenar_por=request.args.get('ordenar', 'receita')
+        )
+        return jsonify({
+            'success': True,
+            'data': produtos,
+            'count': len(produtos)
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao obter vendas por produto: {str(e)}'
+        }), 500
+
+
+@relatorio_bp.cli.command('reconstruir')
+def reconstruir_relatorios():
+    # flask --app app relatorios reconstruir - Recalcula os agregados a partir dos pedidos
+    linhas = relatorio_service.reconstruir()
+    print(f"✅ Relatórios reconstruídos: {linhas} linhas de resumo")
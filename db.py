@@ -1,6 +1,52 @@
 # db.py - Instância única do SQLAlchemy
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, literal, text
+from sessao import SessaoRoteada
+
+# Instância única do banco de dados (leituras de GET podem ir para a réplica, ver sessao.py)
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+
+
+def criar_indices(*modelos) -> None:
+    # create_all só cria índices junto com tabelas novas; aqui os índices declarados
+    # depois que a tabela já existia também são criados
+    for modelo in modelos:
+        for indice in modelo.__table__.indexes:
+            indice.create(db.engine, checkfirst=True)
+
+
+def adicionar_colunas(*modelos) -> None:
+    # create_all não altera tabelas que já existem: colunas declaradas depois (ex.: versao e
+    # atualizado_em) são adicionadas aqui com ALTER TABLE. Idempotente, roda a cada inicialização.
+    inspetor = inspect(db.engine)
+    with db.engine.begin() as conexao:
+        preparador = conexao.dialect.identifier_preparer
+        for modelo in modelos:
+            tabela = modelo.__table__
+            if not inspetor.has_table(tabela.name):
+                continue
+
+            existentes = {coluna['name'] for coluna in inspetor.get_columns(tabela.name)}
+            for coluna in tabela.columns:
+                if coluna.name in existentes:
+                    continue
+                conexao.execute(text(
+                    f"ALTER TABLE {preparador.format_table(tabela)} ADD COLUMN "
+                    f"{preparador.format_column(coluna)} {coluna.type.compile(conexao.dialect)}"
+                    f"{_default_da_coluna(coluna, conexao.dialect)}"
+                ))
+
+
+def _default_da_coluna(coluna, dialeto) -> str:
+    # Linhas já existentes recebem o default da coluna, calculado uma vez: o SQLite só aceita
+    # default constante no ADD COLUMN (ex.: atualizado_em = momento da migração)
+    if coluna.default is None or not (coluna.default.is_scalar or coluna.default.is_callable):
+        if not coluna.nullable:
+            raise ValueError(f"Coluna {coluna} é NOT NULL e não tem default para as linhas existentes")
+        return ''
+
+    valor = coluna.default.arg(None) if coluna.default.is_callable else coluna.default.arg
+    constante = literal(valor, coluna.type).compile(dialect=dialeto, compile_kwargs={'literal_binds': True})
+    return f" DEFAULT {constante}" + ('' if coluna.nullable else ' NOT NULL')
 
-# Instância única do banco de dados
-db = SQLAlchemy()
\ No newline at end of file
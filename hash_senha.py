@@ -0,0 +1,159 @@
+# hash_senha.py - Hash e verificação de senhas fora da thread da requisição
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class ServicoSenhaSobrecarregado(RuntimeError):
+    # Todas as vagas do pool ocupadas; os controllers respondem 503
+    pass
+
+
+def _gerar_hash(senha: str, metodo: Optional[str]) -> str:
+    # metodo None = padrão do werkzeug (scrypt)
+    if metodo is None:
+        return generate_password_hash(senha)
+    return generate_password_hash(senha, metodo)
+
+
+def _gerar_hashes(senhas: List[str], metodo: Optional[str]) -> List[str]:
+    # Executado num processo do pool: um bloco de senhas por tarefa
+    return [_gerar_hash(senha, metodo) for senha in senhas]
+
+
+def _metodo_do_ambiente() -> Optional[str]:
+    # SENHA_HASH_ALGORITMO: 'pbkdf2:sha256' ou 'scrypt'. Sem ele, vale o padrão do werkzeug
+    # e nenhum hash existente é refeito no login.
+    # SENHA_HASH_ITERACOES: iterações do PBKDF2 ou fator de custo N do scrypt
+    algoritmo = os.getenv('SENHA_HASH_ALGORITMO')
+    if not algoritmo:
+        return None
+    if algoritmo == 'scrypt':
+        return f"scrypt:{int(os.getenv('SENHA_HASH_ITERACOES', 32768))}:8:1"
+    return f"{algoritmo}:{int(os.getenv('SENHA_HASH_ITERACOES', 600000))}"
+
+
+class HasherSenha:
+
+    def __init__(self, metodo: Optional[str], tamanho_pool: int = 2, max_pendentes: Optional[int] = None,
+                 timeout: float = 30.0):
+        self.metodo = metodo
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid_pool = None
+        self._configurar_pool(tamanho_pool, max_pendentes)
+
+    @classmethod
+    def do_ambiente(cls) -> 'HasherSenha':
+        max_pendentes = os.getenv('SENHA_POOL_MAX_PENDENTES')
+        return cls(
+            metodo=_metodo_do_ambiente(),
+            tamanho_pool=int(os.getenv('SENHA_POOL_PROCESSOS', 2)),
+            max_pendentes=int(max_pendentes) if max_pendentes else None,
+            timeout=float(os.getenv('SENHA_POOL_TIMEOUT', 30))
+        )
+
+    def gerar(self, senha: str) -> str:
+        return self._executar(_gerar_hash, senha, self.metodo)
+
+    def gerar_varios(self, senhas: List[str]) -> List[str]:
+        # Distribui os hashes de um lote entre os processos do pool, um bloco por processo.
+        # Cada bloco ocupa uma vaga, como um hash avulso: importações não furam o limite.
+        if self.tamanho_pool == 0 or len(senhas) < 2:
+            return [self.gerar(senha) for senha in senhas]
+
+        tamanho_bloco = -(-len(senhas) // self.tamanho_pool)
+        futuros = []
+        try:
+            for inicio in range(0, len(senhas), tamanho_bloco):
+                futuros.append(self._submeter(_gerar_hashes, senhas[inicio:inicio + tamanho_bloco], self.metodo))
+        except ServicoSenhaSobrecarregado:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+        # O timeout de um hash vale para cada senha do bloco: os blocos rodam em paralelo,
+        # então o lote inteiro tem até timeout * tamanho_bloco
+        prazo = time.monotonic() + self.timeout * tamanho_bloco
+        hashes = []
+        try:
+            for futuro in futuros:
+                hashes += futuro.result(timeout=max(prazo - time.monotonic(), 0))
+        except TimeoutError:
+            for futuro in futuros:
+                futuro.cancel()
+            raise ServicoSenhaSobrecarregado("Tempo esgotado ao gerar os hashes do lote, tente novamente")
+        return hashes
+
+    def verificar(self, hash_senha: str, senha: str) -> bool:
+        return self._executar(check_password_hash, hash_senha, senha)
+
+    def precisa_rehash(self, hash_senha: str) -> bool:
+        # O prefixo do hash guarda algoritmo e parâmetros usados (ex.: 'pbkdf2:sha256:600000').
+        # Só migra para um método escolhido pelo operador, nunca para o padrão implícito.
+        if self.metodo is None:
+            return False
+        return hash_senha.split('$', 1)[0] != self.metodo
+
+    def definir_tamanho_pool(self, tamanho_pool: int, max_pendentes: Optional[int] = None) -> None:
+        # Sem max_pendentes, mantém o limite configurado antes (ou o padrão proporcional ao pool)
+        with self._lock:
+            self._encerrar_pool()
+            self._configurar_pool(tamanho_pool, max_pendentes if max_pendentes is not None else self.max_pendentes)
+
+    def encerrar(self) -> None:
+        with self._lock:
+            self._encerrar_pool()
+
+    def _configurar_pool(self, tamanho_pool: int, max_pendentes: Optional[int]) -> None:
+        if tamanho_pool < 0:
+            raise ValueError("Tamanho do pool não pode ser negativo")
+        self.tamanho_pool = tamanho_pool
+        self.max_pendentes = max_pendentes
+        # Limita quantos hashes (ou blocos de um lote) podem estar no pool: acima disso a
+        # requisição falha na hora, sem esperar, em vez de acumular trabalho que não vai
+        # ser atendido a tempo
+        self._vagas = threading.BoundedSemaphore(max_pendentes or max(tamanho_pool, 1) * 4)
+
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        # O pool é criado sob demanda em cada processo (ex.: cada worker do gunicorn)
+        with self._lock:
+            if self._pool is None or self._pid_pool != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.tamanho_pool)
+                self._pid_pool = os.getpid()
+            return self._pool
+
+    def _encerrar_pool(self) -> None:
+        if self._pool is not None and self._pid_pool == os.getpid():
+            self._pool.shutdown(wait=True)
+        self._pool = None
+        self._pid_pool = None
+
+    def _executar(self, funcao, *args):
+        if self.tamanho_pool == 0:
+            return funcao(*args)
+
+        return self._submeter(funcao, *args).result(timeout=self.timeout)
+
+    def _submeter(self, funcao, *args) -> Future:
+        vagas = self._vagas
+        if not vagas.acquire(blocking=False):
+            raise ServicoSenhaSobrecarregado("Serviço de senhas sobrecarregado, tente novamente")
+        try:
+            futuro = self._obter_pool().submit(funcao, *args)
+        except Exception:
+            vagas.release()
+            raise
+        # A vaga só volta quando a tarefa termina (ou é cancelada), mesmo que quem esperava
+        # o resultado já tenha desistido por timeout
+        futuro.add_done_callback(lambda _: vagas.release())
+        return futuro
+
+
+# Instância única do hasher de senhas
+hasher_senha = HasherSenha.do_ambiente()
@@ -0,0 +1,223 @@
+# metricas.py - Métricas do pool de conexões e das requisições
+
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict, List
+
+
+class MetricasPool:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.checkouts_sem_ociosas = 0
+
+    def registrar(self, espera: float, sem_ociosas: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            if sem_ociosas:
+                self.checkouts_sem_ociosas += 1
+
+    def registrar_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'espera_media_ms': round(self.espera_total * 1000 / self.checkouts, 3) if self.checkouts else None,
+                'espera_maxima_ms': round(self.espera_maxima * 1000, 3),
+                'checkouts_sem_ociosas': self.checkouts_sem_ociosas
+            }
+
+
+class PoolInstrumentado(QueuePool):
+    # QueuePool que mede quanto tempo cada checkout espera por uma conexão livre
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metricas = self.metricas
+        return pool
+
+    def _do_get(self):
+        # Sem conexão ociosa no pool, o checkout abre overflow ou espera por uma devolução
+        sem_ociosas = self.checkedin() == 0
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except Exception:
+            self.metricas.registrar_timeout()
+            raise
+        self.metricas.registrar(time.perf_counter() - inicio, sem_ociosas)
+        return conexao
+
+    def relatorio(self) -> Dict[str, Any]:
+        capacidade = self.size() + max(self._max_overflow, 0)
+        em_uso = self.checkedout()
+        return {
+            'tamanho': self.size(),
+            'max_overflow': self._max_overflow,
+            'em_uso': em_uso,
+            'ociosas': self.checkedin(),
+            'overflow': self.overflow(),
+            'saturacao': round(em_uso / capacidade, 4) if capacidade else None,
+            **self.metricas.resumo()
+        }
+
+
+# Limites superiores (ms) dos intervalos do histograma de latência
+LIMITES_LATENCIA_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class HistogramaRota:
+
+    def __init__(self):
+        self.contagens = [0] * (len(LIMITES_LATENCIA_MS) + 1)
+        self.requisicoes = 0
+        self.latencia_total = 0.0
+        self.comandos_sql = 0
+        self.tempo_sql = 0.0
+        self.tempo_serializacao = 0.0
+
+    def registrar(self, latencia_ms: float, comandos_sql: int, tempo_sql_ms: float,
+                  serializacao_ms: float) -> None:
+        self.contagens[bisect.bisect_left(LIMITES_LATENCIA_MS, latencia_ms)] += 1
+        self.requisicoes += 1
+        self.latencia_total += latencia_ms
+        self.comandos_sql += comandos_sql
+        self.tempo_sql += tempo_sql_ms
+        self.tempo_serializacao += serializacao_ms
+
+    def percentil(self, fracao: float) -> float:
+        # Estimativa pelo limite superior do intervalo onde o percentil cai
+        alvo = fracao * self.requisicoes
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return LIMITES_LATENCIA_MS[indice] if indice < len(LIMITES_LATENCIA_MS) else float('inf')
+        return float('inf')
+
+    def resumo(self) -> Dict[str, Any]:
+        n = self.requisicoes
+        return {
+            'requisicoes': n,
+            'latencia_media_ms': round(self.latencia_total / n, 3),
+            'latencia_p50_ms': self.percentil(0.50),
+            'latencia_p95_ms': self.percentil(0.95),
+            'latencia_p99_ms': self.percentil(0.99),
+            'sql_comandos_media': round(self.comandos_sql / n, 2),
+            'sql_tempo_medio_ms': round(self.tempo_sql / n, 3),
+            'serializacao_media_ms': round(self.tempo_serializacao / n, 3),
+            # ate_ms nulo = acima do último limite
+            'histograma': [
+                {'ate_ms': limite, 'contagem': contagem}
+                for limite, contagem in zip(LIMITES_LATENCIA_MS + (None,), self.contagens)
+            ]
+        }
+
+
+class MetricasRequisicoes:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas: Dict[str, HistogramaRota] = {}
+
+    def registrar(self, rota: str, latencia_ms: float, comandos_sql: int, tempo_sql_ms: float,
+                  serializacao_ms: float) -> None:
+        with self._lock:
+            if rota not in self._rotas:
+                self._rotas[rota] = HistogramaRota()
+            self._rotas[rota].registrar(latencia_ms, comandos_sql, tempo_sql_ms, serializacao_ms)
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            return {rota: histograma.resumo() for rota, histograma in sorted(self._rotas.items())}
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._rotas.clear()
+
+
+# Instância única das métricas de requisições do processo
+metricas_requisicoes = MetricasRequisicoes()
+
+
+def medir_serializacao(to_dict):
+    # Soma o tempo gasto em to_dict na requisição; chamadas aninhadas (ex.: itens dentro
+    # do pedido) ficam dentro da medição externa e não são contadas duas vezes
+    @wraps(to_dict)
+    def medir(*args, **kwargs):
+        if not has_request_context() or '_inicio_requisicao' not in g or g._serializando:
+            return to_dict(*args, **kwargs)
+
+        g._serializando = True
+        inicio = time.perf_counter()
+        try:
+            return to_dict(*args, **kwargs)
+        finally:
+            g._tempo_serializacao += time.perf_counter() - inicio
+            g._serializando = False
+    return medir
+
+
+def instalar_instrumentacao(app, engines: List) -> None:
+    # INSTRUMENTACAO_ATIVA=false desliga a coleta (ativa por padrão)
+    if os.getenv('INSTRUMENTACAO_ATIVA', 'true').strip().lower() in ('0', 'false', 'nao', 'no', 'off'):
+        return
+
+    @app.before_request
+    def iniciar_medicao():
+        g._inicio_requisicao = time.perf_counter()
+        g._comandos_sql = 0
+        g._tempo_sql = 0.0
+        g._tempo_serializacao = 0.0
+        g._serializando = False
+
+    @app.after_request
+    def registrar_medicao(resposta):
+        if '_inicio_requisicao' not in g:
+            return resposta
+
+        latencia_ms = (time.perf_counter() - g._inicio_requisicao) * 1000
+        tempo_sql_ms = g._tempo_sql * 1000
+        serializacao_ms = g._tempo_serializacao * 1000
+        rota = f"{request.method} {request.url_rule.rule if request.url_rule else '<sem rota>'}"
+
+        metricas_requisicoes.registrar(rota, latencia_ms, g._comandos_sql, tempo_sql_ms, serializacao_ms)
+        resposta.headers.add(
+            'Server-Timing',
+            f'app;dur={latencia_ms:.3f}, '
+            f'db;dur={tempo_sql_ms:.3f};desc="{g._comandos_sql} SQL", '
+            f'serializacao;dur={serializacao_ms:.3f}'
+        )
+        return resposta
+
+    for engine in engines:
+        @event.listens_for(engine, 'before_cursor_execute')
+        def iniciar_comando(conexao, cursor, comando, parametros, contexto, executemany):
+            conexao.info['inicio_comando'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def encerrar_comando(conexao, cursor, comando, parametros, contexto, executemany):
+            inicio = conexao.info.pop('inicio_comando', None)
+            if inicio is not None and has_request_context() and '_inicio_requisicao' in g:
+                g._comandos_sql += 1
+                g._tempo_sql += time.perf_counter() - inicio
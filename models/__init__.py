@@ -1,5 +1,10 @@
 from .cliente import Cliente
-from .produto import Produto, pedido_produto
+from .produto import Produto, ProdutoDTO
+from .item_pedido import ItemPedido, pedido_produto
 from .pedido import Pedido, StatusPedido
+from .resumo_venda import ResumoVenda
+from .evento_outbox import EventoOutbox
+from .chave_idempotencia import ChaveIdempotencia
 
-__all__ = ['Cliente', 'Produto', 'Pedido', 'StatusPedido', 'pedido_produto']
\ No newline at end of file
+__all__ = ['Cliente', 'Produto', 'ProdutoDTO', 'Pedido', 'StatusPedido', 'ItemPedido', 'pedido_produto',
+           'ResumoVenda', 'EventoOutbox', 'ChaveIdempotencia']
@@ -0,0 +1,35 @@
+from db import db
+from datetime import datetime
+
+
+class ChaveIdempotencia(db.Model):
+    # Uma linha por Idempotency-Key recebido: reservada antes de executar a requisição e,
+    # ao final, guarda a resposta que é devolvida às repetições com a mesma chave
+    __tablename__ = 'chaves_idempotencia'
+
+    EM_ANDAMENTO = 'EM_ANDAMENTO'
+    CONCLUIDA = 'CONCLUIDA'
+
+    # Hash do Idempotency-Key recebido junto com rota e chamador (ver IdempotenciaService.chave_no_escopo)
+    chave = db.Column(db.String(255), primary_key=True)
+    # Hash de método, rota e corpo: a mesma chave com outra requisição é rejeitada
+    hash_requisicao = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=EM_ANDAMENTO)
+    codigo_status = db.Column(db.Integer)
+    corpo = db.Column(db.Text)
+    # Cabeçalhos da resposta devolvidos nas repetições (ETag, Location...)
+    cabecalhos = db.Column(db.JSON)
+    criada_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Enquanto EM_ANDAMENTO: até quando a reserva vale (depois, outra tentativa pode assumir)
+    bloqueada_ate = db.Column(db.DateTime)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __init__(self, chave, hash_requisicao, bloqueada_ate, expira_em):
+        self.chave = chave
+        self.hash_requisicao = hash_requisicao
+        self.status = self.EM_ANDAMENTO
+        self.bloqueada_ate = bloqueada_ate
+        self.expira_em = expira_em
+
+    def __repr__(self):
+        return f'<ChaveIdempotencia {self.chave} {self.status}>'
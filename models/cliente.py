@@ -1,6 +1,7 @@
 from db import db
+from metricas import medir_serializacao
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from hash_senha import hasher_senha
 
 
 class Cliente(db.Model):
@@ -11,30 +12,56 @@ class Cliente(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     senha = db.Column(db.String(255), nullable=False)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    # Mantido pelo SQLAlchemy em todo UPDATE; o nome do cliente aparece no pedido, então
+    # entra no Last-Modified/ETag de GET /api/pedidos/<id>
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamento com pedidos (importação tardia)
     pedidos = db.relationship('Pedido', backref='cliente', lazy=True, cascade='all, delete-orphan')
 
+    # Contagem de pedidos calculada no banco; preenchida pelo repositório via with_expression
+    total_pedidos = db.query_expression()
+
     def __init__(self, nome, email, senha):
         self.nome = nome
         self.email = email
         self.set_senha(senha)
 
+    @staticmethod
+    def gerar_hash_senha(senha):
+        return hasher_senha.gerar(senha)
+
+    @staticmethod
+    def gerar_hashes_senha(senhas):
+        # Hash de várias senhas em paralelo no pool de processos
+        return hasher_senha.gerar_varios(senhas)
+
     def set_senha(self, senha):
         # Gera hash da senha
-        self.senha = generate_password_hash(senha)
+        self.senha = Cliente.gerar_hash_senha(senha)
 
     def check_senha(self, senha):
         # Verifica senha
-        return check_password_hash(self.senha, senha)
+        return hasher_senha.verificar(self.senha, senha)
+
+    def senha_precisa_rehash(self):
+        # Hash gerado com algoritmo ou parâmetros diferentes dos configurados
+        return hasher_senha.precisa_rehash(self.senha)
+
+    def contar_pedidos(self):
+        # Conta no banco sem carregar a coleção de pedidos
+        from models.pedido import Pedido
+        return Pedido.query.filter_by(cliente_id=self.id).count()
 
+    @medir_serializacao
     def to_dict(self):
         return {
             'id': self.id,
             'nome': self.nome,
             'email': self.email,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'total_pedidos': len(self.pedidos)
+            'data_criacao': self.data_criacao,
+            'atualizado_em': self.atualizado_em,
+            'total_pedidos': self.total_pedidos if self.total_pedidos is not None else self.contar_pedidos()
         }
 
     def __repr__(self):
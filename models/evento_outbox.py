@@ -0,0 +1,56 @@
+from db import db
+from metricas import medir_serializacao
+from datetime import datetime
+
+
+class EventoOutbox(db.Model):
+    # Eventos gravados na mesma transação da mudança que os originou e entregues depois
+    # aos handlers por um trabalhador em segundo plano (ver worker.py)
+    __tablename__ = 'eventos_outbox'
+    __table_args__ = (
+        db.Index('ix_eventos_outbox_status_disponivel_em', 'status', 'disponivel_em'),
+    )
+
+    PENDENTE = 'PENDENTE'
+    PROCESSANDO = 'PROCESSANDO'
+    PROCESSADO = 'PROCESSADO'
+    FALHOU = 'FALHOU'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    agregado_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PENDENTE)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Momento a partir do qual o evento pode ser (re)tentado
+    disponivel_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Reserva do lote: quem está processando e até quando
+    dono = db.Column(db.String(32))
+    bloqueado_ate = db.Column(db.DateTime)
+    processado_em = db.Column(db.DateTime)
+    erro = db.Column(db.Text)
+
+    def __init__(self, tipo, agregado_id, payload):
+        self.tipo = tipo
+        self.agregado_id = agregado_id
+        self.payload = payload
+        self.status = self.PENDENTE
+        self.tentativas = 0
+
+    @medir_serializacao
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'agregado_id': self.agregado_id,
+            'payload': self.payload,
+            'status': self.status,
+            'tentativas': self.tentativas,
+            'criado_em': self.criado_em,
+            'processado_em': self.processado_em,
+            'erro': self.erro
+        }
+
+    def __repr__(self):
+        return f'<EventoOutbox {self.id} {self.tipo} {self.status}>'
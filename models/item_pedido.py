@@ -0,0 +1,43 @@
+from db import db
+from metricas import medir_serializacao
+
+
+class ItemPedido(db.Model):
+    # Objeto de associação entre pedidos e produtos (tabela pedido_produto)
+    __tablename__ = 'pedido_produto'
+
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), primary_key=True)
+    produto_id = db.Column(db.Integer, db.ForeignKey('produtos.id'), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=1)
+    preco_unitario = db.Column(db.Float, nullable=False)
+
+    pedido = db.relationship('Pedido', back_populates='itens')
+    produto = db.relationship('Produto')
+
+    def __init__(self, produto, quantidade=1):
+        self.produto = produto
+        self.produto_id = produto.id
+        self.quantidade = quantidade
+        # Preço congelado no momento da inclusão; mudanças posteriores no produto não afetam o pedido
+        self.preco_unitario = produto.preco
+
+    @property
+    def subtotal(self):
+        return self.quantidade * self.preco_unitario
+
+    @medir_serializacao
+    def to_dict(self):
+        return {
+            'produto_id': self.produto_id,
+            'nome': self.produto.nome if self.produto else None,
+            'quantidade': self.quantidade,
+            'preco_unitario': float(self.preco_unitario),
+            'subtotal': float(self.subtotal)
+        }
+
+    def __repr__(self):
+        return f'<ItemPedido {self.pedido_id}/{self.produto_id} x{self.quantidade}>'
+
+
+# Mantido para quem referencia a tabela de associação diretamente
+pedido_produto = ItemPedido.__table__
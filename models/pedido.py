@@ -1,7 +1,8 @@
 from db import db
+from metricas import medir_serializacao
 from datetime import datetime
 from enum import Enum
-from models.produto import pedido_produto
+from models.item_pedido import ItemPedido
 
 
 class StatusPedido(Enum):
@@ -15,81 +16,99 @@ class StatusPedido(Enum):
 
 class Pedido(db.Model):
     __tablename__ = 'pedidos'
+    # Índices compostos terminando em (data, id): filtros por status/cliente e por período
+    # saem já na ordem da listagem (data, id decrescentes), sem ordenação em memória
+    __table_args__ = (
+        db.Index('ix_pedidos_data_id', 'data', 'id'),
+        db.Index('ix_pedidos_status_data_id', 'status', 'data', 'id'),
+        db.Index('ix_pedidos_cliente_id_data_id', 'cliente_id', 'data', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False, index=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False)
     total = db.Column(db.Float, nullable=False, default=0.0)
     data = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     status = db.Column(db.Enum(StatusPedido), default=StatusPedido.PENDENTE, nullable=False)
     observacoes = db.Column(db.Text)
+    # Mantido pelo SQLAlchemy em todo UPDATE (ORM ou Core); base do Last-Modified
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Trava otimista, como em Produto: toda escrita no pedido incrementa a versão
+    versao = db.Column(db.Integer, nullable=False, default=1)
 
-    # Relacionamento com produtos (importação tardia)
-    produtos = db.relationship('Produto', secondary=pedido_produto, back_populates='pedidos')
+    __mapper_args__ = {'version_id_col': versao}
+
+    # Itens do pedido com quantidade e preço unitário persistidos
+    itens = db.relationship('ItemPedido', back_populates='pedido', cascade='all, delete-orphan')
 
     def __init__(self, cliente_id, observacoes=None):
         self.cliente_id = cliente_id
         self.observacoes = observacoes
         self.total = 0.0
 
-    def adicionar_produto(self, produto, quantidade=1):
-        if not produto.tem_estoque(quantidade):
-            raise ValueError(f"Estoque insuficiente para {produto.nome}")
+    def buscar_item(self, produto_id):
+        for item in self.itens:
+            if item.produto_id == produto_id:
+                return item
+        return None
 
-        if produto not in self.produtos:
-            self.produtos.append(produto)
+    def adicionar_produto(self, produto, quantidade=1):
+        self.adicionar_produtos([(produto, quantidade)])
 
-        self.calcular_total()
+    def adicionar_produtos(self, produtos_quantidades):
+        # Índice por produto montado uma vez, para que cada linha custe O(1)
+        itens_por_produto = {item.produto_id: item for item in self.itens}
 
-    def remover_produto(self, produto_id):
-        from models.produto import Produto
-        produto = Produto.query.get(produto_id)
-        if produto and produto in self.produtos:
-            self.produtos.remove(produto)
-            self.calcular_total()
+        for produto, quantidade in produtos_quantidades:
+            item = itens_por_produto.get(produto.id)
+            quantidade_total = quantidade + (item.quantidade if item else 0)
 
-    def calcular_total(self):
-        # Calcula total baseado nos produtos
-        total = 0.0
-        for produto in self.produtos:
-            total += produto.preco  # Assumindo quantidade 1 por simplicidade
-        self.total = total
-        return self.total
+            if not produto.tem_estoque(quantidade_total):
+                raise ValueError(f"Estoque insuficiente para {produto.nome}")
 
-    def confirmar_pedido(self):
-        if self.status != StatusPedido.PENDENTE:
-            raise ValueError("Apenas pedidos pendentes podem ser confirmados")
+            if item:
+                item.quantidade = quantidade_total
+            else:
+                item = ItemPedido(produto=produto, quantidade=quantidade)
+                self.itens.append(item)
+                itens_por_produto[produto.id] = item
 
-        if not self.produtos:
-            raise ValueError("Pedido deve ter ao menos um produto")
+            # Atualiza o total apenas com a diferença da linha, sem recalcular o pedido inteiro
+            self.total = round(self.total + item.preco_unitario * quantidade, 2)
+        self._marcar_itens_alterados()
 
-        # Reduz estoque dos produtos
-        for produto in self.produtos:
-            produto.reduzir_estoque(1)  # Quantidade fixa por simplicidade
-
-        self.status = StatusPedido.CONFIRMADO
-
-    def cancelar_pedido(self):
-        if self.status in [StatusPedido.ENTREGUE, StatusPedido.CANCELADO]:
-            raise ValueError("Pedido não pode ser cancelado no status atual")
+    def remover_produto(self, produto_id):
+        item = self.buscar_item(produto_id)
+        if item:
+            self.itens.remove(item)
+            self.total = round(self.total - item.subtotal, 2)
+            self._marcar_itens_alterados()
 
-        # Restaura estoque se já foi confirmado
-        if self.status != StatusPedido.PENDENTE:
-            for produto in self.produtos:
-                produto.aumentar_estoque(1)
+    def _marcar_itens_alterados(self):
+        # Os itens ficam em outra tabela: sem mudar uma coluna do pedido (o total pode ficar
+        # igual), o ORM não faria UPDATE e a versão, base da ETag, não mudaria
+        self.atualizado_em = datetime.utcnow()
 
-        self.status = StatusPedido.CANCELADO
+    def calcular_total(self):
+        # Recalcula o total a partir dos preços congelados nos itens
+        self.total = round(sum(item.subtotal for item in self.itens), 2)
+        return self.total
 
+    @medir_serializacao
     def to_dict(self):
         return {
             'id': self.id,
             'cliente_id': self.cliente_id,
             'cliente_nome': self.cliente.nome if self.cliente else None,
             'total': float(self.total),
-            'data': self.data.isoformat() if self.data else None,
-            'status': self.status.value if self.status else None,
+            'data': self.data,
+            'status': self.status,
             'observacoes': self.observacoes,
-            'produtos': [produto.to_dict() for produto in self.produtos],
-            'quantidade_itens': len(self.produtos)
+            # 'produtos' mantém o formato original da API; 'itens' traz quantidade e preço por linha
+            'produtos': [item.produto.to_dict() for item in self.itens if item.produto],
+            'itens': [item.to_dict() for item in self.itens],
+            'quantidade_itens': sum(item.quantidade for item in self.itens),
+            'versao': self.versao,
+            'atualizado_em': self.atualizado_em
         }
 
     def __repr__(self):
@@ -1,17 +1,34 @@
 from db import db
+from metricas import medir_serializacao
 from datetime import datetime
+from sqlalchemy import text
 
-# Tabela de associação muitos-para-muitos
-pedido_produto = db.Table('pedido_produto',
-                          db.Column('pedido_id', db.Integer, db.ForeignKey('pedidos.id'), primary_key=True),
-                          db.Column('produto_id', db.Integer, db.ForeignKey('produtos.id'), primary_key=True),
-                          db.Column('quantidade', db.Integer, nullable=False, default=1),
-                          db.Column('preco_unitario', db.Float, nullable=False)
-                          )
+
+def _serializar_produto(produto) -> dict:
+    # Serialização única de Produto e ProdutoDTO (mesmos nomes de atributo)
+    return {
+        'id': produto.id,
+        'nome': produto.nome,
+        'quantidade': produto.quantidade,
+        'preco': float(produto.preco),
+        'descricao': produto.descricao,
+        'data_criacao': produto.data_criacao,
+        'ativo': produto.ativo,
+        'versao': produto.versao,
+        'atualizado_em': produto.atualizado_em
+    }
 
 
 class Produto(db.Model):
     __tablename__ = 'produtos'
+    # Índices parciais só com produtos ativos (os que a vitrine lista). Cada um cobre filtro
+    # de preço/estoque e a ordenação da busca do catálogo sem ler a tabela.
+    __table_args__ = (
+        db.Index('ix_produtos_ativos_preco', 'preco', 'id', 'quantidade', 'ativo',
+                 sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')),
+        db.Index('ix_produtos_ativos_nome', 'nome', 'id', 'preco', 'quantidade', 'ativo',
+                 sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     nome = db.Column(db.String(100), nullable=False, index=True)
@@ -20,9 +37,16 @@ class Produto(db.Model):
     descricao = db.Column(db.Text)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     ativo = db.Column(db.Boolean, default=True)
+    # Mantido pelo SQLAlchemy em todo UPDATE (ORM ou Core); base do Last-Modified e das ETags de listagem
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Trava otimista: o ORM inclui "versao = <lida>" no WHERE de cada UPDATE e incrementa a
+    # versão; UPDATEs em Core (reserva de estoque etc.) incrementam explicitamente
+    versao = db.Column(db.Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': versao}
 
-    # Relacionamento com pedidos (importação tardia)
-    pedidos = db.relationship('Pedido', secondary=pedido_produto, back_populates='produtos')
+    # Relacionamento com pedidos (somente leitura; itens são gravados via ItemPedido)
+    pedidos = db.relationship('Pedido', secondary='pedido_produto', viewonly=True)
 
     def __init__(self, nome, quantidade, preco, descricao=None):
         self.nome = nome
@@ -42,16 +66,38 @@ class Produto(db.Model):
     def aumentar_estoque(self, quantidade):
         self.quantidade += quantidade
 
+    @medir_serializacao
+    def to_dict(self):
+        return _serializar_produto(self)
+
+    def __repr__(self):
+        return f'<Produto {self.nome}>'
+
+class ProdutoDTO:
+    # Projeção somente leitura das colunas serializadas de Produto: sem identity map,
+    # sem estado de sessão, só os atributos que o to_dict usa
+    __slots__ = ('id', 'nome', 'quantidade', 'preco', 'descricao', 'data_criacao', 'ativo', 'versao',
+                 'atualizado_em')
+
+    def __init__(self, id, nome, quantidade, preco, descricao, data_criacao, ativo, versao, atualizado_em):
+        self.id = id
+        self.nome = nome
+        self.quantidade = quantidade
+        self.preco = preco
+        self.descricao = descricao
+        self.data_criacao = data_criacao
+        self.ativo = ativo
+        self.versao = versao
+        self.atualizado_em = atualizado_em
+
+    @classmethod
+    def colunas(cls):
+        # Colunas do SELECT, na mesma ordem dos argumentos do construtor
+        return [getattr(Produto, atributo) for atributo in cls.__slots__]
+
+    @medir_serializacao
     def to_dict(self):
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'quantidade': self.quantidade,
-            'preco': float(self.preco),
-            'descricao': self.descricao,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'ativo': self.ativo
-        }
+        return _serializar_produto(self)
 
     def __repr__(self):
-        return f'<Produto {self.nome}>'
\ No newline at end of file
+        return f'<ProdutoDTO {self.nome}>'
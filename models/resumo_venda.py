@@ -0,0 +1,38 @@
+from db import db
+from metricas import medir_serializacao
+
+
+class ResumoVenda(db.Model):
+    # Agregados de vendas mantidos incrementalmente a cada mudança de status do pedido.
+    # Uma linha por (dimensao, chave): 'total'/'geral', 'status'/<status>, 'dia'/<AAAA-MM-DD>
+    # e 'produto'/<produto_id>.
+    __tablename__ = 'resumo_vendas'
+
+    DIMENSAO_TOTAL = 'total'
+    DIMENSAO_STATUS = 'status'
+    DIMENSAO_DIA = 'dia'
+    DIMENSAO_PRODUTO = 'produto'
+    CHAVE_TOTAL = 'geral'
+
+    dimensao = db.Column(db.String(20), primary_key=True)
+    chave = db.Column(db.String(50), primary_key=True)
+    pedidos = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Float, nullable=False, default=0.0)
+    unidades = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def ticket_medio(self):
+        return round(self.receita / self.pedidos, 2) if self.pedidos else 0.0
+
+    @medir_serializacao
+    def to_dict(self):
+        return {
+            'chave': self.chave,
+            'pedidos': self.pedidos,
+            'receita': round(self.receita, 2),
+            'unidades': self.unidades,
+            'ticket_medio': self.ticket_medio
+        }
+
+    def __repr__(self):
+        return f'<ResumoVenda {self.dimensao}/{self.chave}>'
@@ -0,0 +1,175 @@
+# repositories/busca.py - Índices de busca textual por nome
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from db import db
+from sqlalchemy import Float, Integer, func, literal, select, text
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def extrair_termos(consulta: str) -> List[str]:
+    return re.findall(r'\w+', consulta)
+
+
+class IndiceBusca(ABC):
+    # Interface de um índice de busca por nome para um modelo com colunas id e nome
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+
+    def instalar(self, conexao) -> None:
+        pass
+
+    @abstractmethod
+    def selecionar_ids(self, consulta: str):
+        # Retorna um SELECT com as colunas (id, relevancia); menor relevância = melhor resultado
+        ...
+
+
+class IndiceFTS5(IndiceBusca):
+    # SQLite: tabela virtual FTS5 com conteúdo externo, mantida em sincronia por triggers.
+    # O tokenizador unicode61 com remove_diacritics ignora acentos ("joao" encontra "João").
+
+    def __init__(self, modelo):
+        super().__init__(modelo)
+        self.tabela = modelo.__tablename__
+        self.tabela_busca = f'{self.tabela}_busca'
+
+    def instalar(self, conexao) -> None:
+        existe = conexao.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+            {'nome': self.tabela_busca}
+        ).first()
+
+        conexao.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.tabela_busca} USING fts5("
+            f"nome, content='{self.tabela}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conexao.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {self.tabela_busca}_ai AFTER INSERT ON {self.tabela} BEGIN "
+            f"INSERT INTO {self.tabela_busca}(rowid, nome) VALUES (new.id, new.nome); END"
+        ))
+        conexao.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {self.tabela_busca}_ad AFTER DELETE ON {self.tabela} BEGIN "
+            f"INSERT INTO {self.tabela_busca}({self.tabela_busca}, rowid, nome) "
+            f"VALUES ('delete', old.id, old.nome); END"
+        ))
+        conexao.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {self.tabela_busca}_au AFTER UPDATE OF nome ON {self.tabela} BEGIN "
+            f"INSERT INTO {self.tabela_busca}({self.tabela_busca}, rowid, nome) "
+            f"VALUES ('delete', old.id, old.nome); "
+            f"INSERT INTO {self.tabela_busca}(rowid, nome) VALUES (new.id, new.nome); END"
+        ))
+
+        # Banco já existente: indexa as linhas gravadas antes do índice ser criado
+        if not existe:
+            conexao.execute(text(
+                f"INSERT INTO {self.tabela_busca}({self.tabela_busca}) VALUES ('rebuild')"
+            ))
+
+    def selecionar_ids(self, consulta: str):
+        # Cada termo vira um prefixo entre aspas ("cam"* encontra "camisa"); termos em AND
+        expressao = ' '.join(f'"{termo}"*' for termo in extrair_termos(consulta))
+        return text(
+            f"SELECT rowid AS id, rank AS relevancia FROM {self.tabela_busca} "
+            f"WHERE {self.tabela_busca} MATCH :expressao"
+        ).bindparams(expressao=expressao).columns(id=Integer, relevancia=Float)
+
+
+class IndicePostgres(IndiceBusca):
+    # PostgreSQL: índice GIN de trigramas (pg_trgm) sobre o nome sem acentos (unaccent), para
+    # o mesmo comportamento do FTS5: "cafe" encontra "Café", termos em AND, por relevância.
+    # unaccent() não é IMMUTABLE e não pode ir num índice; sem_acento() é o invólucro usual.
+
+    def __init__(self, modelo):
+        super().__init__(modelo)
+        self.tabela = modelo.__tablename__
+
+    def instalar(self, conexao) -> None:
+        conexao.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        conexao.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conexao.execute(text(
+            "CREATE OR REPLACE FUNCTION sem_acento(text) RETURNS text "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+            "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+        ))
+        conexao.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.tabela}_nome_trgm ON {self.tabela} "
+            f"USING gin (lower(sem_acento(nome)) gin_trgm_ops)"
+        ))
+
+    def selecionar_ids(self, consulta: str):
+        # Mesma expressão do índice; cada termo é um LIKE '%termo%' (atendido pelo GIN) e a
+        # relevância é a distância de trigramas até a consulta inteira
+        nome = func.lower(func.sem_acento(self.modelo.nome))
+        relevancia = 1 - func.similarity(nome, func.lower(func.sem_acento(consulta)))
+        query = select(self.modelo.id.label('id'), relevancia.label('relevancia'))
+        for termo in extrair_termos(consulta):
+            # '_' é curinga no LIKE (\w inclui o sublinhado)
+            padrao = func.lower(func.sem_acento(termo.replace('_', '\\_')))
+            query = query.where(nome.like(func.concat('%', padrao, '%')))
+        return query
+
+
+class IndiceIlike(IndiceBusca):
+    # Fallback para os demais bancos (ex.: MySQL): ILIKE por termo, sem ranqueamento e
+    # sensível a acentos conforme a collation da coluna
+
+    def selecionar_ids(self, consulta: str):
+        query = select(self.modelo.id.label('id'), literal(0.0).label('relevancia'))
+        for termo in extrair_termos(consulta):
+            query = query.where(self.modelo.nome.ilike(f'%{termo}%'))
+        return query
+
+
+# Implementação de índice por dialeto; outros bancos podem registrar a sua aqui
+INDICES_POR_DIALETO = {
+    'sqlite': IndiceFTS5,
+    'postgresql': IndicePostgres,
+}
+
+_indices: Dict[Tuple[type, str], IndiceBusca] = {}
+
+
+def obter_indice(modelo, dialeto: Optional[str] = None) -> IndiceBusca:
+    dialeto = dialeto or db.engine.dialect.name
+    chave = (modelo, dialeto)
+    if chave not in _indices:
+        _indices[chave] = INDICES_POR_DIALETO.get(dialeto, IndiceIlike)(modelo)
+    return _indices[chave]
+
+
+def instalar_indices(*modelos) -> None:
+    # Em todos os binds: buscas de GET podem ser atendidas pela réplica (ver sessao.py)
+    for bind, engine in db.engines.items():
+        try:
+            with engine.begin() as conexao:
+                for modelo in modelos:
+                    obter_indice(modelo, engine.dialect.name).instalar(conexao)
+        except Exception:
+            if bind is None:
+                raise
+            # Réplica somente leitura (ex.: streaming do PostgreSQL): o índice chega pela replicação
+            logger.warning('Não foi possível instalar os índices de busca no bind %s', bind, exc_info=True)
+
+
+def filtrar_por_nome(modelo, consulta: str):
+    # Critério "id IN (ids do índice)", para combinar a busca textual com outros filtros
+    ids = obter_indice(modelo).selecionar_ids(consulta).subquery()
+    return modelo.id.in_(select(ids.c.id))
+
+
+def buscar_por_nome(modelo, consulta: str, limite: int, deslocamento: int = 0, query=None):
+    # Resultados ordenados por relevância e paginados; o id desempata para ordem estável
+    if not extrair_termos(consulta):
+        return []
+
+    ids = obter_indice(modelo).selecionar_ids(consulta).subquery()
+    query = query if query is not None else modelo.query
+    return query.join(ids, ids.c.id == modelo.id).order_by(
+        ids.c.relevancia, modelo.id
+    ).limit(limite).offset(deslocamento).all()
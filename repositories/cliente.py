@@ -1,6 +1,11 @@
 from models.cliente import Cliente
+from models.pedido import Pedido
 from db import db
-from typing import List, Optional
+from sessao import somente_leitura
+from repositories import busca
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import with_expression
+from typing import List, Optional, Set
 
 
 class ClienteRepository:
@@ -12,22 +17,59 @@ class ClienteRepository:
         return cliente
 
     @staticmethod
+    def _com_total_pedidos():
+        # Subconsulta correlacionada: total_pedidos vem na mesma consulta dos clientes,
+        # sem hidratar a coleção de pedidos
+        total_pedidos = select(func.count(Pedido.id)).where(
+            Pedido.cliente_id == Cliente.id
+        ).correlate(Cliente).scalar_subquery()
+        return Cliente.query.options(with_expression(Cliente.total_pedidos, total_pedidos))
+
+    @staticmethod
+    def criar_em_lote(registros: List[dict]) -> None:
+        # INSERT em lote (executemany) com um único commit para todo o bloco
+        db.session.execute(insert(Cliente), registros)
+        db.session.commit()
+
+    @staticmethod
+    @somente_leitura
     def buscar_por_id(cliente_id: int) -> Optional[Cliente]:
         return Cliente.query.get(cliente_id)
 
     @staticmethod
+    @somente_leitura
     def buscar_por_email(email: str) -> Optional[Cliente]:
         return Cliente.query.filter_by(email=email).first()
 
     @staticmethod
-    def buscar_por_nome(nome: str) -> List[Cliente]:
-        return Cliente.query.filter(Cliente.nome.ilike(f'%{nome}%')).all()
+    @somente_leitura
+    def buscar_emails_existentes(emails: List[str]) -> Set[str]:
+        linhas = db.session.execute(select(Cliente.email).where(Cliente.email.in_(emails)))
+        return {email for (email,) in linhas}
 
     @staticmethod
+    @somente_leitura
+    def buscar_por_nome(nome: str, limite: int, deslocamento: int = 0) -> List[Cliente]:
+        # Usa o índice de busca textual (FTS5 no SQLite) em vez de ILIKE '%nome%'
+        return busca.buscar_por_nome(Cliente, nome, limite, deslocamento,
+                                     query=ClienteRepository._com_total_pedidos())
+
+    @staticmethod
+    @somente_leitura
     def listar_todos() -> List[Cliente]:
-        return Cliente.query.all()
+        return ClienteRepository._com_total_pedidos().all()
+
+    @staticmethod
+    @somente_leitura
+    def listar_paginado(limite: int, apos_id: Optional[int] = None) -> List[Cliente]:
+        # Paginação por cursor (keyset): o custo não cresce com a profundidade da página
+        query = ClienteRepository._com_total_pedidos()
+        if apos_id is not None:
+            query = query.filter(Cliente.id > apos_id)
+        return query.order_by(Cliente.id).limit(limite).all()
 
     @staticmethod
+    @somente_leitura
     def contar() -> int:
         return Cliente.query.count()
 
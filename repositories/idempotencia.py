@@ -0,0 +1,69 @@
+from models.chave_idempotencia import ChaveIdempotencia
+from db import db
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class IdempotenciaRepository:
+
+    @staticmethod
+    def reservar(registro: ChaveIdempotencia, agora: datetime) -> bool:
+        # Grava a chave (commit imediato, antes da requisição rodar). A PK garante que, entre
+        # requisições concorrentes com a mesma chave, só uma reserva. Chaves expiradas e
+        # reservas vencidas (processo que caiu no meio) são descartadas antes.
+        db.session.execute(
+            delete(ChaveIdempotencia).where(
+                ChaveIdempotencia.chave == registro.chave,
+                or_(ChaveIdempotencia.expira_em < agora,
+                    and_(ChaveIdempotencia.status == ChaveIdempotencia.EM_ANDAMENTO,
+                         ChaveIdempotencia.bloqueada_ate < agora))
+            )
+        )
+        db.session.add(registro)
+        try:
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    @staticmethod
+    def buscar(chave: str) -> Optional[ChaveIdempotencia]:
+        # Sempre no primário: a reserva acabou de ser gravada por outra requisição
+        return db.session.get(ChaveIdempotencia, chave, populate_existing=True)
+
+    @staticmethod
+    def concluir(chave: str, codigo_status: int, corpo: str, cabecalhos: Dict[str, str]) -> None:
+        db.session.execute(
+            update(ChaveIdempotencia)
+            .where(ChaveIdempotencia.chave == chave)
+            .values(status=ChaveIdempotencia.CONCLUIDA, codigo_status=codigo_status,
+                    corpo=corpo, cabecalhos=cabecalhos, bloqueada_ate=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def liberar(chave: str) -> None:
+        # Desfaz a reserva de uma requisição que não terminou: a próxima tentativa executa de novo
+        db.session.execute(
+            delete(ChaveIdempotencia).where(
+                ChaveIdempotencia.chave == chave,
+                ChaveIdempotencia.status == ChaveIdempotencia.EM_ANDAMENTO
+            )
+        )
+        db.session.commit()
+
+    @staticmethod
+    def limpar_expiradas(agora: datetime) -> int:
+        resultado = db.session.execute(
+            delete(ChaveIdempotencia).where(ChaveIdempotencia.expira_em < agora)
+        )
+        db.session.commit()
+        return resultado.rowcount
+
+    @staticmethod
+    def rollback():
+        db.session.rollback()
@@ -0,0 +1,108 @@
+from models.evento_outbox import EventoOutbox
+from db import db
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class OutboxRepository:
+
+    @staticmethod
+    def registrar(evento: EventoOutbox) -> EventoOutbox:
+        # Entra na transação corrente; é gravado no commit da operação que o gerou
+        db.session.add(evento)
+        return evento
+
+    @staticmethod
+    def registrar_em_lote(registros: List[Dict[str, Any]]) -> None:
+        # INSERT em lote (executemany) na transação corrente. Não faz commit.
+        if registros:
+            db.session.execute(insert(EventoOutbox), registros)
+
+    @staticmethod
+    def reservar_lote(dono: str, limite: int, agora: datetime, bloqueado_ate: datetime,
+                      tipos: Optional[List[str]] = None) -> List[EventoOutbox]:
+        # Marca até `limite` eventos disponíveis como PROCESSANDO para este dono, num UPDATE
+        # condicional: trabalhadores concorrentes nunca reservam o mesmo evento. Reservas
+        # vencidas (trabalhador que morreu no meio do lote) voltam a ficar disponíveis.
+        # tipos: só eventos desses tipos (None = todos)
+        disponiveis = or_(
+            and_(EventoOutbox.status == EventoOutbox.PENDENTE, EventoOutbox.disponivel_em <= agora),
+            and_(EventoOutbox.status == EventoOutbox.PROCESSANDO, EventoOutbox.bloqueado_ate < agora)
+        )
+        consulta = select(EventoOutbox.id).where(disponiveis)
+        if tipos is not None:
+            consulta = consulta.where(EventoOutbox.tipo.in_(tipos))
+        # Ids escolhidos antes, numa consulta separada: o MySQL não aceita LIMIT numa subconsulta
+        # IN. Quem reservou um deles nesse meio-tempo é descartado pela condição repetida no UPDATE.
+        ids = db.session.scalars(consulta.order_by(EventoOutbox.id).limit(limite)).all()
+        if not ids:
+            db.session.commit()
+            return []
+
+        db.session.execute(
+            update(EventoOutbox)
+            .where(EventoOutbox.id.in_(ids), disponiveis)
+            .values(status=EventoOutbox.PROCESSANDO, dono=dono, bloqueado_ate=bloqueado_ate)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return EventoOutbox.query.filter_by(
+            dono=dono, status=EventoOutbox.PROCESSANDO
+        ).order_by(EventoOutbox.id).all()
+
+    @staticmethod
+    def concluir(evento_ids: List[int], agora: datetime) -> None:
+        # Não faz commit
+        if evento_ids:
+            db.session.execute(
+                update(EventoOutbox)
+                .where(EventoOutbox.id.in_(evento_ids))
+                .values(status=EventoOutbox.PROCESSADO, processado_em=agora,
+                        dono=None, bloqueado_ate=None, erro=None)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def reagendar(evento_id: int, tentativas: int, disponivel_em: datetime, erro: str,
+                  status: str = EventoOutbox.PENDENTE) -> None:
+        # Não faz commit
+        db.session.execute(
+            update(EventoOutbox)
+            .where(EventoOutbox.id == evento_id)
+            .values(status=status, tentativas=tentativas, disponivel_em=disponivel_em,
+                    erro=erro, dono=None, bloqueado_ate=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def contar_por_status() -> Dict[str, int]:
+        linhas = db.session.execute(
+            select(EventoOutbox.status, func.count(EventoOutbox.id)).group_by(EventoOutbox.status)
+        )
+        return {status: total for status, total in linhas}
+
+    @staticmethod
+    def listar_falhas(limite: int) -> List[EventoOutbox]:
+        return EventoOutbox.query.filter_by(
+            status=EventoOutbox.FALHOU
+        ).order_by(EventoOutbox.id.desc()).limit(limite).all()
+
+    @staticmethod
+    def limpar_processados(antes_de: datetime) -> int:
+        resultado = db.session.execute(
+            delete(EventoOutbox).where(
+                EventoOutbox.status == EventoOutbox.PROCESSADO,
+                EventoOutbox.processado_em < antes_de
+            )
+        )
+        db.session.commit()
+        return resultado.rowcount
+
+    @staticmethod
+    def commit() -> None:
+        db.session.commit()
+
+    @staticmethod
+    def rollback():
+        db.session.rollback()
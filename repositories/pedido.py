@@ -1,7 +1,13 @@
 from models.pedido import Pedido, StatusPedido
+from models.item_pedido import ItemPedido
+from models.cliente import Cliente
+from models.produto import Produto
 from db import db
+from sessao import somente_leitura
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class PedidoRepository:
@@ -13,31 +19,181 @@ class PedidoRepository:
         return pedido
 
     @staticmethod
+    @somente_leitura
     def buscar_por_id(pedido_id: int) -> Optional[Pedido]:
         return Pedido.query.get(pedido_id)
 
     @staticmethod
+    @somente_leitura
+    def sondar(pedido_id: int) -> Optional[Tuple[int, datetime, datetime]]:
+        # (versao, atualizado_em do pedido, última atualização do cliente ou dos produtos dos
+        # itens), de que depende o to_dict do pedido, numa consulta só e sem hidratar nada
+        produtos = (
+            select(func.max(Produto.atualizado_em))
+            .join(ItemPedido, ItemPedido.produto_id == Produto.id)
+            .where(ItemPedido.pedido_id == Pedido.id)
+            .scalar_subquery()
+        )
+        linha = db.session.execute(
+            select(Pedido.versao, Pedido.atualizado_em, Cliente.atualizado_em, produtos)
+            .join(Cliente, Cliente.id == Pedido.cliente_id)
+            .where(Pedido.id == pedido_id)
+        ).first()
+        if not linha:
+            return None
+
+        versao, atualizado_em, cliente_atualizado_em, produtos_atualizado_em = linha
+        return versao, atualizado_em, max(filter(None, (cliente_atualizado_em, produtos_atualizado_em)))
+
+    @staticmethod
+    def _com_relacionamentos():
+        # Carrega cliente (JOIN) e itens com seus produtos (SELECT ... IN) junto com os
+        # pedidos, evitando uma consulta extra por pedido no to_dict
+        return Pedido.query.options(
+            joinedload(Pedido.cliente),
+            selectinload(Pedido.itens).joinedload(ItemPedido.produto)
+        )
+
+    @staticmethod
+    @somente_leitura
+    def buscar_por_id_completo(pedido_id: int) -> Optional[Pedido]:
+        # populate_existing recarrega instâncias já presentes (e expiradas após commit)
+        # com todos os relacionamentos em consultas fixas
+        return PedidoRepository._com_relacionamentos().filter(
+            Pedido.id == pedido_id
+        ).populate_existing().first()
+
+    @staticmethod
+    @somente_leitura
     def listar_todos() -> List[Pedido]:
-        return Pedido.query.order_by(Pedido.data.desc()).all()
+        return PedidoRepository._com_relacionamentos().order_by(Pedido.data.desc()).all()
+
+    @staticmethod
+    @somente_leitura
+    def listar_paginado(limite: int, apos: Optional[Tuple[datetime, int]] = None) -> List[Pedido]:
+        # Paginação por cursor (keyset) em (data, id) decrescentes; o id desempata pedidos
+        # com a mesma data para que nenhum seja pulado ou repetido entre páginas
+        query = PedidoRepository._com_relacionamentos()
+        if apos is not None:
+            data, pedido_id = apos
+            query = query.filter(or_(
+                Pedido.data < data,
+                and_(Pedido.data == data, Pedido.id < pedido_id)
+            ))
+        return query.order_by(Pedido.data.desc(), Pedido.id.desc()).limit(limite).all()
 
     @staticmethod
+    @somente_leitura
+    def iterar_todos(tamanho_lote: int = 500) -> Iterator[Pedido]:
+        # yield_per usa cursor do lado do servidor e entrega lotes de linhas, sem
+        # materializar o resultado inteiro em memória
+        return iter(PedidoRepository._com_relacionamentos().order_by(
+            Pedido.data.desc(), Pedido.id.desc()
+        ).yield_per(tamanho_lote))
+
+    @staticmethod
+    @somente_leitura
     def contar() -> int:
         return Pedido.query.count()
 
     @staticmethod
+    @somente_leitura
     def buscar_por_cliente(cliente_id: int) -> List[Pedido]:
-        return Pedido.query.filter_by(cliente_id=cliente_id).order_by(Pedido.data.desc()).all()
+        # Ordem coberta pelo índice (cliente_id, data, id)
+        return PedidoRepository._com_relacionamentos().filter_by(
+            cliente_id=cliente_id
+        ).order_by(Pedido.data.desc(), Pedido.id.desc()).all()
 
     @staticmethod
+    @somente_leitura
     def buscar_por_status(status: StatusPedido) -> List[Pedido]:
-        return Pedido.query.filter_by(status=status).order_by(Pedido.data.desc()).all()
+        # Ordem coberta pelo índice (status, data, id)
+        return PedidoRepository._com_relacionamentos().filter_by(
+            status=status
+        ).order_by(Pedido.data.desc(), Pedido.id.desc()).all()
 
     @staticmethod
-    def buscar_por_periodo(data_inicio: datetime, data_fim: datetime) -> List[Pedido]:
-        return Pedido.query.filter(
+    @somente_leitura
+    def buscar_por_periodo(data_inicio: datetime, data_fim: datetime,
+                           status: Optional[StatusPedido] = None, cliente_id: Optional[int] = None,
+                           limite: Optional[int] = None,
+                           apos: Optional[Tuple[datetime, int]] = None) -> List[Pedido]:
+        # Intervalo semiaberto [data_inicio, data_fim), mais recentes primeiro, com o mesmo
+        # cursor (data, id) da listagem. Usa o índice (status|cliente_id, data, id) conforme o filtro.
+        query = PedidoRepository._com_relacionamentos().filter(
             Pedido.data >= data_inicio,
-            Pedido.data <= data_fim
-        ).order_by(Pedido.data.desc()).all()
+            Pedido.data < data_fim
+        )
+        if status is not None:
+            query = query.filter(Pedido.status == status)
+        if cliente_id is not None:
+            query = query.filter(Pedido.cliente_id == cliente_id)
+        if apos is not None:
+            data, pedido_id = apos
+            query = query.filter(or_(
+                Pedido.data < data,
+                and_(Pedido.data == data, Pedido.id < pedido_id)
+            ))
+
+        query = query.order_by(Pedido.data.desc(), Pedido.id.desc())
+        if limite is not None:
+            query = query.limit(limite)
+        return query.all()
+
+    @staticmethod
+    def transicionar_status(pedido_id: int, status_esperado: StatusPedido, versao_esperada: int,
+                            novo_status: StatusPedido) -> int:
+        # UPDATE condicional no status e na versão lidos: só uma operação concorrente sobre o
+        # mesmo pedido consegue fazer a transição. Devolve as linhas afetadas (0 ou 1). Não faz commit.
+        resultado = db.session.execute(
+            update(Pedido)
+            .where(Pedido.id == pedido_id, Pedido.status == status_esperado,
+                   Pedido.versao == versao_esperada)
+            .values(status=novo_status, versao=Pedido.versao + 1)
+            .execution_options(synchronize_session='fetch')
+        )
+        return resultado.rowcount
+
+    @staticmethod
+    def transicionar_status_em_lote(pedido_ids: List[int], status_esperado: StatusPedido,
+                                    novo_status: StatusPedido) -> List:
+        # Um UPDATE condicional para todo o bloco; devolve (id, cliente_id, total) apenas dos
+        # pedidos que estavam no status esperado e mudaram. Não faz commit.
+        condicao = and_(Pedido.id.in_(pedido_ids), Pedido.status == status_esperado)
+        comando = (
+            update(Pedido)
+            .where(condicao)
+            .values(status=novo_status, versao=Pedido.versao + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.get_bind(Pedido).dialect.update_returning:
+            return db.session.execute(comando.returning(Pedido.id, Pedido.cliente_id, Pedido.total)).all()
+
+        # Banco sem UPDATE ... RETURNING: trava os candidatos e atualiza exatamente esses
+        linhas = db.session.execute(
+            select(Pedido.id, Pedido.cliente_id, Pedido.total).where(condicao).with_for_update()
+        ).all()
+        if linhas:
+            db.session.execute(comando.where(Pedido.id.in_([linha.id for linha in linhas])))
+        return linhas
+
+    @staticmethod
+    def somar_unidades(pedido_ids: List[int]) -> Dict[int, int]:
+        linhas = db.session.execute(
+            select(ItemPedido.pedido_id, func.sum(ItemPedido.quantidade))
+            .where(ItemPedido.pedido_id.in_(pedido_ids))
+            .group_by(ItemPedido.pedido_id)
+        )
+        return {pedido_id: unidades for pedido_id, unidades in linhas}
+
+    @staticmethod
+    def buscar_status(pedido_ids: List[int]) -> Dict[int, StatusPedido]:
+        linhas = db.session.execute(select(Pedido.id, Pedido.status).where(Pedido.id.in_(pedido_ids)))
+        return {pedido_id: status for pedido_id, status in linhas}
+
+    @staticmethod
+    def commit() -> None:
+        db.session.commit()
 
     @staticmethod
     def atualizar(pedido: Pedido) -> Pedido:
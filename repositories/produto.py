@@ -1,32 +1,128 @@
-from models.produto import Produto
+from models.produto import Produto, ProdutoDTO
 from db import db
-from typing import List, Optional
+from sessao import somente_leitura
+from repositories import busca
+from sqlalchemy import and_, func, inspect, insert, or_, select, update
+from sqlalchemy.orm import make_transient_to_detached
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ordenações da busca do catálogo: coluna e se é decrescente (o id desempata)
+ORDENACOES_CATALOGO = {
+    'preco': (Produto.preco, False),
+    '-preco': (Produto.preco, True),
+    'nome': (Produto.nome, False),
+    '-nome': (Produto.nome, True)
+}
 
 
 class ProdutoRepository:
 
+    @staticmethod
+    def _projetar(*criterios, ordenar_por=None, limite: Optional[int] = None) -> List[ProdutoDTO]:
+        # Listagens só serializam: seleciona as colunas e monta DTOs, sem hidratar entidades
+        consulta = select(*ProdutoDTO.colunas()).where(*criterios)
+        if ordenar_por is not None:
+            consulta = consulta.order_by(ordenar_por)
+        if limite is not None:
+            consulta = consulta.limit(limite)
+        return [ProdutoDTO(*linha) for linha in db.session.execute(consulta)]
+
     @staticmethod
     def criar(produto: Produto) -> Produto:
         db.session.add(produto)
         db.session.commit()
         return produto
 
+    @staticmethod
+    def criar_em_lote(registros: List[dict]) -> None:
+        # INSERT em lote (executemany) com um único commit para todo o bloco
+        db.session.execute(insert(Produto), registros)
+        db.session.commit()
+
     @staticmethod
     def buscar_por_id(produto_id: int) -> Optional[Produto]:
+        # Fica no primário: alimenta o cache de produtos, que não pode guardar dado atrasado da réplica
         return Produto.query.get(produto_id)
 
     @staticmethod
-    def buscar_por_nome(nome: str) -> List[Produto]:
-        return Produto.query.filter(Produto.nome.ilike(f'%{nome}%')).all()
+    def buscar_atual(produto_id: int) -> Optional[Produto]:
+        # populate_existing: mesmo que o produto já esteja na sessão (vindo do cache, por
+        # exemplo), estoque e preço são relidos do banco
+        return db.session.get(Produto, produto_id, populate_existing=True)
 
     @staticmethod
-    def listar_todos(incluir_inativos: bool = False) -> List[Produto]:
-        query = Produto.query
-        if not incluir_inativos:
-            query = query.filter_by(ativo=True)
-        return query.all()
+    def sondar(produto_id: int) -> Optional[Tuple[int, datetime]]:
+        # (versao, atualizado_em) sem hidratar o produto; no primário, como buscar_por_id
+        linha = db.session.execute(
+            select(Produto.versao, Produto.atualizado_em).where(Produto.id == produto_id)
+        ).first()
+        return tuple(linha) if linha else None
+
+    @staticmethod
+    def para_cache(produto: Produto) -> Dict[str, Any]:
+        # Cópia simples das colunas, independente da sessão que carregou o produto
+        return {atributo.key: getattr(produto, atributo.key) for atributo in inspect(Produto).column_attrs}
+
+    @staticmethod
+    def anexar_do_cache(dados: Dict[str, Any]) -> Produto:
+        # Reconstrói o produto a partir do cache e o associa à sessão sem consultar o banco
+        produto = inspect(Produto).class_manager.new_instance()
+        for chave, valor in dados.items():
+            setattr(produto, chave, valor)
+        make_transient_to_detached(produto)
+        return db.session.merge(produto, load=False)
+
+    @staticmethod
+    @somente_leitura
+    def buscar_por_ids(produto_ids: List[int]) -> List[Produto]:
+        return Produto.query.filter(Produto.id.in_(produto_ids)).all()
 
     @staticmethod
+    @somente_leitura
+    def buscar_por_nome(nome: str, limite: int, deslocamento: int = 0) -> List[Produto]:
+        # Usa o índice de busca textual (FTS5 no SQLite) em vez de ILIKE '%nome%'
+        return busca.buscar_por_nome(Produto, nome, limite, deslocamento)
+
+    @staticmethod
+    @somente_leitura
+    def listar_todos(incluir_inativos: bool = False) -> List[ProdutoDTO]:
+        criterios = [] if incluir_inativos else [Produto.ativo == True]
+        return ProdutoRepository._projetar(*criterios)
+
+    @staticmethod
+    @somente_leitura
+    def listar_paginado(limite: int, apos_id: Optional[int] = None,
+                        incluir_inativos: bool = False) -> List[ProdutoDTO]:
+        # Paginação por cursor (keyset): o custo não cresce com a profundidade da página
+        criterios = [] if incluir_inativos else [Produto.ativo == True]
+        if apos_id is not None:
+            criterios.append(Produto.id > apos_id)
+        return ProdutoRepository._projetar(*criterios, ordenar_por=Produto.id, limite=limite)
+
+    @staticmethod
+    @somente_leitura
+    def sondar_pagina(limite: int, apos_id: Optional[int] = None,
+                      incluir_inativos: bool = False) -> Tuple[int, int, Optional[datetime]]:
+        # Impressão digital da mesma página de listar_paginado: quantidade, soma dos ids e
+        # última atualização. Lê só id e atualizado_em, sem montar DTOs nem serializar.
+        criterios = [] if incluir_inativos else [Produto.ativo == True]
+        if apos_id is not None:
+            criterios.append(Produto.id > apos_id)
+        pagina = (
+            select(Produto.id, Produto.atualizado_em)
+            .where(*criterios)
+            .order_by(Produto.id)
+            .limit(limite)
+            .subquery()
+        )
+        quantidade, soma_ids, ultima_atualizacao = db.session.execute(
+            select(func.count(), func.coalesce(func.sum(pagina.c.id), 0), func.max(pagina.c.atualizado_em))
+        ).one()
+        return quantidade, soma_ids, ultima_atualizacao
+
+    @staticmethod
+    @somente_leitura
     def contar(incluir_inativos: bool = False) -> int:
         query = Produto.query
         if not incluir_inativos:
@@ -44,24 +140,78 @@ class ProdutoRepository:
         db.session.commit()
 
     @staticmethod
-    def buscar_por_faixa_preco(preco_min: float, preco_max: float) -> List[Produto]:
-        return Produto.query.filter(
-            Produto.preco >= preco_min,
-            Produto.preco <= preco_max,
-            Produto.ativo == True
-        ).all()
+    def reservar_estoque(produto_id: int, quantidade: int) -> bool:
+        # Checagem e baixa num único UPDATE condicional: confirmações concorrentes não
+        # conseguem ler o mesmo saldo e deixar o estoque negativo. Não faz commit.
+        resultado = db.session.execute(
+            update(Produto)
+            .where(Produto.id == produto_id,
+                   Produto.quantidade >= quantidade,
+                   Produto.ativo == True)
+            .values(quantidade=Produto.quantidade - quantidade, versao=Produto.versao + 1)
+            .execution_options(synchronize_session='fetch')
+        )
+        return resultado.rowcount == 1
+
+    @staticmethod
+    def liberar_estoque(produto_id: int, quantidade: int) -> None:
+        # Devolve estoque de forma atômica. Não faz commit.
+        db.session.execute(
+            update(Produto)
+            .where(Produto.id == produto_id)
+            .values(quantidade=Produto.quantidade + quantidade, versao=Produto.versao + 1)
+            .execution_options(synchronize_session='fetch')
+        )
+
+    @staticmethod
+    @somente_leitura
+    def buscar_catalogo(ordenar_por: str, limite: int, apos: Optional[Tuple[Any, int]] = None,
+                        preco_min: Optional[float] = None, preco_max: Optional[float] = None,
+                        nome: Optional[str] = None, em_estoque: Optional[bool] = None,
+                        ativo: bool = True) -> List[ProdutoDTO]:
+        coluna, decrescente = ORDENACOES_CATALOGO[ordenar_por]
+
+        criterios = [Produto.ativo == ativo]
+        if preco_min is not None:
+            criterios.append(Produto.preco >= preco_min)
+        if preco_max is not None:
+            criterios.append(Produto.preco <= preco_max)
+        if em_estoque is not None:
+            criterios.append(Produto.quantidade > 0 if em_estoque else Produto.quantidade == 0)
+        if nome:
+            criterios.append(busca.filtrar_por_nome(Produto, nome))
+        if apos is not None:
+            # Keyset em (coluna, id) no sentido da ordenação. O limite simples na coluna
+            # (redundante com o OR) é o que permite ao banco começar a leitura do índice no cursor.
+            valor, ultimo_id = apos
+            if decrescente:
+                criterios += [coluna <= valor,
+                              or_(coluna < valor, and_(coluna == valor, Produto.id < ultimo_id))]
+            else:
+                criterios += [coluna >= valor,
+                              or_(coluna > valor, and_(coluna == valor, Produto.id > ultimo_id))]
+
+        ordem = [coluna.desc(), Produto.id.desc()] if decrescente else [coluna, Produto.id]
+
+        # Filtro, ordenação e limite resolvidos só no índice parcial; a tabela é lida
+        # apenas para as linhas da página (join pela chave primária)
+        pagina = select(Produto.id).where(*criterios).order_by(*ordem).limit(limite).subquery()
+        consulta = select(*ProdutoDTO.colunas()).join(pagina, pagina.c.id == Produto.id).order_by(*ordem)
+        return [ProdutoDTO(*linha) for linha in db.session.execute(consulta)]
 
     @staticmethod
-    def buscar_sem_estoque() -> List[Produto]:
-        return Produto.query.filter_by(quantidade=0, ativo=True).all()
+    @somente_leitura
+    def buscar_sem_estoque() -> List[ProdutoDTO]:
+        return ProdutoRepository._projetar(Produto.quantidade == 0, Produto.ativo == True)
 
     @staticmethod
-    def buscar_estoque_baixo(limite_estoque: int = 5) -> List[Produto]:
-        return Produto.query.filter(
+    @somente_leitura
+    def buscar_estoque_baixo(limite_estoque: int = 5) -> List[ProdutoDTO]:
+        return ProdutoRepository._projetar(
             Produto.quantidade <= limite_estoque,
             Produto.quantidade > 0,
             Produto.ativo == True
-        ).all()
+        )
 
     @staticmethod
     def rollback():
@@ -0,0 +1,170 @@
+from models.resumo_venda import ResumoVenda
+from models.pedido import Pedido, StatusPedido
+from models.item_pedido import ItemPedido
+from db import db
+from sessao import somente_leitura
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Any, Dict, List, Optional
+
+# Pedidos nesses status não contam como venda
+STATUS_FORA_DAS_VENDAS = (StatusPedido.PENDENTE, StatusPedido.CANCELADO)
+
+# Dialetos com INSERT ... ON CONFLICT DO UPDATE
+INSERTS_COM_UPSERT = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+
+class RelatorioRepository:
+
+    @staticmethod
+    def somar(deltas: List[Dict[str, Any]]) -> None:
+        # Soma os deltas às linhas de resumo_vendas, criando as que não existem.
+        # Roda na transação da mudança de status do pedido. Não faz commit.
+        if not deltas:
+            return
+
+        tabela = ResumoVenda.__table__
+        criar_insert = INSERTS_COM_UPSERT.get(db.session.get_bind(ResumoVenda).dialect.name)
+
+        if criar_insert:
+            comando = criar_insert(tabela)
+            comando = comando.on_conflict_do_update(
+                index_elements=[tabela.c.dimensao, tabela.c.chave],
+                set_={
+                    'pedidos': tabela.c.pedidos + comando.excluded.pedidos,
+                    'receita': tabela.c.receita + comando.excluded.receita,
+                    'unidades': tabela.c.unidades + comando.excluded.unidades
+                }
+            )
+            db.session.execute(comando, deltas)
+        else:
+            RelatorioRepository._somar_sem_upsert(tabela, deltas)
+
+        # Linha cujo contador chegou a zero sai da tabela: a reconstrução não gera linhas vazias
+        # e os dois caminhos precisam concordar. Só deltas negativos podem zerar uma linha.
+        zeraveis = [and_(tabela.c.dimensao == delta['dimensao'], tabela.c.chave == delta['chave'])
+                    for delta in deltas if delta['pedidos'] < 0]
+        if zeraveis:
+            db.session.execute(delete(tabela).where(or_(*zeraveis), tabela.c.pedidos <= 0))
+
+    @staticmethod
+    def _somar_sem_upsert(tabela, deltas: List[Dict[str, Any]]) -> None:
+        # Demais bancos: UPDATE e, se a linha ainda não existe, INSERT. Uma inserção
+        # concorrente da mesma chave falha na PK e desfaz a transação inteira.
+        for delta in deltas:
+            resultado = db.session.execute(
+                update(tabela)
+                .where(tabela.c.dimensao == delta['dimensao'], tabela.c.chave == delta['chave'])
+                .values(pedidos=tabela.c.pedidos + delta['pedidos'],
+                        receita=tabela.c.receita + delta['receita'],
+                        unidades=tabela.c.unidades + delta['unidades'])
+            )
+            if resultado.rowcount == 0:
+                db.session.execute(insert(tabela), delta)
+
+    @staticmethod
+    @somente_leitura
+    def buscar(dimensao: str, chave: str) -> Optional[ResumoVenda]:
+        return ResumoVenda.query.filter_by(dimensao=dimensao, chave=chave).first()
+
+    @staticmethod
+    @somente_leitura
+    def listar_dimensao(dimensao: str) -> List[ResumoVenda]:
+        # pedidos > 0: linhas zeradas antes da limpeza em somar não aparecem
+        return ResumoVenda.query.filter(
+            ResumoVenda.dimensao == dimensao,
+            ResumoVenda.pedidos > 0
+        ).order_by(ResumoVenda.chave).all()
+
+    @staticmethod
+    @somente_leitura
+    def listar_intervalo(dimensao: str, inicio: str, fim: str) -> List[ResumoVenda]:
+        return ResumoVenda.query.filter(
+            ResumoVenda.dimensao == dimensao,
+            ResumoVenda.chave >= inicio,
+            ResumoVenda.chave <= fim,
+            ResumoVenda.pedidos > 0
+        ).order_by(ResumoVenda.chave).all()
+
+    @staticmethod
+    @somente_leitura
+    def listar_maiores(dimensao: str, coluna: str, limite: int) -> List[ResumoVenda]:
+        ordem = getattr(ResumoVenda, coluna)
+        return ResumoVenda.query.filter(
+            ResumoVenda.dimensao == dimensao,
+            ResumoVenda.pedidos > 0
+        ).order_by(ordem.desc(), ResumoVenda.chave).limit(limite).all()
+
+    @staticmethod
+    def reconstruir() -> int:
+        # Recalcula todos os agregados a partir de pedidos e itens. Não faz commit.
+        unidades_por_pedido = (
+            select(ItemPedido.pedido_id, func.sum(ItemPedido.quantidade).label('unidades'))
+            .group_by(ItemPedido.pedido_id)
+            .subquery()
+        )
+        agregados = (
+            func.count(Pedido.id),
+            func.coalesce(func.sum(Pedido.total), 0.0),
+            func.coalesce(func.sum(unidades_por_pedido.c.unidades), 0)
+        )
+
+        def agrupar(dimensao, chave, *criterios):
+            # Sem chave de agrupamento: uma única linha com o total geral
+            coluna_chave = literal(ResumoVenda.CHAVE_TOTAL) if chave is None else chave
+            consulta = select(coluna_chave, *agregados).select_from(Pedido).outerjoin(
+                unidades_por_pedido, unidades_por_pedido.c.pedido_id == Pedido.id
+            ).where(*criterios)
+            if chave is not None:
+                consulta = consulta.group_by(chave)
+            return [
+                {'dimensao': dimensao, 'chave': RelatorioRepository._chave(valor),
+                 'pedidos': pedidos, 'receita': receita, 'unidades': unidades}
+                for valor, pedidos, receita, unidades in db.session.execute(consulta)
+                if pedidos
+            ]
+
+        venda = Pedido.status.notin_(STATUS_FORA_DAS_VENDAS)
+        linhas = agrupar(ResumoVenda.DIMENSAO_TOTAL, None, venda)
+        linhas += agrupar(ResumoVenda.DIMENSAO_STATUS, Pedido.status, Pedido.status != StatusPedido.PENDENTE)
+        linhas += agrupar(ResumoVenda.DIMENSAO_DIA, func.date(Pedido.data), venda)
+
+        por_produto = (
+            select(ItemPedido.produto_id,
+                   func.count(ItemPedido.pedido_id),
+                   func.sum(ItemPedido.quantidade * ItemPedido.preco_unitario),
+                   func.sum(ItemPedido.quantidade))
+            .join(Pedido, Pedido.id == ItemPedido.pedido_id)
+            .where(venda)
+            .group_by(ItemPedido.produto_id)
+        )
+        linhas += [
+            {'dimensao': ResumoVenda.DIMENSAO_PRODUTO, 'chave': str(produto_id),
+             'pedidos': pedidos, 'receita': receita, 'unidades': unidades}
+            for produto_id, pedidos, receita, unidades in db.session.execute(por_produto)
+        ]
+
+        db.session.execute(delete(ResumoVenda))
+        if linhas:
+            db.session.execute(insert(ResumoVenda), linhas)
+        return len(linhas)
+
+    @staticmethod
+    def _chave(valor: Any) -> str:
+        # Status vira o valor do enum; datas (date no PostgreSQL, texto no SQLite) viram AAAA-MM-DD
+        if isinstance(valor, StatusPedido):
+            return valor.value
+        if hasattr(valor, 'isoformat'):
+            return valor.isoformat()
+        return str(valor)
+
+    @staticmethod
+    def commit() -> None:
+        db.session.commit()
+
+    @staticmethod
+    def rollback():
+        db.session.rollback()
@@ -0,0 +1,75 @@
+# serializacao.py - Provedor JSON das respostas, com orjson quando disponível
+
+import dataclasses
+import decimal
+import json
+import os
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+def converter_valor(valor: Any) -> Any:
+    # Tipos que os encoders não conhecem nativamente; datas em ISO 8601 (não em HTTP date)
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, decimal.Decimal):
+        return float(valor)
+    if isinstance(valor, uuid.UUID):
+        return str(valor)
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return dataclasses.asdict(valor)
+    if hasattr(valor, '__html__'):
+        return str(valor.__html__())
+    raise TypeError(f"Objeto do tipo {type(valor).__name__} não é serializável em JSON")
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    # Usa orjson (datetime, Enum e float nativos, em C) quando instalado; senão, o json da
+    # stdlib com converter_valor. JSON_ORJSON=false força a stdlib.
+
+    default = staticmethod(converter_valor)
+
+    def __init__(self, app):
+        super().__init__(app)
+        ativo = os.getenv('JSON_ORJSON', 'true').strip().lower() not in ('0', 'false', 'nao', 'no', 'off')
+        self.usar_orjson = orjson is not None and ativo
+
+    def _opcoes_orjson(self) -> int:
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=converter_valor, option=self._opcoes_orjson())
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Argumentos extras (indent, cls...) só fazem sentido para o json da stdlib
+        if self.usar_orjson and not kwargs:
+            return self._dumps_bytes(obj).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if self.usar_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not self.usar_orjson:
+            return super().response(*args, **kwargs)
+
+        # Gera bytes direto para o corpo, sem passar por str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
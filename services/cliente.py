@@ -1,8 +1,16 @@
 from models.cliente import Cliente
+from hash_senha import ServicoSenhaSobrecarregado
 from repositories.cliente import ClienteRepository
-from typing import List, Optional
+from services.paginacao import (validar_limite, validar_deslocamento, codificar_cursor,
+                                decodificar_cursor_id)
+from services.lote import validar_lote, inserir_em_blocos, TAMANHO_BLOCO
+from typing import Any, Dict, List, Optional, Tuple
 import re
 
+# Cada linha custa um hash de senha (dezenas de ms de CPU): lotes de clientes são bem
+# menores que os de produtos
+LIMITE_LOTE_CLIENTES = 1000
+
 
 class ClienteService:
 
@@ -18,21 +26,83 @@ class ClienteService:
         try:
             cliente = Cliente(nome=nome, email=email, senha=senha)
             return self.repository.criar(cliente)
+        except ServicoSenhaSobrecarregado:
+            self.repository.rollback()
+            raise
         except Exception as e:
             self.repository.rollback()
             raise ValueError(f"Erro ao criar cliente: {str(e)}")
 
+    def criar_clientes_em_lote(self, dados: List[Dict[str, Any]]) -> Dict[str, Any]:
+        validar_lote(dados, LIMITE_LOTE_CLIENTES)
+
+        erros = []
+        validos = []
+        emails_no_lote = set()
+        for indice, item in enumerate(dados):
+            try:
+                self._validar_item_lote(item)
+                if item['email'] in emails_no_lote:
+                    raise ValueError(f"Email '{item['email']}' repetido no lote")
+                emails_no_lote.add(item['email'])
+                validos.append((indice, item))
+            except ValueError as e:
+                erros.append({'indice': indice, 'erro': str(e)})
+
+        # Emails já cadastrados são verificados com uma consulta IN por bloco
+        registros = []
+        for inicio in range(0, len(validos), TAMANHO_BLOCO):
+            bloco = validos[inicio:inicio + TAMANHO_BLOCO]
+            existentes = self.repository.buscar_emails_existentes([item['email'] for _, item in bloco])
+            novos = []
+            for indice, item in bloco:
+                if item['email'] in existentes:
+                    erros.append({'indice': indice, 'erro': f"Email '{item['email']}' já está em uso"})
+                else:
+                    novos.append((indice, item))
+
+            hashes = Cliente.gerar_hashes_senha([item['senha'] for _, item in novos])
+            for (indice, item), hash_senha in zip(novos, hashes):
+                registros.append((indice, {
+                    'nome': item['nome'],
+                    'email': item['email'],
+                    'senha': hash_senha
+                }))
+
+        criados, erros_insercao = inserir_em_blocos(registros, self.repository.criar_em_lote,
+                                                    self.repository.rollback)
+        erros.extend(erros_insercao)
+        return {
+            'criados': criados,
+            'erros': sorted(erros, key=lambda erro: erro['indice'])
+        }
+
     def buscar_cliente_por_id(self, cliente_id: int) -> Optional[Cliente]:
         return self.repository.buscar_por_id(cliente_id)
 
-    def buscar_clientes_por_nome(self, nome: str) -> List[Cliente]:
+    def buscar_clientes_por_nome(self, nome: str, limite: int = None,
+                              deslocamento: int = None) -> List[Cliente]:
         if not nome or len(nome.strip()) < 2:
             raise ValueError("Nome deve ter pelo menos 2 caracteres")
-        return self.repository.buscar_por_nome(nome.strip())
+        return self.repository.buscar_por_nome(nome.strip(), validar_limite(limite),
+                                               validar_deslocamento(deslocamento))
 
     def listar_todos_clientes(self) -> List[Cliente]:
         return self.repository.listar_todos()
 
+    def listar_clientes_paginado(self, limite: int = None,
+                                 cursor: str = None) -> Tuple[List[Cliente], Optional[str]]:
+        limite = validar_limite(limite)
+        apos_id = decodificar_cursor_id(cursor) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        clientes = self.repository.listar_paginado(limite + 1, apos_id=apos_id)
+        if len(clientes) <= limite:
+            return clientes, None
+
+        clientes = clientes[:limite]
+        return clientes, codificar_cursor(clientes[-1].id)
+
     def contar_clientes(self) -> int:
         return self.repository.contar()
 
@@ -59,6 +129,9 @@ class ClienteService:
                 cliente.set_senha(senha)
 
             return self.repository.atualizar(cliente)
+        except ServicoSenhaSobrecarregado:
+            self.repository.rollback()
+            raise
         except Exception as e:
             self.repository.rollback()
             raise ValueError(f"Erro ao atualizar cliente: {str(e)}")
@@ -80,9 +153,28 @@ class ClienteService:
 
     def autenticar_cliente(self, email: str, senha: str) -> Optional[Cliente]:
         cliente = self.repository.buscar_por_email(email)
-        if cliente and cliente.check_senha(senha):
-            return cliente
-        return None
+        if not cliente or not cliente.check_senha(senha):
+            return None
+
+        # Parâmetros de hash mudaram: aproveita a senha em claro do login para atualizar o hash
+        if cliente.senha_precisa_rehash():
+            try:
+                cliente.set_senha(senha)
+                self.repository.atualizar(cliente)
+            except Exception:
+                # Falha no rehash não impede o login; será tentado de novo no próximo
+                self.repository.rollback()
+        return cliente
+
+    def _validar_item_lote(self, item: Any) -> None:
+        if not isinstance(item, dict):
+            raise ValueError("Item deve ser um objeto JSON")
+
+        for campo in ['nome', 'email', 'senha']:
+            if campo not in item:
+                raise ValueError(f"Campo {campo} é obrigatório")
+
+        self._validar_dados_cliente(item['nome'], item['email'], item['senha'])
 
     def _validar_dados_cliente(self, nome: str, email: str, senha: str) -> None:
         self._validar_nome(nome)
@@ -0,0 +1,66 @@
+from models.chave_idempotencia import ChaveIdempotencia
+from repositories.idempotencia import IdempotenciaRepository
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+
+# Por quanto tempo uma chave concluída devolve a resposta guardada
+TTL_PADRAO_S = int(os.getenv('IDEMPOTENCIA_TTL_S', 24 * 60 * 60))
+# Tempo máximo de uma requisição em andamento; depois disso outra tentativa pode assumir a chave
+DURACAO_RESERVA_S = 60
+TAMANHO_MAXIMO_CHAVE = 255
+
+
+class IdempotenciaService:
+
+    def __init__(self, ttl_s: int = TTL_PADRAO_S):
+        self.repository = IdempotenciaRepository()
+        self.ttl_s = ttl_s
+
+    def reservar(self, chave: str, hash_requisicao: str) -> Optional[ChaveIdempotencia]:
+        # None = chave reservada para esta requisição, que deve ser executada. Caso contrário
+        # devolve o registro existente (em andamento ou concluído) para quem chamou decidir.
+        self._validar_chave(chave)
+
+        agora = datetime.utcnow()
+        registro = ChaveIdempotencia(
+            chave=chave,
+            hash_requisicao=hash_requisicao,
+            bloqueada_ate=agora + timedelta(seconds=DURACAO_RESERVA_S),
+            expira_em=agora + timedelta(seconds=self.ttl_s)
+        )
+        while not self.repository.reservar(registro, agora):
+            existente = self.repository.buscar(chave)
+            # Removida entre o INSERT e a leitura (liberada ou limpa): tenta reservar de novo
+            if existente is not None:
+                return existente
+        return None
+
+    def concluir(self, chave: str, codigo_status: int, corpo: str, cabecalhos: Dict[str, str]) -> None:
+        self.repository.concluir(chave, codigo_status, corpo, cabecalhos)
+
+    def liberar(self, chave: str) -> None:
+        self.repository.liberar(chave)
+
+    def limpar_expiradas(self) -> int:
+        return self.repository.limpar_expiradas(datetime.utcnow())
+
+    def chave_no_escopo(self, chave: str, metodo: str, rota: str, chamador: Optional[str]) -> str:
+        # A mesma chave enviada para outra rota ou por outro chamador é outra operação: o que
+        # se guarda é o hash dos quatro, com tamanho fixo (o chamador não fica em claro no banco)
+        self._validar_chave(chave)
+        conteudo = json.dumps([metodo, rota, chamador, chave], separators=(',', ':'))
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def calcular_hash(self, metodo: str, rota: str, corpo: Any) -> str:
+        # JSON em forma canônica: a mesma requisição com chaves em outra ordem tem o mesmo hash
+        conteudo = json.dumps([metodo, rota, corpo], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def _validar_chave(self, chave: str) -> None:
+        if not chave or not chave.strip():
+            raise ValueError("Idempotency-Key não pode ser vazio")
+        if len(chave) > TAMANHO_MAXIMO_CHAVE:
+            raise ValueError(f"Idempotency-Key deve ter no máximo {TAMANHO_MAXIMO_CHAVE} caracteres")
@@ -0,0 +1,39 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+TAMANHO_BLOCO = 1000
+LIMITE_LOTE = 50000
+
+
+def validar_lote(dados: Any, limite: int = LIMITE_LOTE) -> None:
+    if not isinstance(dados, list) or not dados:
+        raise ValueError("Envie uma lista com ao menos um item")
+    if len(dados) > limite:
+        raise ValueError(f"O lote deve ter no máximo {limite} itens")
+
+
+def inserir_em_blocos(registros: List[Tuple[int, dict]],
+                      inserir: Callable[[List[dict]], None],
+                      rollback: Callable[[], None]) -> Tuple[int, List[Dict[str, Any]]]:
+    # Insere (índice, registro) em blocos, cada um na sua transação. Se um bloco falha,
+    # ele é refeito linha a linha para que só as linhas problemáticas sejam rejeitadas.
+    criados = 0
+    erros = []
+
+    for inicio in range(0, len(registros), TAMANHO_BLOCO):
+        bloco = registros[inicio:inicio + TAMANHO_BLOCO]
+        try:
+            inserir([registro for _, registro in bloco])
+            criados += len(bloco)
+            continue
+        except Exception:
+            rollback()
+
+        for indice, registro in bloco:
+            try:
+                inserir([registro])
+                criados += 1
+            except Exception as e:
+                rollback()
+                erros.append({'indice': indice, 'erro': str(e)})
+
+    return criados, erros
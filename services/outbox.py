@@ -0,0 +1,191 @@
+from models.evento_outbox import EventoOutbox
+from models.pedido import Pedido, StatusPedido
+from repositories.outbox import OutboxRepository
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import json
+import logging
+import os
+import urllib.request
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MAX_TENTATIVAS = 5
+BACKOFF_BASE_S = 2
+BACKOFF_MAXIMO_S = 300
+# Tempo que um lote fica reservado; depois disso outro trabalhador pode retomá-lo
+DURACAO_RESERVA_S = 60
+
+# Handlers por tipo de evento ('*' recebe todos). Cada um recebe o EventoOutbox; exceção = falha.
+_handlers: Dict[str, List[Callable[[EventoOutbox], None]]] = {}
+
+
+def registrar_handler(tipo: str):
+    # Uso: @registrar_handler('pedido.confirmado')
+    def registrar(handler: Callable[[EventoOutbox], None]):
+        _handlers.setdefault(tipo, []).append(handler)
+        return handler
+    return registrar
+
+
+def handlers_do_tipo(tipo: str) -> List[Callable[[EventoOutbox], None]]:
+    return _handlers.get(tipo, []) + _handlers.get('*', [])
+
+
+def tipos_com_handler() -> Optional[List[str]]:
+    # Tipos que o trabalhador pode entregar (None = todos, há handler '*'). Eventos de um tipo
+    # sem handler continuam PENDENTE até algum ser registrado, em vez de virarem PROCESSADO.
+    if _handlers.get('*'):
+        return None
+    return [tipo for tipo, handlers in _handlers.items() if handlers]
+
+
+def publicador_webhook(url: str, timeout: float = 10.0) -> Callable[[EventoOutbox], None]:
+    # POST do evento em JSON. Resposta 4xx/5xx ou erro de rede = falha (nova tentativa com backoff).
+    # O id do evento vai em Idempotency-Key: com entrega pelo menos uma vez, o destino descarta repetidos.
+    def publicar(evento: EventoOutbox) -> None:
+        corpo = json.dumps({
+            'id': evento.id,
+            'tipo': evento.tipo,
+            'agregado_id': evento.agregado_id,
+            'payload': evento.payload
+        }, default=str).encode('utf-8')
+        requisicao = urllib.request.Request(url, data=corpo, method='POST', headers={
+            'Content-Type': 'application/json',
+            'Idempotency-Key': f'evento-{evento.id}'
+        })
+        with urllib.request.urlopen(requisicao, timeout=timeout):
+            pass
+    return publicar
+
+
+def registrar_handlers_do_ambiente() -> None:
+    # OUTBOX_WEBHOOK_URL: publica todos os eventos nesse endpoint (OUTBOX_WEBHOOK_TIMEOUT_S)
+    url = os.getenv('OUTBOX_WEBHOOK_URL')
+    if url:
+        registrar_handler('*')(publicador_webhook(url, float(os.getenv('OUTBOX_WEBHOOK_TIMEOUT_S', 10))))
+    else:
+        logger.warning('OUTBOX_WEBHOOK_URL não definida: eventos sem handler ficam pendentes na outbox')
+
+
+class OutboxService:
+
+    def __init__(self, max_tentativas: int = MAX_TENTATIVAS, backoff_base_s: float = BACKOFF_BASE_S):
+        self.repository = OutboxRepository()
+        self.max_tentativas = max_tentativas
+        self.backoff_base_s = backoff_base_s
+
+    def publicar_mudanca_status(self, pedido: Pedido, status_anterior: StatusPedido,
+                                status_novo: StatusPedido) -> EventoOutbox:
+        # Só adiciona o evento à sessão: o INSERT sai no mesmo commit da mudança de status
+        return self.repository.registrar(EventoOutbox(
+            tipo=self._tipo_mudanca_status(status_novo),
+            agregado_id=pedido.id,
+            payload=self._payload_mudanca_status(pedido.id, pedido.cliente_id, pedido.total,
+                                                 status_anterior, status_novo)
+        ))
+
+    def publicar_mudancas_em_lote(self, pedidos: List, status_anterior: StatusPedido,
+                                  status_novo: StatusPedido) -> None:
+        # pedidos: linhas com id, cliente_id e total. Um único INSERT em lote, na transação corrente.
+        agora = datetime.utcnow()
+        self.repository.registrar_em_lote([
+            {
+                'tipo': self._tipo_mudanca_status(status_novo),
+                'agregado_id': pedido.id,
+                'payload': self._payload_mudanca_status(pedido.id, pedido.cliente_id, pedido.total,
+                                                        status_anterior, status_novo, agora),
+                'status': EventoOutbox.PENDENTE,
+                'tentativas': 0,
+                'criado_em': agora,
+                'disponivel_em': agora
+            }
+            for pedido in pedidos
+        ])
+
+    def processar_lote(self, tamanho_lote: int = 100) -> int:
+        # Entrega pelo menos uma vez: um evento só vira PROCESSADO depois que todos os seus
+        # handlers terminaram sem erro; handlers precisam ser idempotentes
+        tipos = tipos_com_handler()
+        if tipos == []:
+            return 0
+
+        agora = datetime.utcnow()
+        eventos = self.repository.reservar_lote(uuid.uuid4().hex, tamanho_lote, agora,
+                                                agora + timedelta(seconds=DURACAO_RESERVA_S), tipos)
+        if not eventos:
+            return 0
+
+        concluidos = []
+        try:
+            for evento in eventos:
+                try:
+                    for handler in handlers_do_tipo(evento.tipo):
+                        handler(evento)
+                    concluidos.append(evento.id)
+                except Exception as e:
+                    self._agendar_nova_tentativa(evento, e)
+
+            self.repository.concluir(concluidos, datetime.utcnow())
+            self.repository.commit()
+        except Exception:
+            # Reservas não gravadas vencem em DURACAO_RESERVA_S e o lote é retomado
+            self.repository.rollback()
+            raise
+        return len(eventos)
+
+    def drenar(self, tamanho_lote: int = 100) -> int:
+        # Processa lotes até não sobrar evento disponível agora
+        total = 0
+        while True:
+            processados = self.processar_lote(tamanho_lote)
+            if not processados:
+                return total
+            total += processados
+
+    def obter_estatisticas(self, limite_falhas: int = 20) -> Dict[str, Any]:
+        contagens = self.repository.contar_por_status()
+        return {
+            'por_status': {
+                status: contagens.get(status, 0)
+                for status in (EventoOutbox.PENDENTE, EventoOutbox.PROCESSANDO,
+                               EventoOutbox.PROCESSADO, EventoOutbox.FALHOU)
+            },
+            'falhas_recentes': [evento.to_dict() for evento in self.repository.listar_falhas(limite_falhas)]
+        }
+
+    def limpar_processados(self, dias: int = 7) -> int:
+        if not isinstance(dias, int) or dias < 0:
+            raise ValueError("Dias deve ser um número inteiro não negativo")
+        return self.repository.limpar_processados(datetime.utcnow() - timedelta(days=dias))
+
+    def _tipo_mudanca_status(self, status_novo: StatusPedido) -> str:
+        return f'pedido.{status_novo.value.lower()}'
+
+    def _payload_mudanca_status(self, pedido_id: int, cliente_id: int, total: float,
+                                status_anterior: StatusPedido, status_novo: StatusPedido,
+                                ocorrido_em: datetime = None) -> Dict[str, Any]:
+        return {
+            'pedido_id': pedido_id,
+            'cliente_id': cliente_id,
+            'status_anterior': status_anterior.value,
+            'status': status_novo.value,
+            'total': total,
+            'ocorrido_em': (ocorrido_em or datetime.utcnow()).isoformat()
+        }
+
+    def _agendar_nova_tentativa(self, evento: EventoOutbox, erro: Exception) -> None:
+        tentativas = evento.tentativas + 1
+        if tentativas >= self.max_tentativas:
+            # Esgotou as tentativas: fica como FALHOU para análise, fora da fila
+            status = EventoOutbox.FALHOU
+            disponivel_em = evento.disponivel_em
+        else:
+            # Backoff exponencial: base, 2x base, 4x base... até BACKOFF_MAXIMO_S
+            status = EventoOutbox.PENDENTE
+            espera = min(self.backoff_base_s * 2 ** (tentativas - 1), BACKOFF_MAXIMO_S)
+            disponivel_em = datetime.utcnow() + timedelta(seconds=espera)
+
+        self.repository.reagendar(evento.id, tentativas, disponivel_em,
+                                  f'{type(erro).__name__}: {erro}', status=status)
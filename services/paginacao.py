@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+def validar_limite(limite: Optional[int]) -> int:
+    if limite is None:
+        return LIMITE_PADRAO
+    if not isinstance(limite, int) or limite <= 0:
+        raise ValueError("Limite deve ser um número inteiro positivo")
+    if limite > LIMITE_MAXIMO:
+        raise ValueError(f"Limite deve ser no máximo {LIMITE_MAXIMO}")
+    return limite
+
+
+def validar_deslocamento(deslocamento: Optional[int]) -> int:
+    if deslocamento is None:
+        return 0
+    if not isinstance(deslocamento, int) or deslocamento < 0:
+        raise ValueError("Offset deve ser um número inteiro não negativo")
+    return deslocamento
+
+
+def codificar_cursor(*valores: Any) -> str:
+    # Cursor opaco: lista JSON com a chave de ordenação do último item, em base64 url-safe
+    serializaveis = [valor.isoformat() if isinstance(valor, datetime) else valor for valor in valores]
+    bruto = json.dumps(serializaveis, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str, quantidade_valores: int) -> List[Any]:
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(valores, list) or len(valores) != quantidade_valores:
+        raise ValueError("Cursor inválido")
+    return valores
+
+
+def decodificar_cursor_id(cursor: str) -> int:
+    [ultimo_id] = decodificar_cursor(cursor, 1)
+    if not isinstance(ultimo_id, int):
+        raise ValueError("Cursor inválido")
+    return ultimo_id
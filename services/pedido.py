@@ -2,7 +2,65 @@ from models.pedido import Pedido, StatusPedido
 from repositories.pedido import PedidoRepository
 from services.cliente import ClienteService
 from services.produto import ProdutoService
-from typing import List, Optional
+from services.relatorio import RelatorioService
+from services.outbox import OutboxService
+from services.paginacao import validar_limite, codificar_cursor, decodificar_cursor
+from services.lote import validar_lote
+from services.versao import ConflitoVersao, verificar_versao, eh_conflito, como_conflito
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Efeitos colaterais das transições: recebem o serviço e o pedido, rodam na transação da
+# mudança de status e devolvem os ids dos produtos cujo estoque foi alterado
+
+def _exigir_itens(servico: 'PedidoService', pedido: Pedido) -> List[int]:
+    if not pedido.itens:
+        raise ValueError("Pedido deve ter pelo menos um produto")
+    return []
+
+
+def _reservar_estoque(servico: 'PedidoService', pedido: Pedido) -> List[int]:
+    # Ordem fixa por produto evita deadlock entre confirmações concorrentes
+    itens = sorted(pedido.itens, key=lambda item: item.produto_id)
+    for item in itens:
+        if not servico.produto_service.reservar_estoque(item.produto_id, item.quantidade):
+            raise ValueError(f"Estoque insuficiente para {item.produto.nome}")
+    return [item.produto_id for item in itens]
+
+
+def _liberar_estoque(servico: 'PedidoService', pedido: Pedido) -> List[int]:
+    itens = sorted(pedido.itens, key=lambda item: item.produto_id)
+    for item in itens:
+        servico.produto_service.liberar_estoque(item.produto_id, item.quantidade)
+    return [item.produto_id for item in itens]
+
+
+# Máquina de estados do pedido: status de origem -> {status de destino: efeitos, em ordem}.
+# Destino ausente = transição proibida; ENTREGUE e CANCELADO são finais.
+TRANSICOES = {
+    StatusPedido.PENDENTE: {
+        StatusPedido.CONFIRMADO: (_exigir_itens, _reservar_estoque),
+        StatusPedido.CANCELADO: ()
+    },
+    StatusPedido.CONFIRMADO: {
+        StatusPedido.PROCESSANDO: (),
+        StatusPedido.CANCELADO: (_liberar_estoque,)
+    },
+    StatusPedido.PROCESSANDO: {
+        StatusPedido.ENVIADO: (),
+        StatusPedido.CANCELADO: (_liberar_estoque,)
+    },
+    StatusPedido.ENVIADO: {
+        StatusPedido.ENTREGUE: (),
+        StatusPedido.CANCELADO: (_liberar_estoque,)
+    },
+    StatusPedido.ENTREGUE: {},
+    StatusPedido.CANCELADO: {}
+}
+
+# Ids por UPDATE na transição em lote (fica abaixo do limite de parâmetros do SQLite)
+TAMANHO_BLOCO_STATUS = 500
 
 
 class PedidoService:
@@ -11,6 +69,8 @@ class PedidoService:
         self.repository = PedidoRepository()
         self.cliente_service = ClienteService()
         self.produto_service = ProdutoService()
+        self.relatorio_service = RelatorioService()
+        self.outbox_service = OutboxService()
 
     def criar_pedido(self, cliente_id: int, observacoes: str = None) -> Pedido:
         cliente = self.cliente_service.buscar_cliente_por_id(cliente_id)
@@ -27,9 +87,35 @@ class PedidoService:
     def buscar_pedido_por_id(self, pedido_id: int) -> Optional[Pedido]:
         return self.repository.buscar_por_id(pedido_id)
 
+    def sondar_pedido(self, pedido_id: int) -> Optional[Tuple[int, datetime, datetime]]:
+        # (versao, atualizado_em, última atualização de cliente/produtos) para GET condicional
+        return self.repository.sondar(pedido_id)
+
+    def sonda_do_pedido(self, pedido: Pedido) -> Tuple[int, datetime, datetime]:
+        # A mesma tupla de sondar_pedido, a partir do pedido já carregado (resposta das escritas)
+        dependencias = [pedido.cliente.atualizado_em]
+        dependencias += [item.produto.atualizado_em for item in pedido.itens if item.produto]
+        return pedido.versao, pedido.atualizado_em, max(filter(None, dependencias))
+
     def listar_todos_pedidos(self) -> List[Pedido]:
         return self.repository.listar_todos()
 
+    def listar_pedidos_paginado(self, limite: int = None,
+                                cursor: str = None) -> Tuple[List[Pedido], Optional[str]]:
+        limite = validar_limite(limite)
+        apos = self._decodificar_cursor_pedido(cursor) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        pedidos = self.repository.listar_paginado(limite + 1, apos=apos)
+        if len(pedidos) <= limite:
+            return pedidos, None
+
+        pedidos = pedidos[:limite]
+        return pedidos, codificar_cursor(pedidos[-1].data, pedidos[-1].id)
+
+    def exportar_pedidos(self, tamanho_lote: int = 500) -> Iterator[Pedido]:
+        return self.repository.iterar_todos(tamanho_lote=tamanho_lote)
+
     def contar_pedidos(self) -> int:
         return self.repository.contar()
 
@@ -39,6 +125,40 @@ class PedidoService:
     def buscar_pedidos_por_status(self, status: StatusPedido) -> List[Pedido]:
         return self.repository.buscar_por_status(status)
 
+    def buscar_pedidos_por_periodo(self, inicio: str, fim: str, status: str = None,
+                                   cliente_id: int = None, limite: int = None,
+                                   cursor: str = None) -> Tuple[List[Pedido], Optional[str]]:
+        if not inicio or not fim:
+            raise ValueError("Parâmetros inicio e fim são obrigatórios")
+
+        data_inicio = self._converter_data(inicio, 'inicio')
+        data_fim = self._converter_data(fim, 'fim')
+        # Data sem hora no fim inclui o dia inteiro
+        if len(fim) == 10:
+            data_fim += timedelta(days=1)
+        if data_inicio >= data_fim:
+            raise ValueError("Data de início deve ser anterior à data de fim")
+
+        status_enum = None
+        if status:
+            try:
+                status_enum = StatusPedido(status.upper())
+            except ValueError:
+                raise ValueError(f"Status inválido. Valores válidos: {[s.value for s in StatusPedido]}")
+
+        limite = validar_limite(limite)
+        apos = self._decodificar_cursor_pedido(cursor) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        pedidos = self.repository.buscar_por_periodo(data_inicio, data_fim, status=status_enum,
+                                                     cliente_id=cliente_id, limite=limite + 1,
+                                                     apos=apos)
+        if len(pedidos) <= limite:
+            return pedidos, None
+
+        pedidos = pedidos[:limite]
+        return pedidos, codificar_cursor(pedidos[-1].data, pedidos[-1].id)
+
     def adicionar_produto_ao_pedido(self, pedido_id: int, produto_id: int,
                                     quantidade: int = 1) -> Optional[Pedido]:
         pedido = self.repository.buscar_por_id(pedido_id)
@@ -48,7 +168,11 @@ class PedidoService:
         if pedido.status != StatusPedido.PENDENTE:
             raise ValueError("Só é possível adicionar produtos a pedidos pendentes")
 
-        produto = self.produto_service.buscar_produto_por_id(produto_id)
+        if not isinstance(quantidade, int) or quantidade <= 0:
+            raise ValueError("Quantidade deve ser um número inteiro positivo")
+
+        # Estoque e preço vêm do banco: o cache pode estar atrasado em relação a outros processos
+        produto = self.produto_service.buscar_produto_atual(produto_id)
         if not produto:
             raise ValueError(f"Produto com ID {produto_id} não encontrado")
 
@@ -63,64 +187,150 @@ class PedidoService:
             return self.repository.atualizar(pedido)
         except Exception as e:
             self.repository.rollback()
+            if eh_conflito(e):
+                raise como_conflito(e, 'Pedido')
             raise ValueError(f"Erro ao adicionar produto ao pedido: {str(e)}")
 
-    def remover_produto_do_pedido(self, pedido_id: int, produto_id: int) -> Optional[Pedido]:
+    def adicionar_produtos_ao_pedido(self, pedido_id: int,
+                                     itens: List[Dict[str, Any]]) -> Optional[Pedido]:
         pedido = self.repository.buscar_por_id(pedido_id)
         if not pedido:
             return None
 
         if pedido.status != StatusPedido.PENDENTE:
-            raise ValueError("Só é possível remover produtos de pedidos pendentes")
+            raise ValueError("Só é possível adicionar produtos a pedidos pendentes")
+
+        quantidades = self._agrupar_itens(itens)
+
+        # Todos os produtos referenciados em uma única consulta IN
+        produtos = self.produto_service.buscar_produtos_por_ids(list(quantidades))
+        nao_encontrados = [produto_id for produto_id in quantidades if produto_id not in produtos]
+        if nao_encontrados:
+            raise ValueError(f"Produtos não encontrados: {nao_encontrados}")
+
+        for produto_id in quantidades:
+            if not produtos[produto_id].ativo:
+                raise ValueError(f"Produto {produto_id} está inativo")
 
         try:
-            pedido.remover_produto(produto_id)
-            return self.repository.atualizar(pedido)
+            # Valida estoque de todas as linhas, soma o total e faz um único commit
+            pedido.adicionar_produtos(
+                [(produtos[produto_id], quantidade) for produto_id, quantidade in quantidades.items()]
+            )
+            self.repository.atualizar(pedido)
+            return self.repository.buscar_por_id_completo(pedido.id)
         except Exception as e:
             self.repository.rollback()
-            raise ValueError(f"Erro ao remover produto do pedido: {str(e)}")
+            if eh_conflito(e):
+                raise como_conflito(e, 'Pedido')
+            raise ValueError(f"Erro ao adicionar produtos ao pedido: {str(e)}")
 
-    def confirmar_pedido(self, pedido_id: int) -> Optional[Pedido]:
+    def remover_produto_do_pedido(self, pedido_id: int, produto_id: int) -> Optional[Pedido]:
         pedido = self.repository.buscar_por_id(pedido_id)
         if not pedido:
             return None
 
         if pedido.status != StatusPedido.PENDENTE:
-            raise ValueError("Apenas pedidos pendentes podem ser confirmados")
-
-        if not pedido.produtos:
-            raise ValueError("Pedido deve ter pelo menos um produto")
+            raise ValueError("Só é possível remover produtos de pedidos pendentes")
 
         try:
-            pedido.confirmar_pedido()
+            pedido.remover_produto(produto_id)
             return self.repository.atualizar(pedido)
         except Exception as e:
             self.repository.rollback()
-            raise ValueError(f"Erro ao confirmar pedido: {str(e)}")
+            if eh_conflito(e):
+                raise como_conflito(e, 'Pedido')
+            raise ValueError(f"Erro ao remover produto do pedido: {str(e)}")
+
+    def confirmar_pedido(self, pedido_id: int, versao_esperada: int = None) -> Optional[Pedido]:
+        return self.transicionar_pedido(pedido_id, StatusPedido.CONFIRMADO, versao_esperada)
+
+    def cancelar_pedido(self, pedido_id: int, versao_esperada: int = None) -> Optional[Pedido]:
+        return self.transicionar_pedido(pedido_id, StatusPedido.CANCELADO, versao_esperada)
+
+    def atualizar_status_pedido(self, pedido_id: int, novo_status: StatusPedido,
+                                versao_esperada: int = None) -> Optional[Pedido]:
+        return self.transicionar_pedido(pedido_id, novo_status, versao_esperada)
 
-    def cancelar_pedido(self, pedido_id: int) -> Optional[Pedido]:
+    def transicionar_pedido(self, pedido_id: int, novo_status: StatusPedido,
+                            versao_esperada: int = None) -> Optional[Pedido]:
         pedido = self.repository.buscar_por_id(pedido_id)
         if not pedido:
             return None
 
+        verificar_versao(pedido, versao_esperada, 'Pedido')
+        status_anterior = pedido.status
+        versao_lida = pedido.versao
+        efeitos = self._efeitos_da_transicao(status_anterior, novo_status)
+
         try:
-            pedido.cancelar_pedido()
-            return self.repository.atualizar(pedido)
+            # O UPDATE condicional é a trava: os efeitos (reservar ou devolver estoque, relatório,
+            # outbox) só rodam para quem atualizou exatamente a linha lida acima. Se outra operação
+            # mudou o pedido depois da leitura, nenhuma linha é afetada e a resposta é 409.
+            linhas = self.repository.transicionar_status(pedido.id, status_anterior, versao_lida, novo_status)
+            if linhas != 1:
+                raise ConflitoVersao("Pedido foi alterado por outra operação")
+
+            produto_ids = []
+            for efeito in efeitos:
+                produto_ids += efeito(self, pedido)
+
+            self.relatorio_service.registrar_transicao(pedido, status_anterior, novo_status)
+            self.outbox_service.publicar_mudanca_status(pedido, status_anterior, novo_status)
+
+            # Tudo ou nada: falha em qualquer efeito desfaz a transição inteira no rollback
+            pedido = self.repository.atualizar(pedido)
+            self.produto_service.invalidar_cache(*produto_ids)
+            return pedido
         except Exception as e:
             self.repository.rollback()
-            raise ValueError(f"Erro ao cancelar pedido: {str(e)}")
+            if eh_conflito(e):
+                raise como_conflito(e, 'Pedido')
+            raise ValueError(f"Erro ao atualizar status para {novo_status.value}: {str(e)}")
 
-    def atualizar_status_pedido(self, pedido_id: int, novo_status: StatusPedido) -> Optional[Pedido]:
-        pedido = self.repository.buscar_por_id(pedido_id)
-        if not pedido:
-            return None
+    def transicionar_pedidos_em_lote(self, pedido_ids: List[int],
+                                     novo_status: StatusPedido) -> Dict[str, Any]:
+        validar_lote(pedido_ids)
+        if any(not isinstance(pedido_id, int) or isinstance(pedido_id, bool) for pedido_id in pedido_ids):
+            raise ValueError("pedido_ids deve conter apenas números inteiros")
+        pedido_ids = list(dict.fromkeys(pedido_ids))
 
+        # Em lote só entram transições sem efeitos colaterais (sem mexer em estoque): um
+        # UPDATE condicional por status de origem e bloco de ids, sem carregar os pedidos
+        origens = [origem for origem, destinos in TRANSICOES.items()
+                   if novo_status in destinos and not destinos[novo_status]]
+
+        atualizados = []
         try:
-            pedido.status = novo_status
-            return self.repository.atualizar(pedido)
+            for inicio in range(0, len(pedido_ids), TAMANHO_BLOCO_STATUS):
+                bloco = pedido_ids[inicio:inicio + TAMANHO_BLOCO_STATUS]
+                for origem in origens:
+                    linhas = self.repository.transicionar_status_em_lote(bloco, origem, novo_status)
+                    if not linhas:
+                        continue
+
+                    ids = [linha.id for linha in linhas]
+                    unidades = self.repository.somar_unidades(ids)
+                    self.relatorio_service.registrar_transicoes_em_lote(
+                        origem, novo_status, [(linha.total, unidades.get(linha.id, 0)) for linha in linhas]
+                    )
+                    self.outbox_service.publicar_mudancas_em_lote(linhas, origem, novo_status)
+                    atualizados += ids
+
+            ids_atualizados = set(atualizados)
+            ignorados = self._motivos_ignorados(
+                [pedido_id for pedido_id in pedido_ids if pedido_id not in ids_atualizados], novo_status
+            )
+            self.repository.commit()
         except Exception as e:
             self.repository.rollback()
-            raise ValueError(f"Erro ao atualizar status: {str(e)}")
+            raise ValueError(f"Erro ao atualizar status em lote: {str(e)}")
+
+        return {
+            'atualizados': len(atualizados),
+            'pedido_ids': atualizados,
+            'ignorados': ignorados
+        }
 
     def deletar_pedido(self, pedido_id: int) -> bool:
         pedido = self.repository.buscar_por_id(pedido_id)
@@ -131,8 +341,70 @@ class PedidoService:
             raise ValueError("Só é possível deletar pedidos pendentes ou cancelados")
 
         try:
+            self.relatorio_service.registrar_remocao(pedido)
             self.repository.deletar(pedido)
             return True
         except Exception as e:
             self.repository.rollback()
-            raise ValueError(f"Erro ao deletar pedido: {str(e)}")
\ No newline at end of file
+            if eh_conflito(e):
+                raise como_conflito(e, 'Pedido')
+            raise ValueError(f"Erro ao deletar pedido: {str(e)}")
+
+    def _efeitos_da_transicao(self, status_anterior: StatusPedido, novo_status: StatusPedido):
+        destinos = TRANSICOES.get(status_anterior, {})
+        if novo_status not in destinos:
+            permitidos = [status.value for status in destinos] or 'nenhum (status final)'
+            raise ValueError(f"Transição de {status_anterior.value} para {novo_status.value} não permitida. "
+                             f"Próximos status permitidos: {permitidos}")
+        return destinos[novo_status]
+
+    def _motivos_ignorados(self, pedido_ids: List[int], novo_status: StatusPedido) -> List[Dict[str, Any]]:
+        status_atuais = {}
+        for inicio in range(0, len(pedido_ids), TAMANHO_BLOCO_STATUS):
+            status_atuais.update(self.repository.buscar_status(pedido_ids[inicio:inicio + TAMANHO_BLOCO_STATUS]))
+
+        ignorados = []
+        for pedido_id in pedido_ids:
+            status = status_atuais.get(pedido_id)
+            if status is None:
+                motivo = "Pedido não encontrado"
+            elif novo_status in TRANSICOES[status]:
+                motivo = (f"Transição de {status.value} para {novo_status.value} altera estoque; "
+                          f"use o endpoint do pedido")
+            else:
+                motivo = f"Transição de {status.value} para {novo_status.value} não permitida"
+            ignorados.append({'pedido_id': pedido_id, 'motivo': motivo})
+        return ignorados
+
+    def _converter_data(self, valor: str, campo: str) -> datetime:
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            raise ValueError(f"Data inválida em {campo}. Use AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS")
+
+    def _decodificar_cursor_pedido(self, cursor: str) -> Tuple[datetime, int]:
+        data, pedido_id = decodificar_cursor(cursor, 2)
+        try:
+            return datetime.fromisoformat(data), int(pedido_id)
+        except (TypeError, ValueError):
+            raise ValueError("Cursor inválido")
+
+    def _agrupar_itens(self, itens: List[Dict[str, Any]]) -> Dict[int, int]:
+        if not isinstance(itens, list) or not itens:
+            raise ValueError("Envie uma lista com ao menos um item")
+
+        # Linhas repetidas do mesmo produto são somadas
+        quantidades = {}
+        for indice, item in enumerate(itens):
+            if not isinstance(item, dict) or 'produto_id' not in item:
+                raise ValueError(f"Item {indice}: campo produto_id é obrigatório")
+
+            produto_id = item['produto_id']
+            quantidade = item.get('quantidade', 1)
+            if not isinstance(produto_id, int):
+                raise ValueError(f"Item {indice}: produto_id deve ser um número inteiro")
+            if not isinstance(quantidade, int) or quantidade <= 0:
+                raise ValueError(f"Item {indice}: quantidade deve ser um número inteiro positivo")
+
+            quantidades[produto_id] = quantidades.get(produto_id, 0) + quantidade
+        return quantidades
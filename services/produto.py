@@ -1,12 +1,23 @@
-from models.produto import Produto
-from repositories.produto import ProdutoRepository
-from typing import List, Optional
+from models.produto import Produto, ProdutoDTO
+from repositories.produto import ProdutoRepository, ORDENACOES_CATALOGO
+from cache import Cache
+from services.paginacao import (validar_limite, validar_deslocamento, codificar_cursor,
+                                decodificar_cursor, decodificar_cursor_id)
+from services.lote import validar_lote, inserir_em_blocos
+from services.versao import verificar_versao, eh_conflito, como_conflito
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Cache compartilhado por todas as instâncias do serviço no processo
+cache_produtos = Cache.do_ambiente('CACHE_PRODUTOS')
 
 
 class ProdutoService:
 
-    def __init__(self):
+    def __init__(self, cache: Cache = None):
         self.repository = ProdutoRepository()
+        self.cache = cache if cache is not None else cache_produtos
 
     def criar_produto(self, nome: str, quantidade: int, preco: float,
                       descricao: str = None) -> Produto:
@@ -19,28 +30,134 @@ class ProdutoService:
             self.repository.rollback()
             raise ValueError(f"Erro ao criar produto: {str(e)}")
 
-    def buscar_produto_por_id(self, produto_id: int) -> Optional[Produto]:
-        return self.repository.buscar_por_id(produto_id)
+    def criar_produtos_em_lote(self, dados: List[Dict[str, Any]]) -> Dict[str, Any]:
+        validar_lote(dados)
+
+        erros = []
+        registros = []
+        for indice, item in enumerate(dados):
+            try:
+                registros.append((indice, self._montar_registro(item)))
+            except ValueError as e:
+                erros.append({'indice': indice, 'erro': str(e)})
+
+        criados, erros_insercao = inserir_em_blocos(registros, self.repository.criar_em_lote,
+                                                    self.repository.rollback)
+        erros.extend(erros_insercao)
+        return {
+            'criados': criados,
+            'erros': sorted(erros, key=lambda erro: erro['indice'])
+        }
+
+    def buscar_produto_por_id(self, produto_id: int, versao_minima: int = None) -> Optional[Produto]:
+        # Read-through: consulta o banco só na falta do cache ou se a entrada guardada é mais
+        # antiga que versao_minima (versão já vista no banco, ex.: pela sondagem do GET)
+        dados = self.cache.obter(produto_id)
+        if dados is not None and (versao_minima is None or dados['versao'] >= versao_minima):
+            return self.repository.anexar_do_cache(dados)
+
+        lido_em = self.cache.iniciar_leitura()
+        produto = self.repository.buscar_por_id(produto_id)
+        if produto:
+            self.cache.definir(produto_id, self.repository.para_cache(produto),
+                               versao=produto.versao, lido_em=lido_em)
+        return produto
+
+    def buscar_produto_atual(self, produto_id: int) -> Optional[Produto]:
+        # Caminhos de escrita (estoque, preço congelado no pedido): sempre do banco, nunca do cache
+        return self.repository.buscar_atual(produto_id)
+
+    def sondar_produto(self, produto_id: int) -> Optional[Tuple[int, datetime]]:
+        # (versao, atualizado_em) para GET condicional, sempre do banco: o cache é por processo
+        # e pode estar atrasado em relação a escritas feitas em outro. None = produto não existe.
+        return self.repository.sondar(produto_id)
+
+    def invalidar_cache(self, *produto_ids: int) -> None:
+        # Deve ser chamado após o commit de qualquer escrita em produtos
+        self.cache.invalidar(*produto_ids)
+
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        return self.cache.estatisticas()
 
-    def buscar_produtos_por_nome(self, nome: str) -> List[Produto]:
+    def buscar_produtos_por_ids(self, produto_ids: List[int]) -> Dict[int, Produto]:
+        if not produto_ids:
+            return {}
+        return {produto.id: produto for produto in self.repository.buscar_por_ids(produto_ids)}
+
+    def buscar_produtos_por_nome(self, nome: str, limite: int = None,
+                              deslocamento: int = None) -> List[Produto]:
         if not nome or len(nome.strip()) < 2:
             raise ValueError("Nome deve ter pelo menos 2 caracteres")
-        return self.repository.buscar_por_nome(nome.strip())
+        return self.repository.buscar_por_nome(nome.strip(), validar_limite(limite),
+                                               validar_deslocamento(deslocamento))
+
+    def buscar_catalogo(self, preco_min: float = None, preco_max: float = None, nome: str = None,
+                        em_estoque: bool = None, ativo: bool = True, ordenar_por: str = 'preco',
+                        limite: int = None,
+                        cursor: str = None) -> Tuple[List[ProdutoDTO], Optional[str]]:
+        if ordenar_por not in ORDENACOES_CATALOGO:
+            raise ValueError(f"Ordenação inválida. Valores válidos: {list(ORDENACOES_CATALOGO)}")
+        for campo, preco in (('preco_min', preco_min), ('preco_max', preco_max)):
+            if preco is not None and preco < 0:
+                raise ValueError(f"{campo} não pode ser negativo")
+        if preco_min is not None and preco_max is not None and preco_min > preco_max:
+            raise ValueError("preco_min deve ser menor ou igual a preco_max")
+        if nome is not None and len(nome.strip()) < 2:
+            raise ValueError("Nome deve ter pelo menos 2 caracteres")
 
-    def listar_todos_produtos(self, incluir_inativos: bool = False) -> List[Produto]:
+        limite = validar_limite(limite)
+        apos = self._decodificar_cursor_catalogo(cursor, ordenar_por) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        produtos = self.repository.buscar_catalogo(
+            ordenar_por, limite + 1, apos=apos, preco_min=preco_min, preco_max=preco_max,
+            nome=nome.strip() if nome else None, em_estoque=em_estoque, ativo=ativo
+        )
+        if len(produtos) <= limite:
+            return produtos, None
+
+        produtos = produtos[:limite]
+        ultimo = produtos[-1]
+        return produtos, codificar_cursor(getattr(ultimo, ordenar_por.lstrip('-')), ultimo.id)
+
+    def listar_todos_produtos(self, incluir_inativos: bool = False) -> List[ProdutoDTO]:
         return self.repository.listar_todos(incluir_inativos=incluir_inativos)
 
+    def listar_produtos_paginado(self, limite: int = None, cursor: str = None,
+                                 incluir_inativos: bool = False) -> Tuple[List[ProdutoDTO], Optional[str]]:
+        limite = validar_limite(limite)
+        apos_id = decodificar_cursor_id(cursor) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        produtos = self.repository.listar_paginado(limite + 1, apos_id=apos_id,
+                                                   incluir_inativos=incluir_inativos)
+        if len(produtos) <= limite:
+            return produtos, None
+
+        produtos = produtos[:limite]
+        return produtos, codificar_cursor(produtos[-1].id)
+
+    def sondar_pagina(self, limite: int = None, cursor: str = None,
+                      incluir_inativos: bool = False) -> Tuple[int, int, Optional[datetime]]:
+        # Mesma página de listar_produtos_paginado (com o item extra que decide o next_cursor)
+        limite = validar_limite(limite)
+        apos_id = decodificar_cursor_id(cursor) if cursor else None
+        return self.repository.sondar_pagina(limite + 1, apos_id=apos_id, incluir_inativos=incluir_inativos)
+
     def contar_produtos(self, incluir_inativos: bool = False) -> int:
         return self.repository.contar(incluir_inativos=incluir_inativos)
 
     def atualizar_produto(self, produto_id: int, nome: str = None,
                           quantidade: int = None, preco: float = None,
-                          descricao: str = None, ativo: bool = None) -> Optional[Produto]:
+                          descricao: str = None, ativo: bool = None,
+                          versao_esperada: int = None) -> Optional[Produto]:
         produto = self.repository.buscar_por_id(produto_id)
         if not produto:
             return None
 
         try:
+            verificar_versao(produto, versao_esperada, 'Produto')
+
             if nome is not None:
                 self._validar_nome(nome)
                 produto.nome = nome
@@ -59,9 +176,13 @@ class ProdutoService:
             if ativo is not None:
                 produto.ativo = ativo
 
-            return self.repository.atualizar(produto)
+            produto = self.repository.atualizar(produto)
+            self.invalidar_cache(produto_id)
+            return produto
         except Exception as e:
             self.repository.rollback()
+            if eh_conflito(e):
+                raise como_conflito(e, 'Produto')
             raise ValueError(f"Erro ao atualizar produto: {str(e)}")
 
     def deletar_produto(self, produto_id: int) -> bool:
@@ -74,24 +195,60 @@ class ProdutoService:
 
         try:
             self.repository.deletar(produto)
+            self.invalidar_cache(produto_id)
             return True
         except Exception as e:
             self.repository.rollback()
+            if eh_conflito(e):
+                raise como_conflito(e, 'Produto')
             raise ValueError(f"Erro ao deletar produto: {str(e)}")
 
-    def ajustar_estoque(self, produto_id: int, nova_quantidade: int) -> Optional[Produto]:
+    def ajustar_estoque(self, produto_id: int, nova_quantidade: int,
+                        versao_esperada: int = None) -> Optional[Produto]:
         if nova_quantidade < 0:
             raise ValueError("Quantidade não pode ser negativa")
-        return self.atualizar_produto(produto_id, quantidade=nova_quantidade)
+        return self.atualizar_produto(produto_id, quantidade=nova_quantidade,
+                                      versao_esperada=versao_esperada)
+
+    def reservar_estoque(self, produto_id: int, quantidade: int) -> bool:
+        # Participa da transação de quem chama; o commit fica a cargo do chamador
+        return self.repository.reservar_estoque(produto_id, quantidade)
 
-    def obter_produtos_sem_estoque(self) -> List[Produto]:
+    def liberar_estoque(self, produto_id: int, quantidade: int) -> None:
+        # Participa da transação de quem chama; o commit fica a cargo do chamador
+        self.repository.liberar_estoque(produto_id, quantidade)
+
+    def obter_produtos_sem_estoque(self) -> List[ProdutoDTO]:
         return self.repository.buscar_sem_estoque()
 
-    def obter_produtos_estoque_baixo(self, limite_estoque: int = 5) -> List[Produto]:
+    def obter_produtos_estoque_baixo(self, limite_estoque: int = 5) -> List[ProdutoDTO]:
         if limite_estoque <= 0:
             raise ValueError("Limite de estoque deve ser positivo")
         return self.repository.buscar_estoque_baixo(limite_estoque)
 
+    def _decodificar_cursor_catalogo(self, cursor: str, ordenar_por: str) -> Tuple[Any, int]:
+        valor, produto_id = decodificar_cursor(cursor, 2)
+        tipo_esperado = (int, float) if ordenar_por.lstrip('-') == 'preco' else str
+        if not isinstance(valor, tipo_esperado) or isinstance(valor, bool) or not isinstance(produto_id, int):
+            raise ValueError("Cursor inválido")
+        return valor, produto_id
+
+    def _montar_registro(self, item: Any) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            raise ValueError("Item deve ser um objeto JSON")
+
+        for campo in ['nome', 'quantidade', 'preco']:
+            if campo not in item:
+                raise ValueError(f"Campo {campo} é obrigatório")
+
+        self._validar_dados_produto(item['nome'], item['quantidade'], item['preco'])
+        return {
+            'nome': item['nome'],
+            'quantidade': item['quantidade'],
+            'preco': item['preco'],
+            'descricao': item.get('descricao')
+        }
+
     def _validar_dados_produto(self, nome: str, quantidade: int, preco: float) -> None:
         self._validar_nome(nome)
         self._validar_quantidade(quantidade)
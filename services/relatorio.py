@@ -0,0 +1,138 @@
+from models.pedido import Pedido, StatusPedido
+from models.resumo_venda import ResumoVenda
+from repositories.relatorio import RelatorioRepository, STATUS_FORA_DAS_VENDAS
+from services.paginacao import validar_limite
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+DIAS_PADRAO = 30
+DIAS_MAXIMO = 366
+ORDENACOES_PRODUTO = ('receita', 'unidades', 'pedidos')
+
+
+def _somar_delta(deltas: Dict[Tuple[str, str], List], dimensao: str, chave: str, sinal: int,
+                 receita: float, unidades: int) -> None:
+    linha = deltas.setdefault((dimensao, chave), [0, 0.0, 0])
+    linha[0] += sinal
+    linha[1] += sinal * receita
+    linha[2] += sinal * unidades
+
+
+class RelatorioService:
+
+    def __init__(self):
+        self.repository = RelatorioRepository()
+
+    def registrar_transicao(self, pedido: Pedido, status_anterior: StatusPedido,
+                            status_novo: StatusPedido) -> None:
+        # Chamado na transação da mudança de status, antes do commit do pedido: tira o
+        # pedido dos agregados do status anterior e o soma aos do novo
+        deltas: Dict[Tuple[str, str], List] = {}
+        self._acumular(deltas, pedido, status_anterior, -1)
+        self._acumular(deltas, pedido, status_novo, 1)
+        self._somar(deltas)
+
+    def registrar_transicoes_em_lote(self, status_anterior: StatusPedido, status_novo: StatusPedido,
+                                     pedidos: List[Tuple[float, int]]) -> None:
+        # Transição em lote sem carregar os pedidos: recebe (total, unidades) de cada um.
+        # Só vale entre status que não mudam a contagem como venda, então dia e produto
+        # ficam iguais e apenas os agregados por status se movem.
+        if (status_anterior in STATUS_FORA_DAS_VENDAS) != (status_novo in STATUS_FORA_DAS_VENDAS):
+            raise ValueError(f"Transição de {status_anterior.value} para {status_novo.value} "
+                             f"exige os itens do pedido")
+
+        deltas: Dict[Tuple[str, str], List] = {}
+        for total, unidades in pedidos:
+            for status, sinal in ((status_anterior, -1), (status_novo, 1)):
+                if status != StatusPedido.PENDENTE:
+                    _somar_delta(deltas, ResumoVenda.DIMENSAO_STATUS, status.value, sinal, total, unidades)
+        self._somar(deltas)
+
+    def registrar_remocao(self, pedido: Pedido) -> None:
+        deltas: Dict[Tuple[str, str], List] = {}
+        self._acumular(deltas, pedido, pedido.status, -1)
+        self._somar(deltas)
+
+    def obter_resumo(self) -> Dict[str, Any]:
+        total = self.repository.buscar(ResumoVenda.DIMENSAO_TOTAL, ResumoVenda.CHAVE_TOTAL)
+        return {
+            'vendas': self._linha(total, ResumoVenda.CHAVE_TOTAL),
+            'por_status': [
+                self._linha(linha, linha.chave)
+                for linha in self.repository.listar_dimensao(ResumoVenda.DIMENSAO_STATUS)
+            ]
+        }
+
+    def obter_vendas_diarias(self, inicio: Optional[str] = None,
+                             fim: Optional[str] = None) -> List[Dict[str, Any]]:
+        fim = self._converter_data(fim, 'fim') if fim else date.today()
+        inicio = self._converter_data(inicio, 'inicio') if inicio else fim - timedelta(days=DIAS_PADRAO - 1)
+        if inicio > fim:
+            raise ValueError("Data de início deve ser anterior ou igual à data de fim")
+        if (fim - inicio).days >= DIAS_MAXIMO:
+            raise ValueError(f"Intervalo deve ter no máximo {DIAS_MAXIMO} dias")
+
+        por_dia = {
+            linha.chave: linha
+            for linha in self.repository.listar_intervalo(ResumoVenda.DIMENSAO_DIA,
+                                                          inicio.isoformat(), fim.isoformat())
+        }
+        # Dias sem venda aparecem zerados, para a série não ter buracos
+        dias = [(inicio + timedelta(days=deslocamento)).isoformat()
+                for deslocamento in range((fim - inicio).days + 1)]
+        return [self._linha(por_dia.get(dia), dia) for dia in dias]
+
+    def obter_vendas_por_produto(self, limite: int = None,
+                                 ordenar_por: str = 'receita') -> List[Dict[str, Any]]:
+        limite = validar_limite(limite)
+        if ordenar_por not in ORDENACOES_PRODUTO:
+            raise ValueError(f"Ordenação inválida. Valores válidos: {list(ORDENACOES_PRODUTO)}")
+
+        linhas = self.repository.listar_maiores(ResumoVenda.DIMENSAO_PRODUTO, ordenar_por, limite)
+        return [{**linha.to_dict(), 'produto_id': int(linha.chave)} for linha in linhas]
+
+    def reconstruir(self) -> int:
+        try:
+            linhas = self.repository.reconstruir()
+            self.repository.commit()
+            return linhas
+        except Exception as e:
+            self.repository.rollback()
+            raise ValueError(f"Erro ao reconstruir relatórios: {str(e)}")
+
+    def _acumular(self, deltas: Dict[Tuple[str, str], List], pedido: Pedido,
+                  status: StatusPedido, sinal: int) -> None:
+        unidades = sum(item.quantidade for item in pedido.itens)
+
+        # Pedidos pendentes ficam fora dos agregados por status (ainda estão sendo montados)
+        if status != StatusPedido.PENDENTE:
+            _somar_delta(deltas, ResumoVenda.DIMENSAO_STATUS, status.value, sinal, pedido.total, unidades)
+
+        if status not in STATUS_FORA_DAS_VENDAS:
+            _somar_delta(deltas, ResumoVenda.DIMENSAO_TOTAL, ResumoVenda.CHAVE_TOTAL, sinal,
+                         pedido.total, unidades)
+            _somar_delta(deltas, ResumoVenda.DIMENSAO_DIA, pedido.data.date().isoformat(), sinal,
+                         pedido.total, unidades)
+            for item in pedido.itens:
+                _somar_delta(deltas, ResumoVenda.DIMENSAO_PRODUTO, str(item.produto_id), sinal,
+                             item.subtotal, item.quantidade)
+
+    def _somar(self, deltas: Dict[Tuple[str, str], List]) -> None:
+        # Chaves em ordem fixa evitam deadlock entre transações que tocam as mesmas linhas
+        self.repository.somar([
+            {'dimensao': dimensao, 'chave': chave, 'pedidos': pedidos,
+             'receita': round(receita, 2), 'unidades': unidades}
+            for (dimensao, chave), (pedidos, receita, unidades) in sorted(deltas.items())
+            if pedidos or unidades or round(receita, 2)
+        ])
+
+    def _linha(self, resumo: Optional[ResumoVenda], chave: str) -> Dict[str, Any]:
+        if resumo is None:
+            return {'chave': chave, 'pedidos': 0, 'receita': 0.0, 'unidades': 0, 'ticket_medio': 0.0}
+        return resumo.to_dict()
+
+    def _converter_data(self, valor: str, campo: str) -> date:
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            raise ValueError(f"Data inválida em {campo}. Use o formato AAAA-MM-DD")
@@ -0,0 +1,26 @@
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Optional
+
+
+class ConflitoVersao(ValueError):
+    # Escrita baseada numa versão que já não é a atual; os controllers respondem 409.
+    # Herda de ValueError para continuar sendo um erro de negócio nos pontos que não a tratam.
+    pass
+
+
+def verificar_versao(entidade, versao_esperada: Optional[int], nome: str) -> None:
+    # Sem versão esperada (requisição sem If-Match) a escrita não é condicional
+    if versao_esperada is not None and entidade.versao != versao_esperada:
+        raise ConflitoVersao(f"{nome} foi alterado por outra operação "
+                             f"(versão atual: {entidade.versao}, esperada: {versao_esperada})")
+
+
+def eh_conflito(erro: Exception) -> bool:
+    # StaleDataError: o UPDATE/DELETE do ORM com "versao = <lida>" não encontrou a linha
+    return isinstance(erro, (ConflitoVersao, StaleDataError))
+
+
+def como_conflito(erro: Exception, nome: str) -> ConflitoVersao:
+    if isinstance(erro, ConflitoVersao):
+        return erro
+    return ConflitoVersao(f"{nome} foi alterado por outra operação")
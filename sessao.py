@@ -0,0 +1,66 @@
+# sessao.py - Sessão que envia leituras de requisições GET para a réplica
+
+from contextvars import ContextVar
+from functools import wraps
+from typing import Iterator
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+BIND_REPLICA = 'replica'
+METODOS_LEITURA = ('GET', 'HEAD')
+
+_em_leitura = ContextVar('em_leitura', default=False)
+
+
+def _iterar_em_leitura(iterador: Iterator) -> Iterator:
+    # Resultados consumidos aos poucos (yield_per) continuam indo para a réplica
+    while True:
+        token = _em_leitura.set(True)
+        try:
+            item = next(iterador)
+        except StopIteration:
+            return
+        finally:
+            _em_leitura.reset(token)
+        yield item
+
+
+def somente_leitura(funcao):
+    # Marca métodos de repositório que podem ser atendidos pela réplica
+    @wraps(funcao)
+    def executar(*args, **kwargs):
+        token = _em_leitura.set(True)
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            _em_leitura.reset(token)
+
+        if isinstance(resultado, Iterator):
+            return _iterar_em_leitura(resultado)
+        return resultado
+    return executar
+
+
+class SessaoRoteada(Session):
+    # Leituras marcadas com @somente_leitura, em requisições GET, vão para o bind 'replica'
+    # (quando configurado). Escritas e tudo o que vier depois delas na mesma sessão usam o
+    # primário, garantindo que a requisição leia o que acabou de gravar.
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['usar_primario'] = True
+            elif self._pode_usar_replica():
+                return self._db.engines[BIND_REPLICA]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _pode_usar_replica(self) -> bool:
+        return (
+            _em_leitura.get()
+            and not self.info.get('usar_primario')
+            and BIND_REPLICA in self._db.engines
+            and has_request_context()
+            and request.method in METODOS_LEITURA
+        )
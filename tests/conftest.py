@@ -0,0 +1,53 @@
+# conftest.py - Aplicação apontada para um banco SQLite em arquivo temporário
+
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# app.py lê DATABASE_URL e cria as tabelas na importação: o banco de teste precisa estar
+# definido antes. Em arquivo (e não em memória) para que threads usem conexões próprias.
+_diretorio = tempfile.mkdtemp(prefix='testes-desafio-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_diretorio, 'testes.db')
+os.environ.setdefault('OUTBOX_TRABALHADOR_ATIVO', 'false')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as aplicacao  # noqa: E402
+from db import db  # noqa: E402
+from models import Cliente, Produto  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    return aplicacao
+
+
+@pytest.fixture
+def contexto(app):
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def criar_cliente(contexto):
+    # Insere direto, sem passar pelo hash de senha (irrelevante nestes testes)
+    def criar() -> int:
+        email = f'{uuid.uuid4().hex}@teste.com'
+        db.session.execute(insert(Cliente), [{'nome': 'Cliente Teste', 'email': email, 'senha': 'x'}])
+        db.session.commit()
+        return Cliente.query.filter_by(email=email).one().id
+    return criar
+
+
+@pytest.fixture
+def criar_produto(contexto):
+    def criar(quantidade: int = 100, preco: float = 10.0) -> int:
+        produto = Produto(nome=f'Produto {uuid.uuid4().hex[:8]}', quantidade=quantidade, preco=preco)
+        db.session.add(produto)
+        db.session.commit()
+        return produto.id
+    return criar
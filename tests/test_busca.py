@@ -0,0 +1,29 @@
+# test_busca.py - Instalação dos índices de busca em todos os binds
+
+import os
+import tempfile
+
+from db import db
+from models import Cliente, Produto
+from repositories.busca import instalar_indices
+from sessao import BIND_REPLICA
+from sqlalchemy import create_engine, inspect
+
+
+def test_instala_indices_tambem_na_replica(contexto):
+    # Réplica em outro arquivo SQLite (cópia do esquema, como DATABASE_REPLICA_URL)
+    caminho = os.path.join(tempfile.mkdtemp(prefix='replica-'), 'replica.db')
+    replica = create_engine('sqlite:///' + caminho)
+    db.metadata.create_all(replica, tables=[Cliente.__table__, Produto.__table__])
+
+    engines = db.engines
+    engines[BIND_REPLICA] = replica
+    try:
+        instalar_indices(Cliente, Produto)
+    finally:
+        del engines[BIND_REPLICA]
+
+    tabelas = inspect(replica).get_table_names()
+    assert 'clientes_busca' in tabelas
+    assert 'produtos_busca' in tabelas
+    replica.dispose()
@@ -0,0 +1,43 @@
+import threading
+
+from cache import Cache, CacheLRU
+
+
+def test_versao_antiga_nao_sobrescreve_mais_nova():
+    cache = Cache(CacheLRU(10))
+
+    assert cache.definir(1, {'nome': 'novo'}, versao=3)
+    assert not cache.definir(1, {'nome': 'antigo'}, versao=2)
+    assert cache.obter(1) == {'nome': 'novo'}
+
+
+def test_leitura_anterior_a_invalidacao_nao_repoe_linha_velha():
+    cache = Cache(CacheLRU(10))
+
+    # A leitura começa, a escrita confirma e invalida, só então a leitura tenta gravar
+    lido_em = cache.iniciar_leitura()
+    cache.invalidar(1)
+    assert not cache.definir(1, {'quantidade': 10}, versao=1, lido_em=lido_em)
+    assert cache.obter(1) is None
+
+    assert cache.definir(1, {'quantidade': 9}, versao=2, lido_em=cache.iniciar_leitura())
+    assert cache.obter(1) == {'quantidade': 9}
+
+
+def test_contadores_nao_perdem_incrementos_entre_threads():
+    cache = Cache(CacheLRU(10))
+    cache.definir(1, 'valor')
+    leituras, threads = 20000, 8
+
+    def ler():
+        for i in range(leituras):
+            cache.obter(i % 2)
+
+    trabalhadores = [threading.Thread(target=ler) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas['acertos'] == estatisticas['falhas'] == leituras * threads // 2
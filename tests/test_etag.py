@@ -0,0 +1,46 @@
+from sqlalchemy import update
+
+from db import db
+from models import Produto
+from services.pedido import PedidoService
+from services.produto import ProdutoService
+
+
+def test_pedido_tem_a_mesma_etag_no_get_e_nas_escritas(app, criar_cliente, criar_produto):
+    produto_id = criar_produto()
+    pedido = PedidoService().criar_pedido(criar_cliente())
+    pedido_id, versao_inicial = pedido.id, pedido.versao
+    db.session.remove()
+    cliente = app.test_client()
+
+    adicionado = cliente.post(f'/api/pedidos/{pedido_id}/produtos', json={'produto_id': produto_id})
+    assert adicionado.status_code == 200
+    # Nova linha de item é mudança do pedido: a versão (e a ETag) muda
+    assert adicionado.get_json()['data']['versao'] > versao_inicial
+    assert cliente.get(f'/api/pedidos/{pedido_id}').headers['ETag'] == adicionado.headers['ETag']
+
+    confirmado = cliente.put(f'/api/pedidos/{pedido_id}/confirmar',
+                             headers={'If-Match': adicionado.headers['ETag']})
+    assert confirmado.status_code == 200
+    assert confirmado.headers['ETag'] != adicionado.headers['ETag']
+    assert cliente.get(f'/api/pedidos/{pedido_id}').headers['ETag'] == confirmado.headers['ETag']
+    revalidado = cliente.get(f'/api/pedidos/{pedido_id}', headers={'If-None-Match': confirmado.headers['ETag']})
+    assert revalidado.status_code == 304
+
+
+def test_get_de_produto_nao_usa_versao_do_cache(app, contexto, criar_produto):
+    produto_id = criar_produto(preco=10.0)
+    cliente = app.test_client()
+    antigo = cliente.get(f'/api/produtos/{produto_id}')
+    assert antigo.status_code == 200
+
+    # Escrita feita por outro processo: o cache deste continua com a versão antiga
+    db.session.execute(update(Produto).where(Produto.id == produto_id)
+                       .values(preco=20.0, versao=Produto.versao + 1))
+    db.session.commit()
+    assert ProdutoService().cache.obter(produto_id) is not None
+
+    atual = cliente.get(f'/api/produtos/{produto_id}', headers={'If-None-Match': antigo.headers['ETag']})
+    assert atual.status_code == 200
+    assert atual.get_json()['data']['preco'] == 20.0
+    assert atual.headers['ETag'] != antigo.headers['ETag']
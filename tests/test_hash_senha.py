@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from hash_senha import HasherSenha, ServicoSenhaSobrecarregado
+
+METODO_RAPIDO = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture
+def hasher():
+    hasher = HasherSenha(METODO_RAPIDO, tamanho_pool=1, max_pendentes=1, timeout=30)
+    yield hasher
+    hasher.encerrar()
+
+
+def test_hasher_saturado_falha_sem_esperar(hasher):
+    ocupada = hasher._submeter(time.sleep, 1)
+
+    inicio = time.monotonic()
+    with pytest.raises(ServicoSenhaSobrecarregado):
+        hasher.gerar('senha123')
+    with pytest.raises(ServicoSenhaSobrecarregado):
+        hasher.gerar_varios(['senha123', 'outra456'])
+    assert time.monotonic() - inicio < 0.5
+
+    ocupada.result()
+    assert check_password_hash(hasher.gerar('senha123'), 'senha123')
+
+
+def test_gerar_varios_respeita_o_limite_de_vagas():
+    hasher = HasherSenha(METODO_RAPIDO, tamanho_pool=2, max_pendentes=2)
+    try:
+        senhas = [f'senha{i}' for i in range(10)]
+        hashes = hasher.gerar_varios(senhas)
+        assert all(check_password_hash(h, s) for h, s in zip(hashes, senhas))
+
+        # Com uma vaga ocupada, o lote (dois blocos) não cabe e falha na hora. O método lento
+        # impede que o primeiro bloco termine e devolva a vaga antes de o segundo ser submetido
+        hasher.metodo = 'pbkdf2:sha256:600000'
+        ocupada = hasher._submeter(time.sleep, 1)
+        with pytest.raises(ServicoSenhaSobrecarregado):
+            hasher.gerar_varios(senhas)
+        ocupada.result()
+    finally:
+        hasher.encerrar()
+
+
+def test_redimensionar_pool_mantem_max_pendentes(hasher):
+    hasher.definir_tamanho_pool(2)
+    assert hasher.max_pendentes == 1
+
+    hasher.definir_tamanho_pool(1, max_pendentes=3)
+    hasher.definir_tamanho_pool(2)
+    assert hasher.max_pendentes == 3
+
+
+def test_sem_metodo_configurado_usa_scrypt_e_nao_refaz_hashes(monkeypatch):
+    monkeypatch.delenv('SENHA_HASH_ALGORITMO', raising=False)
+    hasher = HasherSenha.do_ambiente()
+    hasher.definir_tamanho_pool(0)
+
+    hash_senha = hasher.gerar('senha123')
+    assert hash_senha.startswith('scrypt:')
+    assert not hasher.precisa_rehash(hash_senha)
+    assert not hasher.precisa_rehash(generate_password_hash('senha123', METODO_RAPIDO))
+
+
+def test_metodo_escolhido_pelo_operador_migra_hashes_antigos(monkeypatch):
+    monkeypatch.setenv('SENHA_HASH_ALGORITMO', 'pbkdf2:sha256')
+    monkeypatch.setenv('SENHA_HASH_ITERACOES', '1000')
+    hasher = HasherSenha.do_ambiente()
+
+    assert hasher.metodo == METODO_RAPIDO
+    assert hasher.precisa_rehash(generate_password_hash('senha123'))
+
+
+def test_lote_que_estoura_o_prazo_e_rejeitado():
+    hasher = HasherSenha('pbkdf2:sha256:600000', tamanho_pool=2, timeout=0.001)
+    try:
+        with pytest.raises(ServicoSenhaSobrecarregado):
+            hasher.gerar_varios([f'senha{i}' for i in range(4)])
+    finally:
+        hasher.encerrar()
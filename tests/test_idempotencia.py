@@ -0,0 +1,49 @@
+import uuid
+
+from db import db
+from services.pedido import PedidoService
+
+
+def _pedido(criar_cliente) -> int:
+    pedido_id = PedidoService().criar_pedido(criar_cliente()).id
+    db.session.remove()
+    return pedido_id
+
+
+def test_repeticao_devolve_corpo_e_cabecalhos(app, criar_cliente, criar_produto):
+    produto_id = criar_produto()
+    pedido_id = _pedido(criar_cliente)
+    cliente = app.test_client()
+    cabecalhos = {'Idempotency-Key': uuid.uuid4().hex}
+
+    primeira = cliente.post(f'/api/pedidos/{pedido_id}/produtos', json={'produto_id': produto_id},
+                            headers=cabecalhos)
+    repetida = cliente.post(f'/api/pedidos/{pedido_id}/produtos', json={'produto_id': produto_id},
+                            headers=cabecalhos)
+
+    assert primeira.status_code == repetida.status_code == 200
+    assert repetida.headers['Idempotent-Replayed'] == 'true'
+    assert repetida.headers['ETag'] == primeira.headers['ETag']
+    assert repetida.get_json() == primeira.get_json()
+    assert repetida.get_json()['data']['itens'][0]['quantidade'] == 1
+
+
+def test_chave_vale_por_rota_e_por_chamador(app, criar_cliente, criar_produto):
+    produto_id = criar_produto()
+    pedidos = [_pedido(criar_cliente) for _ in range(2)]
+    cliente = app.test_client()
+    chave = uuid.uuid4().hex
+
+    # A mesma chave em outra rota não é repetição nem conflito: cada pedido recebe o item
+    for pedido_id in pedidos:
+        resposta = cliente.post(f'/api/pedidos/{pedido_id}/produtos', json={'produto_id': produto_id},
+                                headers={'Idempotency-Key': chave})
+        assert resposta.status_code == 200
+        assert 'Idempotent-Replayed' not in resposta.headers
+
+    # Outro chamador na mesma rota também executa
+    resposta = cliente.post(f'/api/pedidos/{pedidos[0]}/produtos', json={'produto_id': produto_id},
+                            headers={'Idempotency-Key': chave, 'Authorization': 'Bearer outro'})
+    assert resposta.status_code == 200
+    assert 'Idempotent-Replayed' not in resposta.headers
+    assert resposta.get_json()['data']['itens'][0]['quantidade'] == 2
@@ -0,0 +1,54 @@
+from db import db
+from services.pedido import PedidoService
+from sqlalchemy import event
+
+
+def _criar_pedidos(quantidade, criar_cliente, criar_produto):
+    servico = PedidoService()
+    produtos = [criar_produto(), criar_produto()]
+    for _ in range(quantidade):
+        pedido = servico.criar_pedido(criar_cliente())
+        for produto_id in produtos:
+            servico.adicionar_produto_ao_pedido(pedido.id, produto_id, 1)
+
+
+def _consultas_ao_listar():
+    # Sessão nova: nada vem do identity map de operações anteriores
+    db.session.remove()
+    consultas = []
+
+    def contar(*args):
+        consultas.append(args[2])
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        pedidos = PedidoService().listar_todos_pedidos()
+        dados = [pedido.to_dict() for pedido in pedidos]
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+    return len(consultas), len(dados)
+
+
+def test_listagem_de_pedidos_usa_numero_fixo_de_consultas(criar_cliente, criar_produto):
+    _criar_pedidos(3, criar_cliente, criar_produto)
+    consultas_poucos, total_poucos = _consultas_ao_listar()
+
+    _criar_pedidos(27, criar_cliente, criar_produto)
+    consultas_muitos, total_muitos = _consultas_ao_listar()
+
+    assert total_muitos == total_poucos + 27
+    # Pedidos com cliente (JOIN) e itens com produtos (SELECT ... IN): 2 consultas, com 3 ou 30 pedidos
+    assert consultas_poucos == consultas_muitos == 2
+
+
+def test_pedido_mantem_chave_produtos_ao_lado_de_itens(criar_cliente, criar_produto):
+    servico = PedidoService()
+    produto_id = criar_produto()
+    pedido = servico.criar_pedido(criar_cliente())
+    servico.adicionar_produto_ao_pedido(pedido.id, produto_id, 2)
+
+    dados = servico.buscar_pedido_por_id(pedido.id).to_dict()
+
+    assert [produto['id'] for produto in dados['produtos']] == [produto_id]
+    assert {'nome', 'preco', 'quantidade'} <= set(dados['produtos'][0])
+    assert dados['itens'][0]['quantidade'] == 2
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+
+from db import adicionar_colunas, db
+
+
+class ModeloAtual:
+    # Tabela como declarada hoje; o banco ainda tem a versão anterior, só com id e nome
+    __table__ = Table(
+        'teste_migracao', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('nome', String(50)),
+        Column('versao', Integer, nullable=False, default=1),
+        Column('atualizado_em', DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    )
+
+
+def test_colunas_novas_sao_adicionadas_com_default_nas_linhas_existentes(contexto):
+    with db.engine.begin() as conexao:
+        conexao.execute(text('DROP TABLE IF EXISTS teste_migracao'))
+        conexao.execute(text('CREATE TABLE teste_migracao (id INTEGER PRIMARY KEY, nome VARCHAR(50))'))
+        conexao.execute(text("INSERT INTO teste_migracao (id, nome) VALUES (1, 'antigo')"))
+
+    adicionar_colunas(ModeloAtual)
+    # Segunda inicialização: nada a fazer
+    adicionar_colunas(ModeloAtual)
+
+    colunas = {coluna['name']: coluna for coluna in inspect(db.engine).get_columns('teste_migracao')}
+    assert not colunas['versao']['nullable'] and not colunas['atualizado_em']['nullable']
+    with db.engine.connect() as conexao:
+        versao, atualizado_em = conexao.execute(
+            ModeloAtual.__table__.select().with_only_columns(
+                ModeloAtual.__table__.c.versao, ModeloAtual.__table__.c.atualizado_em)
+        ).one()
+    assert versao == 1
+    assert isinstance(atualizado_em, datetime)
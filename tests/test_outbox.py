@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import db
+from models.evento_outbox import EventoOutbox
+from repositories.outbox import OutboxRepository
+from services import outbox
+from services.outbox import OutboxService, registrar_handler
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    # Registro isolado por teste
+    monkeypatch.setattr(outbox, '_handlers', {})
+
+
+def _evento(tipo: str) -> int:
+    evento = EventoOutbox(tipo=tipo, agregado_id=1, payload={'pedido_id': 1})
+    db.session.add(evento)
+    db.session.commit()
+    return evento.id
+
+
+def _status(evento_id: int) -> str:
+    db.session.expire_all()
+    return db.session.get(EventoOutbox, evento_id).status
+
+
+def test_evento_sem_handler_continua_pendente(contexto, handlers):
+    entregues = []
+    registrar_handler('teste.com_handler')(entregues.append)
+    com_handler = _evento('teste.com_handler')
+    sem_handler = _evento('teste.sem_handler')
+
+    OutboxService().drenar()
+
+    assert [evento.id for evento in entregues] == [com_handler]
+    assert _status(com_handler) == EventoOutbox.PROCESSADO
+    assert _status(sem_handler) == EventoOutbox.PENDENTE
+
+
+def test_sem_nenhum_handler_nada_e_reservado(contexto, handlers):
+    evento_id = _evento('teste.sem_handler')
+
+    assert OutboxService().processar_lote() == 0
+    assert _status(evento_id) == EventoOutbox.PENDENTE
+
+
+def test_reserva_respeita_o_limite(contexto):
+    ids = [_evento('teste.reserva') for _ in range(3)]
+
+    agora = datetime.utcnow()
+    reservados = OutboxRepository.reservar_lote('dono', 2, agora, agora + timedelta(minutes=1),
+                                                tipos=['teste.reserva'])
+    assert [evento.id for evento in reservados] == ids[:2]
+    assert _status(ids[2]) == EventoOutbox.PENDENTE
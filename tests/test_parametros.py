@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/produtos/busca?preco_min=abc',
+    '/api/produtos/busca?preco_max=nan',
+    '/api/produtos/busca?limit=x',
+    '/api/produtos?limit=abc',
+    '/api/produtos/nome/camisa?offset=z',
+    '/api/clientes?limit=a',
+    '/api/clientes/nome/ana?offset=z',
+    '/api/pedidos?limit=q',
+    '/api/pedidos/periodo?inicio=2024-01-01&fim=2024-02-01&cliente_id=x',
+    '/api/relatorios/produtos?limit=z',
+])
+def test_parametro_numerico_invalido_responde_400(app, url):
+    resposta = app.test_client().get(url)
+    assert resposta.status_code == 400
+    assert 'deve ser um número' in resposta.get_json()['message']
+
+
+def test_filtro_numerico_valido_continua_aceito(app):
+    assert app.test_client().get('/api/produtos/busca?preco_min=5&limit=10').status_code == 200
@@ -0,0 +1,59 @@
+# test_planos.py - Planos de execução (EXPLAIN QUERY PLAN, SQLite) das consultas de pedidos e
+# do catálogo: sem varredura completa da tabela nem ordenação em memória.
+# Também executado por python -m benchmarks.planos, com volumes maiores.
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.dados import gerar_dados
+from benchmarks.planos import capturar_consulta, explicar, plano_catalogo_ruim, plano_ruim
+from db import db
+from models.pedido import StatusPedido
+from repositories.pedido import PedidoRepository
+from repositories.produto import ProdutoRepository
+
+FIM = datetime.utcnow()
+INICIO = FIM - timedelta(days=30)
+
+# nome: (executar, tabela, verificação do plano)
+CONSULTAS = {
+    'listar_paginado': (lambda: PedidoRepository.listar_paginado(50, apos=(FIM, 10 ** 9)),
+                        'pedidos', plano_ruim),
+    'buscar_por_status': (lambda: PedidoRepository.buscar_por_status(StatusPedido.CONFIRMADO),
+                          'pedidos', plano_ruim),
+    'buscar_por_cliente': (lambda: PedidoRepository.buscar_por_cliente(1), 'pedidos', plano_ruim),
+    'buscar_por_periodo': (lambda: PedidoRepository.buscar_por_periodo(INICIO, FIM, limite=50),
+                           'pedidos', plano_ruim),
+    'buscar_por_periodo+status': (lambda: PedidoRepository.buscar_por_periodo(
+        INICIO, FIM, status=StatusPedido.ENTREGUE, limite=50, apos=(FIM, 10 ** 9)),
+        'pedidos', plano_ruim),
+    'buscar_por_periodo+cliente': (lambda: PedidoRepository.buscar_por_periodo(
+        INICIO, FIM, cliente_id=1, limite=50), 'pedidos', plano_ruim),
+    'buscar_catalogo preco': (lambda: ProdutoRepository.buscar_catalogo(
+        'preco', 50, preco_min=100, preco_max=200), 'produtos', plano_catalogo_ruim),
+    'buscar_catalogo -preco+estoque': (lambda: ProdutoRepository.buscar_catalogo(
+        '-preco', 50, apos=(500.0, 10 ** 9), em_estoque=True), 'produtos', plano_catalogo_ruim),
+    'buscar_catalogo nome': (lambda: ProdutoRepository.buscar_catalogo(
+        'nome', 50, apos=('c', 0), preco_max=300), 'produtos', plano_catalogo_ruim)
+}
+
+
+@pytest.fixture(scope='module')
+def base_analisada(app):
+    # Volumes ajustáveis pelo benchmark; ANALYZE para o planejador usar as estatísticas
+    gerar_dados(app, produtos=int(os.getenv('PLANOS_PRODUTOS', 2000)),
+                pedidos=int(os.getenv('PLANOS_PEDIDOS', 1000)))
+    with app.app_context():
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('nome', CONSULTAS)
+def test_consulta_usa_indice(app, base_analisada, nome):
+    executar, tabela, verificar = CONSULTAS[nome]
+    with app.app_context():
+        comando, parametros = capturar_consulta(db.engine, executar, tabela)
+        plano = explicar(db.engine, comando, parametros)
+    assert not verificar(plano), f"{nome}:\n" + '\n'.join(plano)
@@ -0,0 +1,12 @@
+from db import db
+from models.produto import Produto, ProdutoDTO
+
+
+def test_dto_serializa_igual_ao_modelo(contexto, criar_produto):
+    produto = db.session.get(Produto, criar_produto(quantidade=3, preco=12.5))
+    dto = ProdutoDTO(*db.session.execute(
+        db.select(*ProdutoDTO.colunas()).where(Produto.id == produto.id)
+    ).one())
+
+    assert dto.to_dict() == produto.to_dict()
+    assert list(dto.to_dict()) == list(ProdutoDTO.__slots__)
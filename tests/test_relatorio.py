@@ -0,0 +1,41 @@
+import pytest
+
+from db import db
+from models.pedido import StatusPedido
+from services.pedido import PedidoService
+from services.relatorio import RelatorioService
+
+PEDIDOS = 30
+
+
+def _resumo_comparavel(resumo):
+    # receita somada em ordens diferentes pode variar na última casa do float
+    def linha(dados):
+        return {**dados, 'receita': pytest.approx(dados['receita']),
+                'ticket_medio': pytest.approx(dados['ticket_medio'])}
+    return {'vendas': linha(resumo['vendas']), 'por_status': [linha(item) for item in resumo['por_status']]}
+
+
+def test_resumo_incremental_coincide_com_a_reconstrucao(contexto, criar_cliente, criar_produto):
+    relatorio = RelatorioService()
+    relatorio.reconstruir()
+
+    servico = PedidoService()
+    produto_id = criar_produto(quantidade=PEDIDOS, preco=10.0)
+    pedido_ids = []
+    for _ in range(PEDIDOS):
+        pedido = servico.criar_pedido(criar_cliente())
+        servico.adicionar_produto_ao_pedido(pedido.id, produto_id, 1)
+        servico.confirmar_pedido(pedido.id)
+        pedido_ids.append(pedido.id)
+
+    for status in (StatusPedido.PROCESSANDO, StatusPedido.ENVIADO):
+        assert servico.transicionar_pedidos_em_lote(pedido_ids, status)['atualizados'] == PEDIDOS
+    db.session.remove()
+
+    incremental = relatorio.obter_resumo()
+    relatorio.reconstruir()
+    reconstruido = relatorio.obter_resumo()
+
+    assert incremental == _resumo_comparavel(reconstruido)
+    assert all(linha['pedidos'] > 0 for linha in incremental['por_status'])
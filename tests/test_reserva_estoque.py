@@ -0,0 +1,94 @@
+import threading
+
+from db import db
+from models import Produto
+from services.pedido import PedidoService
+from services.versao import ConflitoVersao
+
+THREADS = 20
+ESTOQUE = 5
+
+
+def test_confirmacoes_concorrentes_nunca_deixam_estoque_negativo(app, criar_cliente, criar_produto):
+    servico = PedidoService()
+    produto_id = criar_produto(quantidade=ESTOQUE)
+    pedido_ids = []
+    for _ in range(THREADS):
+        pedido = servico.criar_pedido(criar_cliente())
+        servico.adicionar_produto_ao_pedido(pedido.id, produto_id, 1)
+        pedido_ids.append(pedido.id)
+    db.session.remove()
+
+    # Todas as threads confirmam ao mesmo tempo, cada uma com sua sessão e conexão
+    largada = threading.Barrier(THREADS)
+    confirmados, rejeitados, inesperados = [], [], []
+
+    def confirmar(pedido_id):
+        with app.app_context():
+            largada.wait()
+            try:
+                PedidoService().confirmar_pedido(pedido_id)
+                confirmados.append(pedido_id)
+            except ValueError as e:
+                (rejeitados if 'Estoque insuficiente' in str(e) else inesperados).append(str(e))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=confirmar, args=(pedido_id,)) for pedido_id in pedido_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert inesperados == []
+    assert len(confirmados) == ESTOQUE
+    assert len(rejeitados) == THREADS - ESTOQUE
+    quantidade = db.session.get(Produto, produto_id, populate_existing=True).quantidade
+    assert quantidade >= 0
+    assert quantidade == 0
+
+
+def _transicionar_em_paralelo(app, acao, pedido_id):
+    # Perdedores: conflito de versão (leram antes da transição) ou transição não permitida
+    # (leram depois). Nenhum pode ter aplicado efeitos.
+    largada = threading.Barrier(THREADS)
+    sucessos, perdedores, inesperados = [], [], []
+
+    def executar():
+        with app.app_context():
+            largada.wait()
+            try:
+                acao(PedidoService(), pedido_id)
+                sucessos.append(pedido_id)
+            except ConflitoVersao:
+                perdedores.append(pedido_id)
+            except ValueError as e:
+                (perdedores if 'não permitida' in str(e) else inesperados).append(str(e))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=executar) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sucessos, perdedores, inesperados
+
+
+def test_transicao_concorrente_do_mesmo_pedido_aplica_efeitos_uma_vez(app, criar_cliente, criar_produto):
+    servico = PedidoService()
+    produto_id = criar_produto(quantidade=10)
+    pedido = servico.criar_pedido(criar_cliente())
+    servico.adicionar_produto_ao_pedido(pedido.id, produto_id, 3)
+    pedido_id = pedido.id
+    db.session.remove()
+
+    def quantidade():
+        return db.session.get(Produto, produto_id, populate_existing=True).quantidade
+
+    for acao, esperado in ((PedidoService.confirmar_pedido, 7), (PedidoService.cancelar_pedido, 10)):
+        sucessos, perdedores, inesperados = _transicionar_em_paralelo(app, acao, pedido_id)
+        assert inesperados == []
+        assert len(sucessos) == 1
+        assert len(perdedores) == THREADS - 1
+        assert quantidade() == esperado
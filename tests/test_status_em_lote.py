@@ -0,0 +1,80 @@
+from db import db
+from models.evento_outbox import EventoOutbox
+from models.pedido import StatusPedido
+from models.resumo_venda import ResumoVenda
+from repositories.relatorio import RelatorioRepository
+from services.pedido import PedidoService
+
+ID_INEXISTENTE = 10 ** 9
+
+
+def _resumo_status(status: StatusPedido):
+    linha = RelatorioRepository.buscar(ResumoVenda.DIMENSAO_STATUS, status.value)
+    return (0, 0.0, 0) if linha is None else (linha.pedidos, round(linha.receita, 2), linha.unidades)
+
+
+def _eventos(pedido_ids, tipo: str):
+    return EventoOutbox.query.filter(EventoOutbox.agregado_id.in_(pedido_ids), EventoOutbox.tipo == tipo).all()
+
+
+def test_lote_com_status_mistos(app, contexto, criar_cliente, criar_produto):
+    servico = PedidoService()
+    produto_id = criar_produto(quantidade=20, preco=10.0)
+
+    def pedido(quantidade: int, *status: StatusPedido) -> int:
+        pedido_id = servico.criar_pedido(criar_cliente()).id
+        servico.adicionar_produto_ao_pedido(pedido_id, produto_id, quantidade)
+        for novo_status in status:
+            servico.atualizar_status_pedido(pedido_id, novo_status)
+        return pedido_id
+
+    processando = [pedido(quantidade, StatusPedido.CONFIRMADO, StatusPedido.PROCESSANDO)
+                   for quantidade in (1, 2, 3)]
+    confirmado = pedido(1, StatusPedido.CONFIRMADO)
+    pendente = pedido(1)
+    db.session.remove()
+
+    antes = {status: _resumo_status(status) for status in (StatusPedido.PROCESSANDO, StatusPedido.ENVIADO)}
+
+    resposta = app.test_client().put('/api/pedidos/status/lote', json={
+        'pedido_ids': processando + [confirmado, pendente, ID_INEXISTENTE, processando[0]],
+        'status': 'ENVIADO'
+    })
+
+    assert resposta.status_code == 200
+    resultado = resposta.get_json()['data']
+    assert resultado['atualizados'] == 3
+    assert sorted(resultado['pedido_ids']) == processando
+    assert resultado['ignorados'] == [
+        {'pedido_id': confirmado, 'motivo': 'Transição de CONFIRMADO para ENVIADO não permitida'},
+        {'pedido_id': pendente, 'motivo': 'Transição de PENDENTE para ENVIADO não permitida'},
+        {'pedido_id': ID_INEXISTENTE, 'motivo': 'Pedido não encontrado'}
+    ]
+
+    db.session.remove()
+    # Um evento por pedido atualizado, nenhum para os ignorados
+    eventos = _eventos(processando + [confirmado, pendente, ID_INEXISTENTE], 'pedido.enviado')
+    assert sorted(evento.agregado_id for evento in eventos) == processando
+
+    # Os agregados por status se movem exatamente pelos três pedidos: 3 pedidos, R$ 60, 6 unidades
+    pedidos, receita, unidades = antes[StatusPedido.PROCESSANDO]
+    assert _resumo_status(StatusPedido.PROCESSANDO) == (pedidos - 3, round(receita - 60.0, 2), unidades - 6)
+    pedidos, receita, unidades = antes[StatusPedido.ENVIADO]
+    assert _resumo_status(StatusPedido.ENVIADO) == (pedidos + 3, round(receita + 60.0, 2), unidades + 6)
+
+
+def test_transicao_que_altera_estoque_fica_fora_do_lote(contexto, criar_cliente, criar_produto):
+    servico = PedidoService()
+    pedido_id = servico.criar_pedido(criar_cliente()).id
+    servico.adicionar_produto_ao_pedido(pedido_id, criar_produto(), 1)
+    servico.atualizar_status_pedido(pedido_id, StatusPedido.CONFIRMADO)
+
+    resultado = servico.transicionar_pedidos_em_lote([pedido_id], StatusPedido.CANCELADO)
+
+    assert resultado['atualizados'] == 0
+    assert resultado['ignorados'] == [{
+        'pedido_id': pedido_id,
+        'motivo': 'Transição de CONFIRMADO para CANCELADO altera estoque; use o endpoint do pedido'
+    }]
+    db.session.remove()
+    assert _eventos([pedido_id], 'pedido.cancelado') == []
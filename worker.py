@@ -0,0 +1,59 @@
+# worker.py - Trabalhador em segundo plano que drena a outbox de eventos
+
+import logging
+import os
+import threading
+from services.outbox import OutboxService, MAX_TENTATIVAS, BACKOFF_BASE_S
+
+logger = logging.getLogger(__name__)
+
+
+class TrabalhadorOutbox:
+    # Laço que processa lotes da outbox enquanto houver eventos e, sem eventos, espera
+    # `intervalo` segundos. Roda em thread própria (iniciar) ou em primeiro plano (executar).
+
+    def __init__(self, app, tamanho_lote: int = 100, intervalo: float = 1.0,
+                 servico: OutboxService = None):
+        self.app = app
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.servico = servico if servico is not None else OutboxService()
+        self._parar = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def do_ambiente(cls, app) -> 'TrabalhadorOutbox':
+        # OUTBOX_TAMANHO_LOTE, OUTBOX_INTERVALO_S, OUTBOX_MAX_TENTATIVAS e OUTBOX_BACKOFF_BASE_S
+        return cls(
+            app,
+            tamanho_lote=int(os.getenv('OUTBOX_TAMANHO_LOTE', 100)),
+            intervalo=float(os.getenv('OUTBOX_INTERVALO_S', 1.0)),
+            servico=OutboxService(
+                max_tentativas=int(os.getenv('OUTBOX_MAX_TENTATIVAS', MAX_TENTATIVAS)),
+                backoff_base_s=float(os.getenv('OUTBOX_BACKOFF_BASE_S', BACKOFF_BASE_S))
+            )
+        )
+
+    def executar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                with self.app.app_context():
+                    processados = self.servico.processar_lote(self.tamanho_lote)
+            except Exception:
+                # Erro de banco ou de infraestrutura: registra e tenta de novo no próximo ciclo
+                logger.exception('Falha ao processar lote da outbox')
+                processados = 0
+
+            # Lote cheio: provavelmente há mais eventos, segue sem esperar
+            if processados < self.tamanho_lote:
+                self._parar.wait(self.intervalo)
+
+    def iniciar(self) -> 'TrabalhadorOutbox':
+        self._thread = threading.Thread(target=self.executar, name='trabalhador-outbox', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: float = None) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)